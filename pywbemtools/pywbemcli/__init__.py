@@ -23,23 +23,55 @@ and Python 3.
 from __future__ import absolute_import, print_function
 
 import sys
-
-from ._cmd_class import *       # noqa: F403,F401
-from ._cmd_instance import *       # noqa: F403,F401
-from ._cmd_qualifier import *       # noqa: F403,F401
-from ._cmd_server import *       # noqa: F403,F401
-from ._cmd_connection import *   # noqa: F403,F401
-from ._common import *   # noqa: F403,F401
-from ._pywbem_server import *   # noqa: F403,F401
-from ._context_obj import *   # noqa: F403,F401
-from ._connection_repository import *   # noqa: F403,F401
-from .pywbemcli import *       # noqa: F403,F401
-from .config import *  # noqa: F403,F401
-from ._pywbemcli_operations import *  # noqa: F403,F401
-from ._click_extensions import *  # noqa: F403,F401
+import importlib
 
 from ._version import __version__  # noqa: F401
 
+# Modules whose public names are available in this package
+_SUBMODULES = ('_cmd_class', '_cmd_instance', '_cmd_qualifier', '_cmd_server',
+               '_cmd_connection', '_cmd_cache', '_common', '_pywbem_server',
+               '_context_obj', '_connection_repository', 'pywbemcli',
+               'config', '_pywbemcli_operations', '_click_extensions',
+               '_pywbemcli_faked_operations')
+
+if sys.version_info[0:2] >= (3, 7):
+
+    def __getattr__(name):
+        """
+        Import the submodules only when one of their public names is accessed
+        (PEP 562), so that running the pywbemcli command does not import
+        the modules of all command groups.
+        """
+        if name in _SUBMODULES:
+            return importlib.import_module('.' + name, __name__)
+        for modname in _SUBMODULES:
+            module = importlib.import_module('.' + modname, __name__)
+            public_names = getattr(module, '__all__', None)
+            if public_names is None:
+                public_names = [n for n in dir(module)
+                                if not n.startswith('_')]
+            if name in public_names:
+                return getattr(module, name)
+        raise AttributeError("module {!r} has no attribute {!r}".
+                             format(__name__, name))
+
+else:
+    from ._cmd_class import *       # noqa: F403,F401
+    from ._cmd_instance import *       # noqa: F403,F401
+    from ._cmd_qualifier import *       # noqa: F403,F401
+    from ._cmd_server import *       # noqa: F403,F401
+    from ._cmd_connection import *   # noqa: F403,F401
+    from ._cmd_cache import *   # noqa: F403,F401
+    from ._common import *   # noqa: F403,F401
+    from ._pywbem_server import *   # noqa: F403,F401
+    from ._context_obj import *   # noqa: F403,F401
+    from ._connection_repository import *   # noqa: F403,F401
+    from .pywbemcli import *       # noqa: F403,F401
+    from .config import *  # noqa: F403,F401
+    from ._pywbemcli_operations import *  # noqa: F403,F401
+    from ._click_extensions import *  # noqa: F403,F401
+    from ._pywbemcli_faked_operations import *  # noqa: F403,F401
+
 _python_m = sys.version_info[0]  # pylint: disable=invalid-name
 _python_n = sys.version_info[1]  # pylint: disable=invalid-name
 if _python_m == 2 and _python_n < 7:
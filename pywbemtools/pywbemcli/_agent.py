@@ -0,0 +1,387 @@
+# (C) Copyright 2020 IBM Corp.
+# (C) Copyright 2020 Inova Development Inc.
+# All Rights Reserved
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""
+Pywbemcli agent: a long-lived pywbemcli process that executes the commands of
+pywbemcli invocations, so that these commands share the connections to the
+WBEM servers and the caches of the connection definitions of the connections
+file.
+
+An agent serves the connections file of the directory in which it has been
+started. It listens on a Unix domain socket in the PYWBEMCLI_AGENT_DIR
+directory whose name is derived from the path name of the connections file.
+
+Pywbemcli invocations forward their command to the agent if the environment
+variable PYWBEMCLI_AGENT is set and an agent serves the connections file of
+the current directory. Otherwise, they execute the command themselves.
+
+The protocol on the socket uses one JSON object per line. A client sends a
+single request, and the agent responds with one or more messages:
+
+* {"request": "execute", "args": [...], "env": {...}, "columns": N}:
+  Execute the pywbemcli command with the command line arguments args and the
+  environment variables env (the PYWBEMCLI_* variables of the client). The
+  agent responds with messages {"stdout": text} and {"stderr": text} for the
+  output of the command as it is produced, and a final message
+  {"exit_code": N}.
+
+* {"request": "status"}: The agent responds with a message with its status.
+
+* {"request": "stop"}: The agent responds with {"stopped": true} and
+  terminates.
+
+The agent executes one command at a time.
+"""
+
+from __future__ import absolute_import, print_function
+
+import os
+import sys
+import io
+import json
+import time
+import socket
+import hashlib
+import threading
+import traceback
+import six
+from six.moves import socketserver
+
+from .config import PYWBEMCLI_AGENT_DIR
+from ._click_extensions import AGENT_ENVVAR
+from ._connection_repository import ConnectionRepository, \
+    DEFAULT_CONNECTIONS_PATH
+
+__all__ = []
+
+# Prefix of the names of the environment variables that are passed to the
+# agent with a command
+FORWARDED_ENVVAR_PREFIX = 'PYWBEMCLI_'
+
+# Commands that are never forwarded to the agent
+LOCAL_COMMANDS = ('agent', 'repl')
+
+# Indicates that this process is an agent, so that its commands are not
+# forwarded to itself
+_IN_AGENT = False
+
+
+def agent_supported():
+    """
+    Return True if the pywbemcli agent is supported on this platform, i.e. on
+    Python 3 if the platform supports Unix domain sockets and os.fork() (the
+    agent uses io.TextIOWrapper features of Python 3 and starts in the
+    background by forking).
+    """
+    return not six.PY2 and hasattr(os, 'fork') and \
+        hasattr(socket, 'AF_UNIX')
+
+
+def agent_socket_path(connections_file=DEFAULT_CONNECTIONS_PATH):
+    """
+    Return the path name of the socket of the agent that serves the
+    connections file.
+    """
+    digest = hashlib.sha1(os.path.abspath(connections_file).encode('utf-8')) \
+        .hexdigest()
+    return os.path.join(os.path.expanduser(PYWBEMCLI_AGENT_DIR),
+                        '{}.sock'.format(digest[:16]))
+
+
+def send_message(wfile, message):
+    """Send a message (a dictionary) as a JSON line to the file wfile."""
+    wfile.write((json.dumps(message) + '\n').encode('utf-8'))
+    wfile.flush()
+
+
+def receive_message(rfile):
+    """
+    Receive a message (a dictionary) from the file rfile. Return None if the
+    peer closed the connection.
+    """
+    line = rfile.readline()
+    if not line:
+        return None
+    return json.loads(line.decode('utf-8'))
+
+
+def connect_agent(socket_path):
+    """
+    Return a socket connected to the agent listening on socket_path, or None
+    if no agent is listening.
+    """
+    if not agent_supported() or not os.path.exists(socket_path):
+        return None
+    sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    try:
+        sock.connect(socket_path)
+    except (IOError, OSError):
+        sock.close()
+        return None
+    return sock
+
+
+def agent_request(socket_path, request):
+    """
+    Send a status or stop request to the agent listening on socket_path and
+    return its response, or None if no agent is listening.
+    """
+    sock = connect_agent(socket_path)
+    if sock is None:
+        return None
+    try:
+        with sock.makefile('rwb') as sock_file:
+            send_message(sock_file, request)
+            return receive_message(sock_file)
+    finally:
+        sock.close()
+
+
+def execute_command(socket_path, args, env, columns, stdout, stderr):
+    """
+    Execute a pywbemcli command in the agent listening on socket_path and
+    write its output to the text files stdout and stderr as it is received.
+
+    Returns:
+        int: The exit code of the command, or None if no agent is listening.
+    """
+    sock = connect_agent(socket_path)
+    if sock is None:
+        return None
+    try:
+        with sock.makefile('rwb') as sock_file:
+            send_message(sock_file, {'request': 'execute', 'args': args,
+                                     'env': env, 'columns': columns})
+            while True:
+                message = receive_message(sock_file)
+                if message is None:
+                    stderr.write('Error: The pywbemcli agent terminated '
+                                 'while executing the command\n')
+                    return 1
+                if 'exit_code' in message:
+                    return message['exit_code']
+                for name, stream in (('stdout', stdout), ('stderr', stderr)):
+                    if name in message:
+                        stream.write(message[name])
+                        stream.flush()
+    finally:
+        sock.close()
+
+
+def forward_command(args, command_names, columns):
+    """
+    Forward the pywbemcli command with the command line arguments args to the
+    agent serving the connections file of the current directory, if the
+    PYWBEMCLI_AGENT environment variable is set and the arguments include a
+    command other than the commands in LOCAL_COMMANDS.
+
+    Returns:
+        int: The exit code of the command, or None if the command has not
+        been forwarded and must be executed locally.
+    """
+    if _IN_AGENT or not os.environ.get(AGENT_ENVVAR):
+        return None
+    if not [arg for arg in args if arg in command_names] or \
+            [arg for arg in args if arg in LOCAL_COMMANDS]:
+        return None
+    env = {name: value for name, value in os.environ.items()
+           if name.startswith(FORWARDED_ENVVAR_PREFIX)}
+    return execute_command(agent_socket_path(), list(args), env, columns,
+                           sys.stdout, sys.stderr)
+
+
+class _MessageWriter(io.RawIOBase):
+    # pylint: disable=too-few-public-methods
+    """
+    Binary file that sends the data written to it as messages with the key
+    name to the client of the agent.
+    """
+
+    def __init__(self, wfile, name):
+        super(_MessageWriter, self).__init__()
+        self._wfile = wfile
+        self._name = name
+
+    def writable(self):
+        return True
+
+    def write(self, b):  # pylint: disable=arguments-differ
+        data = bytes(b)
+        send_message(self._wfile, {self._name: data.decode('utf-8',
+                                                           'replace')})
+        return len(data)
+
+
+class _AgentRequestHandler(socketserver.StreamRequestHandler):
+    """
+    Handler for a request from a client of the agent.
+    """
+
+    def handle(self):
+        request = receive_message(self.rfile)
+        if request is None:
+            return
+        kind = request.get('request')
+        if kind == 'execute':
+            exit_code = self.server.execute(
+                request['args'], request.get('env', {}),
+                request.get('columns'), self.wfile)
+            send_message(self.wfile, {'exit_code': exit_code})
+        elif kind == 'status':
+            send_message(self.wfile, self.server.status())
+        elif kind == 'stop':
+            send_message(self.wfile, {'stopped': True})
+            # shutdown() waits for serve_forever() to return
+            threading.Thread(target=self.server.shutdown).start()
+        else:
+            send_message(self.wfile, {'error': 'Invalid request: {!r}'.
+                                               format(kind)})
+
+
+class AgentServer(socketserver.UnixStreamServer):
+    """
+    Server of the pywbemcli agent that executes the pywbemcli commands sent
+    by clients on a Unix domain socket, one command at a time.
+
+    The commands are executed with the click command cli in this process,
+    which keeps the PywbemServer objects of the connection definitions of the
+    connections file with their connections to the WBEM servers, the WBEM
+    server information and the session caches across the commands.
+    """
+
+    def __init__(self, socket_path, cli):
+        """
+        Parameters:
+
+          socket_path (:term:`string`):
+            Path name of the socket. The directory of the socket is created
+            if needed and is accessible only by its owner.
+
+          cli (:class:`click.Command`):
+            The pywbemcli command.
+        """
+        socket_dir = os.path.dirname(socket_path)
+        if not os.path.isdir(socket_dir):
+            os.makedirs(socket_dir)
+        os.chmod(socket_dir, 0o700)
+        if os.path.exists(socket_path):
+            os.remove(socket_path)  # left over from a terminated agent
+        socketserver.UnixStreamServer.__init__(self, socket_path,
+                                               _AgentRequestHandler)
+        self.socket_path = socket_path
+        self.cli = cli
+        self.start_time = time.time()
+        self.requests = 0
+
+    def serve(self):
+        """
+        Serve requests until the agent is stopped, then remove the socket.
+        """
+        global _IN_AGENT  # pylint: disable=global-statement
+        _IN_AGENT = True
+        try:
+            self.serve_forever()
+        finally:
+            _IN_AGENT = False
+            self.server_close()
+            if os.path.exists(self.socket_path):
+                os.remove(self.socket_path)
+
+    def status(self):
+        """
+        Return the status of the agent as a dictionary.
+        """
+        connections = ConnectionRepository()
+        connected = [name for name in connections
+                     if connections[name].wbem_server is not None]
+        return {'pid': os.getpid(),
+                'socket': self.socket_path,
+                'connections_file': connections.connections_file,
+                'start_time': self.start_time,
+                'requests': self.requests,
+                'connected': connected}
+
+    def execute(self, args, env, columns, wfile):
+        """
+        Execute a pywbemcli command with stdout and stderr sent as messages
+        to the client, and return its exit code.
+
+        The PYWBEMCLI_* environment variables of this process are replaced
+        by those of the client during the execution of the command.
+        """
+        self.requests += 1
+        ConnectionRepository().reload()
+
+        saved_environ = dict(os.environ)
+        saved_streams = sys.stdin, sys.stdout, sys.stderr
+        for name in saved_environ:
+            if name.startswith(FORWARDED_ENVVAR_PREFIX):
+                del os.environ[name]
+        os.environ.update(env)
+        if columns:
+            os.environ['COLUMNS'] = str(columns)
+        sys.stdin = io.StringIO()  # Commands cannot prompt for input
+        sys.stdout = io.TextIOWrapper(_MessageWriter(wfile, 'stdout'),
+                                      encoding='utf-8', write_through=True)
+        sys.stderr = io.TextIOWrapper(_MessageWriter(wfile, 'stderr'),
+                                      encoding='utf-8', write_through=True)
+        try:
+            self.cli.main(args=args, prog_name='pywbemcli')
+            exit_code = 0
+        except SystemExit as exc:
+            if exc.code is None:
+                exit_code = 0
+            else:
+                exit_code = exc.code if isinstance(exc.code, int) else 1
+        except Exception:  # pylint: disable=broad-except
+            traceback.print_exc()
+            exit_code = 1
+        finally:
+            sys.stdout.flush()
+            sys.stderr.flush()
+            sys.stdin, sys.stdout, sys.stderr = saved_streams
+            os.environ.clear()
+            os.environ.update(saved_environ)
+        return exit_code
+
+
+def start_agent(socket_path, cli, background=True):
+    """
+    Start an agent listening on socket_path.
+
+    If background is True, the agent is executed in a new background process
+    and its process ID is returned once the agent accepts requests.
+    Otherwise, the agent is executed in this process until it is stopped,
+    and None is returned.
+    """
+    server = AgentServer(socket_path, cli)
+    if not background:
+        server.serve()
+        return None
+
+    pid = os.fork()  # pylint: disable=no-member
+    if pid:
+        # The socket is listening, and is served by the child process
+        server.socket.close()
+        return pid
+
+    os.setsid()  # pylint: disable=no-member
+    devnull = os.open(os.devnull, os.O_RDWR)
+    for fd in (0, 1, 2):
+        os.dup2(devnull, fd)
+    try:
+        server.serve()
+    finally:
+        os._exit(0)  # pylint: disable=protected-access
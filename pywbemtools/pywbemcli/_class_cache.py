@@ -0,0 +1,384 @@
+# (C) Copyright 2020 IBM Corp.
+# (C) Copyright 2020 Inova Development Inc.
+# All Rights Reserved
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""
+Persistent cache of the class definitions of WBEM servers.
+
+The cache keeps the classes that pywbemcli commands retrieve as a basis for
+their processing (ex. to build instances) and indexes of the classes of each
+namespace (ex. to display the class hierarchy or to filter classes by their
+qualifiers) so that they are retrieved from the WBEM server only once. The
+cache is maintained in a directory with a subdirectory for each connection
+name and a file for each namespace of the connection.
+
+The cache of a namespace is invalidated when its fingerprint (the number of
+classes and a hash of the class names in the namespace) no longer matches
+the fingerprint of the namespace in the WBEM server, or when the connection
+name refers to a different server URL.
+"""
+
+from __future__ import absolute_import, print_function
+
+import os
+import time
+import threading
+import hashlib
+import six
+from six.moves import cPickle as pickle
+from six.moves.urllib.parse import quote
+
+from .config import PYWBEMCLI_CLASS_CACHE_DIR, CLASS_CACHE_CHECK_INTERVAL
+
+__all__ = []
+
+# Pickle protocol that can be read by all supported Python versions
+PICKLE_PROTOCOL = 2
+
+# Version of the format of the cache files. Cache files with a different
+# version are rebuilt.
+CACHE_FORMAT_VERSION = 2
+
+# Bits of the qualifier flags of a class for the boolean class qualifiers
+# used by the qualifier filter options of the class commands
+QUALIFIER_FLAG_BITS = {
+    'Association': 1,
+    'Indication': 2,
+    'Experimental': 4,
+}
+
+# Qualifier flags that subclasses inherit from their superclass, because the
+# qualifiers have the flavors ToSubclass and DisableOverride
+INHERITED_QUALIFIER_FLAGS = QUALIFIER_FLAG_BITS['Association'] | \
+    QUALIFIER_FLAG_BITS['Indication']
+
+
+def retrieve_superclass_index(conn, namespace):
+    """
+    Retrieve the names of all classes in the namespace with the name of the
+    superclass of each class (None for top classes) from the WBEM server.
+
+    The classes are enumerated with a single EnumerateClasses request that
+    minimizes the size of the response by not returning qualifiers,
+    inherited properties and methods, and class origin information.
+
+    Returns:
+        list of tuple(classname, superclassname): The classes in the order
+        returned by the WBEM server.
+    """
+    classes = conn.EnumerateClasses(namespace=namespace,
+                                    DeepInheritance=True,
+                                    LocalOnly=True,
+                                    IncludeQualifiers=False,
+                                    IncludeClassOrigin=False)
+    return [(cl.classname, cl.superclass) for cl in classes]
+
+
+def retrieve_qualifier_flags(conn, namespace):
+    """
+    Retrieve the qualifier flags of all classes in the namespace from the
+    WBEM server. The qualifier flags of a class are a bit mask with the bits
+    defined in QUALIFIER_FLAG_BITS set for the boolean class qualifiers that
+    are set to True in the class.
+
+    The classes are enumerated with a single EnumerateClasses request that
+    reduces the size of the response by not returning inherited properties
+    and methods, and class origin information. Since the classes are
+    returned without the qualifiers they inherit, the flags in
+    INHERITED_QUALIFIER_FLAGS of each class are propagated to its
+    subclasses.
+
+    Returns:
+        list of tuple(classname, flags): The classes in the order returned by
+        the WBEM server.
+    """
+    classes = conn.EnumerateClasses(namespace=namespace,
+                                    DeepInheritance=True,
+                                    LocalOnly=True,
+                                    IncludeQualifiers=True,
+                                    IncludeClassOrigin=False)
+    local_flags = {}
+    superclasses = {}
+    for cl in classes:
+        flags = 0
+        for qname, bit in six.iteritems(QUALIFIER_FLAG_BITS):
+            if qname in cl.qualifiers and cl.qualifiers[qname].value:
+                flags |= bit
+        key = cl.classname.lower()
+        local_flags[key] = flags
+        superclasses[key] = cl.superclass.lower() if cl.superclass else None
+
+    # Flags of the classes including the inherited flags, resolved from the
+    # top class down for each chain of superclasses
+    all_flags = {}
+    for cl in classes:
+        chain = []
+        key = cl.classname.lower()
+        while key in local_flags and key not in all_flags:
+            chain.append(key)
+            key = superclasses[key]
+        inherited = all_flags.get(key, 0) & INHERITED_QUALIFIER_FLAGS
+        for key in reversed(chain):
+            all_flags[key] = local_flags[key] | inherited
+            inherited = all_flags[key] & INHERITED_QUALIFIER_FLAGS
+
+    return [(cl.classname, all_flags[cl.classname.lower()])
+            for cl in classes]
+
+
+# Names of the indexes of a namespace that are kept in the cache, with the
+# functions retrieving them from the WBEM server
+NAMESPACE_INDEXES = {
+    'superclasses': retrieve_superclass_index,
+    'qualifier_flags': retrieve_qualifier_flags,
+}
+
+
+class ClassCache(object):
+    # pylint: disable=useless-object-inheritance
+    """
+    Persistent cache of the class definitions of the WBEM server of one
+    named connection.
+
+    The classes are cached as retrieved with GetClass using LocalOnly=False,
+    IncludeQualifiers=True and IncludeClassOrigin=False.
+
+    The cache of a namespace is loaded from its file on first use and written
+    back to the file when a class is added.
+    """
+
+    def __init__(self, connection_name, url, cache_dir=None,
+                 check_interval=CLASS_CACHE_CHECK_INTERVAL):
+        """
+        Parameters:
+
+          connection_name (:term:`string`):
+            Name of the connection in the connections file.
+
+          url (:term:`string`):
+            URL of the WBEM server of the connection.
+
+          cache_dir (:term:`string`):
+            Directory path of the cache. If None, the
+            PYWBEMCLI_CLASS_CACHE_DIR config variable is used.
+
+          check_interval (:term:`integer`):
+            Minimum time in seconds between checks of the fingerprint of a
+            namespace against the WBEM server.
+        """
+        self._connection_name = connection_name
+        self._url = url
+        self._cache_dir = os.path.expanduser(
+            cache_dir or PYWBEMCLI_CLASS_CACHE_DIR)
+        self._check_interval = check_interval
+        # Loaded namespace caches. Key is the lower case namespace name.
+        self._namespaces = {}
+
+    def __repr__(self):
+        return 'ClassCache(connection_name={!r}, url={!r}, cache_dir={!r}, ' \
+               'namespaces={!r})'.format(self._connection_name, self._url,
+                                         self._cache_dir,
+                                         list(self._namespaces))
+
+    @property
+    def connection_dir(self):
+        """
+        :term:`string`: Directory path of the cache files of the connection.
+        """
+        return os.path.join(self._cache_dir,
+                            quote(self._connection_name, safe=''))
+
+    def get_class(self, conn, classname, namespace=None):
+        """
+        Return the class classname in the namespace from the cache. If the
+        class is not in the cache, retrieve it from the WBEM server with conn
+        and add it to the cache.
+
+        Parameters:
+
+          conn (:class:`~pywbem.WBEMConnection`):
+            Connection used to retrieve the class and the fingerprint of the
+            namespace.
+
+          classname (:term:`string`):
+            Name of the class.
+
+          namespace (:term:`string`):
+            Namespace of the class. If None, the default namespace of conn is
+            used.
+
+        Raises:
+            pywbem.Error: Exceptions from the WBEM server, for example
+            CIMError(CIM_ERR_NOT_FOUND) if the class does not exist.
+        """
+        namespace = namespace or conn.default_namespace
+        ns_cache = self._namespace_cache(conn, namespace)
+        key = classname.lower()
+        try:
+            return ns_cache['classes'][key]
+        except KeyError:
+            pass
+
+        klass = conn.GetClass(classname, namespace=namespace,
+                              LocalOnly=False, IncludeQualifiers=True,
+                              IncludeClassOrigin=False)
+        ns_cache['classes'][key] = klass
+        self._write_file(namespace, ns_cache)
+        return klass
+
+    def get_index(self, conn, index_name, namespace=None):
+        """
+        Return an index of the classes of the namespace from the cache. If the
+        index is not in the cache, retrieve it from the WBEM server with conn
+        and add it to the cache.
+
+        The index is consistent with the class names of the namespace that
+        define the fingerprint of its cache.
+
+        Parameters:
+
+          conn (:class:`~pywbem.WBEMConnection`):
+            Connection used to retrieve the index and the fingerprint of the
+            namespace.
+
+          index_name (:term:`string`):
+            Name of the index: 'superclasses' (see
+            :func:`retrieve_superclass_index`) or 'qualifier_flags' (see
+            :func:`retrieve_qualifier_flags`).
+
+          namespace (:term:`string`):
+            Namespace of the classes. If None, the default namespace of conn
+            is used.
+
+        Returns:
+            list of tuple(classname, value): The classes of the namespace
+            with their value in the index. The list is shared with the cache
+            and must not be modified.
+
+        Raises:
+            pywbem.Error: Exceptions from the WBEM server.
+        """
+        namespace = namespace or conn.default_namespace
+        ns_cache = self._namespace_cache(conn, namespace)
+        if ns_cache['indexes'].get(index_name) is None:
+            ns_cache['indexes'][index_name] = \
+                NAMESPACE_INDEXES[index_name](conn, namespace)
+            self._write_file(namespace, ns_cache)
+        return ns_cache['indexes'][index_name]
+
+    def invalidate(self, namespace):
+        """
+        Remove the cache of the namespace, in memory and on disk, for example
+        after a class in the namespace has been modified.
+        """
+        self._namespaces.pop(namespace.lower(), None)
+        file_path = self._file_path(namespace)
+        if os.path.isfile(file_path):
+            os.remove(file_path)
+
+    def clear(self):
+        """
+        Remove all cached classes of the connection, in memory and on disk.
+        """
+        self._namespaces = {}
+        conn_dir = self.connection_dir
+        if os.path.isdir(conn_dir):
+            for file_name in os.listdir(conn_dir):
+                os.remove(os.path.join(conn_dir, file_name))
+            os.rmdir(conn_dir)
+
+    @staticmethod
+    def fingerprint(conn, namespace):
+        """
+        Return the fingerprint of the namespace in the WBEM server as a tuple
+        of the number of classes and a hash of the sorted class names.
+        """
+        classnames = sorted(cln.lower() for cln in conn.EnumerateClassNames(
+            namespace=namespace, DeepInheritance=True))
+        digest = hashlib.sha1(
+            ','.join(classnames).encode('utf-8')).hexdigest()
+        return len(classnames), digest
+
+    def _file_path(self, namespace):
+        """Return the path name of the cache file for the namespace."""
+        return os.path.join(self.connection_dir,
+                            '{}.pickle'.format(quote(namespace.lower(),
+                                                     safe='')))
+
+    def _namespace_cache(self, conn, namespace):
+        """
+        Return the cache of the namespace, a dictionary with the items
+        'version', 'url', 'fingerprint', 'checked', 'classes' and 'indexes'.
+        The cache is loaded from its file on first use, and it is reset if the
+        check against the WBEM server fails.
+        """
+        # A namespace is checked at most once during the life of this object
+        ns_key = namespace.lower()
+        if ns_key in self._namespaces:
+            return self._namespaces[ns_key]
+
+        ns_cache = self._read_file(namespace)
+        if ns_cache is None or ns_cache['url'] != self._url or \
+                time.time() - ns_cache['checked'] >= self._check_interval:
+            fingerprint = self.fingerprint(conn, namespace)
+            if ns_cache is None or ns_cache['url'] != self._url or \
+                    ns_cache['fingerprint'] != fingerprint:
+                ns_cache = {'version': CACHE_FORMAT_VERSION,
+                            'url': self._url, 'fingerprint': fingerprint,
+                            'classes': {}, 'indexes': {}}
+            ns_cache['checked'] = time.time()
+            self._write_file(namespace, ns_cache)
+
+        self._namespaces[ns_key] = ns_cache
+        return ns_cache
+
+    def _read_file(self, namespace):
+        """
+        Return the cache of the namespace from its file, or None if the file
+        does not exist or cannot be read. A cache file that cannot be read is
+        simply rebuilt.
+        """
+        file_path = self._file_path(namespace)
+        if not os.path.isfile(file_path):
+            return None
+        try:
+            with open(file_path, 'rb') as fp:
+                ns_cache = pickle.load(fp)
+        except Exception:  # pylint: disable=broad-except
+            return None
+        if not isinstance(ns_cache, dict) or \
+                set(ns_cache) != set(['version', 'url', 'fingerprint',
+                                      'checked', 'classes', 'indexes']) or \
+                ns_cache['version'] != CACHE_FORMAT_VERSION:
+            return None
+        return ns_cache
+
+    def _write_file(self, namespace, ns_cache):
+        """
+        Write the cache of the namespace to its file. The file is written to
+        a temporary file that then replaces the file so that concurrent
+        pywbemcli processes never see a partially written file.
+        """
+        conn_dir = self.connection_dir
+        if not os.path.isdir(conn_dir):
+            os.makedirs(conn_dir)
+        file_path = self._file_path(namespace)
+        tmpfile = '{}.{}.{}.tmp'.format(file_path, os.getpid(),
+                                        threading.current_thread().ident)
+        with open(tmpfile, 'wb') as fp:
+            pickle.dump(ns_cache, fp, PICKLE_PROTOCOL)
+        if six.PY2:
+            os.rename(tmpfile, file_path)
+        else:
+            os.replace(tmpfile, file_path)  # pylint: disable=no-member
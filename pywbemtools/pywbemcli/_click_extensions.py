@@ -2,10 +2,20 @@
 This file contains extensions to Click
 """
 
+import os
+import sys
+import importlib
 from collections import OrderedDict
+import six
 import click
 
 
+# Environment variable that enables the forwarding of commands to the
+# pywbemcli agent. The _agent module is imported only if it is set, since it
+# imports modules that are not needed otherwise.
+AGENT_ENVVAR = 'PYWBEMCLI_AGENT'
+
+
 class PywbemcliGroup(click.Group):
     """
     Extend Click Group class to:
@@ -47,20 +57,50 @@ class PywbemcliTopGroup(click.Group):
         at the end of the list of commands/groups. Since ordering of the top
         level cannot be tied to order commands are inserted in list, we elected
         to just move the generic ones to the end of the list.
+    2.  Import the modules defining command groups only when a command group
+        is used, to reduce the startup time. The lazy_commands argument is
+        a dictionary with the command group names as keys and tuples of
+        (module name, short help) as values. Importing the module adds the
+        command group to this group. The short help is displayed in the top
+        level help output without importing the module.
+    3.  Forward the command to the pywbemcli agent instead of executing it,
+        if the agent is enabled and running (see the _agent module).
 
     This extension has a general name because it may be used for more than
     one extension to the Click.Group class..
     """
 
+    def __init__(self, name=None, commands=None, lazy_commands=None,
+                 **attrs):
+        click.Group.__init__(self, name=name, commands=commands, **attrs)
+        self.lazy_commands = lazy_commands or {}
+
+    def main(self, args=None, **extra):  # pylint: disable=arguments-differ
+        """
+        Forward the command to the pywbemcli agent if it is enabled and
+        running, and execute the command otherwise.
+        """
+        if args is None:
+            args = sys.argv[1:]
+        if os.environ.get(AGENT_ENVVAR):
+            # pylint: disable=import-outside-toplevel
+            from ._agent import forward_command
+            exit_code = forward_command(args, self.list_commands(None),
+                                        click.get_terminal_size()[0])
+            if exit_code is not None:
+                sys.exit(exit_code)
+        return click.Group.main(self, args=args, **extra)
+
     def list_commands(self, ctx):
         """
         Order commands by sorting and then moving any commands defined in
         move_to_end list to the end of the list.
         """
         # tuple of commands to move to bottom after sort
-        move_to_end = ('connection', 'help', 'repl')
+        move_to_end = ('agent', 'batch', 'cache', 'connection', 'fanout',
+                       'help', 'repl')
 
-        cmd_list = sorted(self.commands.keys())
+        cmd_list = sorted(set(self.commands) | set(self.lazy_commands))
         pop_count = 0
         # reorder list so the move_to_end list commands are at bottom
         for i in range(len(cmd_list)):
@@ -68,3 +108,32 @@ class PywbemcliTopGroup(click.Group):
                 cmd_list.append(cmd_list.pop(i - pop_count))
                 pop_count += 1
         return cmd_list
+
+    def get_command(self, ctx, cmd_name):
+        """
+        Return the command, importing the module that defines it if it is
+        a lazy command that has not been imported yet.
+        """
+        if cmd_name not in self.commands and cmd_name in self.lazy_commands:
+            importlib.import_module(self.lazy_commands[cmd_name][0])
+        return click.Group.get_command(self, ctx, cmd_name)
+
+    def format_commands(self, ctx, formatter):
+        """
+        Write the commands into the formatter like click.Group does, but use
+        the short help of lazy commands whose modules have not been imported.
+        """
+        rows = []
+        for cmd_name in self.list_commands(ctx):
+            cmd = self.commands.get(cmd_name)
+            if cmd is None:
+                rows.append((cmd_name, self.lazy_commands[cmd_name][1]))
+            elif not cmd.hidden:
+                rows.append((cmd_name, cmd))
+        if rows:
+            limit = formatter.width - 6 - max(len(row[0]) for row in rows)
+            rows = [(cmd_name, cmd if isinstance(cmd, six.string_types)
+                     else cmd.get_short_help_str(limit))
+                    for cmd_name, cmd in rows]
+            with formatter.section("Commands"):
+                formatter.write_dl(rows)
@@ -0,0 +1,174 @@
+# (C) Copyright 2020 IBM Corp.
+# (C) Copyright 2020 Inova Development Inc.
+# All Rights Reserved
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""
+Click Command definition for the agent command group which includes
+cmds to start, stop and show the status of the pywbemcli agent.
+
+NOTE: Commands are ordered in help display by their order in this file.
+"""
+
+from __future__ import absolute_import, print_function
+
+import time
+import click
+
+from .pywbemcli import cli
+from ._common import CMD_OPTS_TXT, format_table
+from ._click_extensions import PywbemcliGroup
+from ._agent import agent_supported, agent_socket_path, agent_request, \
+    start_agent
+
+
+@cli.group('agent', cls=PywbemcliGroup, options_metavar=CMD_OPTS_TXT)
+def agent_group():
+    """
+    Command group for the pywbemcli agent.
+
+    The pywbemcli agent is a background process that executes the commands of
+    pywbemcli invocations in the current directory when the PYWBEMCLI_AGENT
+    environment variable is set to a non-empty value. The agent keeps the
+    connections to the WBEM servers of the connection definitions in the
+    connections file, together with the information about the WBEM servers
+    and the session caches, so that these commands do not need to connect to
+    the WBEM server again.
+
+    The commands are executed by the agent one at a time, with the general
+    options and pywbemcli environment variables of the invocation. Commands
+    that prompt for input (e.g. for a password) cannot be executed by the
+    agent. The agent is available only with Python 3 on platforms that
+    support Unix domain sockets and fork() (e.g. not on Windows).
+
+    In addition to the command-specific options shown in this help text, the
+    general options (see 'pywbemcli --help') can also be specified before the
+    'agent' keyword.
+    """
+    pass  # pylint: disable=unnecessary-pass
+
+
+@agent_group.command('start', options_metavar=CMD_OPTS_TXT)
+@click.option('--foreground', is_flag=True, default=False,
+              help='Execute the agent in the current process until it is '
+                   'stopped, instead of in a background process.')
+def agent_start(**options):
+    """
+    Start the pywbemcli agent.
+
+    Start the pywbemcli agent for the connections file in the current
+    directory. The agent is executed in a background process unless the
+    --foreground option is specified.
+    """
+    cmd_agent_start(options)
+
+
+@agent_group.command('stop', options_metavar=CMD_OPTS_TXT)
+def agent_stop():
+    """
+    Stop the pywbemcli agent.
+
+    Stop the pywbemcli agent for the connections file in the current
+    directory.
+    """
+    cmd_agent_stop()
+
+
+@agent_group.command('status', options_metavar=CMD_OPTS_TXT)
+@click.pass_obj
+def agent_status(context):
+    """
+    Show the status of the pywbemcli agent.
+
+    Display the process ID, start time and number of executed commands of the
+    pywbemcli agent for the connections file in the current directory, and
+    the names of the connection definitions with a connection to their WBEM
+    server.
+    """
+    cmd_agent_status(context)
+
+
+################################################################
+#
+#   Common methods for The action functions for the agent click group
+#
+###############################################################
+
+
+def get_socket_path():
+    """
+    Return the path name of the socket of the agent for the connections file
+    in the current directory.
+    """
+    if not agent_supported():
+        raise click.ClickException(
+            'The pywbemcli agent is not supported on this platform')
+    return agent_socket_path()
+
+
+################################################################
+#
+#   agent command processors
+#
+###############################################################
+
+
+def cmd_agent_start(options):
+    """
+    Start the pywbemcli agent, unless it is already running.
+    """
+    socket_path = get_socket_path()
+    status = agent_request(socket_path, {'request': 'status'})
+    if status is not None:
+        raise click.ClickException(
+            'The pywbemcli agent is already running with process ID {}'.
+            format(status['pid']))
+
+    if options['foreground']:
+        click.echo('Pywbemcli agent listening on {}'.format(socket_path))
+        start_agent(socket_path, cli, background=False)
+    else:
+        pid = start_agent(socket_path, cli)
+        click.echo('Pywbemcli agent started with process ID {}'.format(pid))
+
+
+def cmd_agent_stop():
+    """
+    Stop the pywbemcli agent.
+    """
+    response = agent_request(get_socket_path(), {'request': 'stop'})
+    if response is None:
+        raise click.ClickException('The pywbemcli agent is not running')
+    click.echo('Pywbemcli agent stopped')
+
+
+def cmd_agent_status(context):
+    """
+    Display the status of the pywbemcli agent.
+    """
+    status = agent_request(get_socket_path(), {'request': 'status'})
+    if status is None:
+        raise click.ClickException('The pywbemcli agent is not running')
+
+    rows = [
+        ['Process ID', status['pid']],
+        ['Socket', status['socket']],
+        ['Connections file', status['connections_file']],
+        ['Started', time.strftime('%Y-%m-%d %H:%M:%S',
+                                  time.localtime(status['start_time']))],
+        ['Commands executed', status['requests']],
+        ['Connected', ', '.join(sorted(status['connected']))],
+    ]
+    click.echo(format_table(rows, ['Attribute', 'Value'],
+                            title='Pywbemcli agent status',
+                            table_format=context.output_format))
@@ -0,0 +1,157 @@
+# (C) Copyright 2020 IBM Corp.
+# (C) Copyright 2020 Inova Development Inc.
+# All Rights Reserved
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""
+Click Command definition for the cache command group which includes
+cmds to inspect and clear the caches of objects retrieved from the WBEM
+server.
+
+NOTE: Commands are ordered in help display by their order in this file.
+"""
+
+from __future__ import absolute_import, print_function
+
+import click
+
+from .pywbemcli import cli
+from ._common import CMD_OPTS_TXT, format_table
+from ._click_extensions import PywbemcliGroup
+
+# Names of the kinds of session cache entries for display
+CACHE_ENTRY_KINDS = {
+    'class': 'class',
+    'classes': 'classes',
+    'classnames': 'class names',
+    'superclasses': 'superclasses',
+    'subclasses': 'subclasses',
+    'qualifier_flags': 'qualifier flags',
+    'qualifier': 'qualifier decl',
+    'qualifiers': 'qualifier decls',
+}
+
+
+@cli.group('cache', cls=PywbemcliGroup, options_metavar=CMD_OPTS_TXT)
+def cache_group():
+    """
+    Command group for caches of the current connection.
+
+    Pywbemcli keeps the classes, class names and qualifier declarations that
+    it retrieves from the WBEM server in a session cache, together with the
+    namespaces, Interop namespace, brand and profiles of the server. In
+    interactive mode, the session cache is kept across commands so that
+    repeated commands do not retrieve these objects again. Additionally,
+    for connections defined in the connections file, classes are kept in a
+    persistent class cache.
+
+    This command group defines commands to inspect and clear these caches,
+    for example when classes have been modified in the WBEM server.
+
+    In addition to the command-specific options shown in this help text, the
+    general options (see 'pywbemcli --help') can also be specified before the
+    'cache' keyword.
+    """
+    pass  # pylint: disable=unnecessary-pass
+
+
+@cache_group.command('show', options_metavar=CMD_OPTS_TXT)
+@click.pass_obj
+def cache_show(context):
+    """
+    Show the content of the session cache.
+
+    Display a table with an entry for each cached result of a request to the
+    WBEM server with the number of CIM objects in the result, from least
+    recently to most recently used.
+    """
+    context.execute_cmd(lambda: cmd_cache_show(context))
+
+
+@cache_group.command('clear', options_metavar=CMD_OPTS_TXT)
+@click.pass_obj
+def cache_clear(context):
+    """
+    Clear the caches of the current connection.
+
+    Remove all objects from the session cache and from the persistent class
+    cache of the current connection, and discard the namespaces, Interop
+    namespace, brand and profiles determined for the WBEM server. They are
+    retrieved again from the WBEM server when next needed.
+    """
+    context.execute_cmd(lambda: cmd_cache_clear(context))
+
+
+################################################################
+#
+#   Common methods for The action functions for the cache click group
+#
+###############################################################
+
+
+def get_pywbem_server(context):
+    """
+    Return the pywbem_server object of the context. The connection to the
+    WBEM server is not established.
+    """
+    if context.pywbem_server is None:
+        raise click.ClickException(
+            'No current connection. To specify a server, use the "--server", '
+            '"--mock-server", or "--name" general options, or in interactive '
+            'mode use "connection select"')
+    return context.pywbem_server
+
+
+################################################################
+#
+#   Common methods for The action functions for the cache click group
+#
+###############################################################
+
+
+def cmd_cache_show(context):
+    """
+    Display the entries of the session cache as a table.
+    """
+    session_cache = get_pywbem_server(context).session_cache
+
+    rows = []
+    for key, size in session_cache.entries():
+        kind, namespace = key[0], key[1]
+        name = key[2] if len(key) > 2 and key[2] else ''
+        rows.append([namespace, CACHE_ENTRY_KINDS.get(kind, kind), name,
+                     size])
+
+    title = 'Session cache: {} objects (maximum {}), {} hits, {} misses' \
+        .format(session_cache.size, session_cache.max_objects,
+                session_cache.hits, session_cache.misses)
+
+    context.spinner_stop()
+    click.echo(format_table(rows, ['Namespace', 'Type', 'Name', 'Objects'],
+                            title=title, table_format=context.output_format))
+
+
+def cmd_cache_clear(context):
+    """
+    Clear the session cache and the persistent class cache of the current
+    connection.
+    """
+    pywbem_server = get_pywbem_server(context)
+    pywbem_server.clear_session_cache()
+    if context.class_cache is not None:
+        context.class_cache.clear()
+
+    if context.verbose:
+        context.spinner_stop()
+        click.echo('Cleared the caches of connection {}'
+                   .format(pywbem_server.name))
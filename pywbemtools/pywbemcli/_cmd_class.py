@@ -23,23 +23,35 @@ NOTE: Commands are ordered in help display by their order in this file.
 
 from __future__ import absolute_import, print_function
 
+from collections import OrderedDict
+import threading
 import click
 
-from pywbem import Error, CIMClassName, CIMError, CIM_ERR_NOT_FOUND, CIMClass
+from pywbem import Error, CIMClassName, CIMError, CIM_ERR_NOT_FOUND, \
+    CIM_ERR_INVALID_CLASS
 from pywbem._nocasedict import NocaseDict
 
 from .pywbemcli import cli
 from ._common import display_cim_objects, filter_namelist, \
     resolve_propertylist, CMD_OPTS_TXT, TABLE_FORMATS, \
     format_table, process_invokemethod, raise_pywbem_error_exception, \
-    warning_msg
+    warning_msg, execute_concurrently
 from ._common_options import add_options, propertylist_option, \
     names_only_option, include_classorigin_class_option, namespace_option,  \
     summary_option, multiple_namespaces_option, association_filter_option, \
-    indication_filter_option, experimental_filter_option
+    indication_filter_option, experimental_filter_option, workers_option
 from ._displaytree import display_class_tree
+from ._class_cache import QUALIFIER_FLAG_BITS
 from ._click_extensions import PywbemcliGroup
 
+# Number of times that a failed deletion of an instance by class delete
+# --force is retried
+DELETE_INSTANCE_RETRIES = 2
+
+# Number of instances deleted by class delete --force between progress
+# messages in verbose mode
+DELETE_PROGRESS_INTERVAL = 1000
+
 
 #
 #   Common option definitions for class group
@@ -178,6 +190,7 @@ def class_get(context, classname, **options):
                    'Some servers may still reject the class deletion. '
                    'Default: Reject command if the class has any instances.')
 @add_options(namespace_option)
+@add_options(workers_option)
 @click.pass_obj
 def class_delete(context, classname, **options):
     """
@@ -190,7 +203,9 @@ def class_delete(context, classname, **options):
     If the class has subclasses, the command is rejected.
 
     If the class has instances, the command is rejected, unless the --force
-    option was specified, in which case the instances are also deleted.
+    option was specified, in which case the instances are also deleted. The
+    --workers option reduces the time to delete many instances by deleting
+    them concurrently. Instance deletions that fail are retried.
 
     WARNING: Deleting classes can cause damage to the server: It can impact
     instance providers and other components in the server. Use this
@@ -351,6 +366,7 @@ def class_associators(context, classname, **options):
 @add_options(association_filter_option)
 @add_options(indication_filter_option)
 @add_options(experimental_filter_option)
+@add_options(workers_option)
 @click.pass_obj
 def class_find(context, classname_glob, **options):
     """
@@ -375,6 +391,9 @@ def class_find(context, classname_glob, **options):
     --output-format general option if it specifies table output. Otherwise
     the classes will be in the form "NAMESPACE:CLASSNAME".
 
+    The --workers option reduces the time to search multiple namespaces by
+    searching them concurrently.
+
     Examples:
 
       pywbemcli -n myconn class find "CIM_*System*" -n interop
@@ -454,55 +473,30 @@ def _build_qualifier_filters(options):
     return qualifier_filters
 
 
-def _filter_classes_for_qualifiers(qualifier_filters, results, names_only, iq):
-    """
-    Filter the results list for the qualifiers defined by filter
-    qualifier: a dictionary with qualifier name as key and Boolean defining
-    whether to display or not display if it exists.
-
-    This method only works for boolean qualifiers
-    """
-
-    filtered_results = []
-    if results:
-        assert isinstance(results[0], CIMClass)
-    for cls in results:
-        assert isinstance(cls, CIMClass)
-        show_this_class = True
-        for qname, show_if_true in qualifier_filters.items():
-            if qname in cls.qualifiers:
-                qvalue = cls.qualifiers[qname].value
-                show_this = True if qvalue == show_if_true else False
-            else:
-                show_this = not show_if_true
-            if not show_this:
-                show_this_class = False
-                break
-        if show_this_class:
-            # If returning instances, honor the names_only option
-            if not names_only:
-                if not iq:
-                    cls.qualifiers = NocaseDict()
-                    for p in cls.properties.values():
-                        p.qualifiers = NocaseDict()
-                    for m in cls.methods.values():
-                        m.qualifiers = NocaseDict()
-                        for p in m.parameters.values():
-                            p.qualifiers = NocaseDict()
-            filtered_results.append(cls)
-    if names_only:
-        filtered_results = [cls.classname for cls in filtered_results]
-    return filtered_results
+def _matches_qualifier_filters(qualifier_filters, flags):
+    """
+    Test whether a class with the qualifier flags defined by flags (a bit mask
+    of QUALIFIER_FLAG_BITS) satisfies the qualifier filters defined by
+    qualifier_filters: a dictionary with qualifier name as key and Boolean
+    defining whether to display or not display if the qualifier is True in
+    the class.
+
+    This method only works for the boolean qualifiers in QUALIFIER_FLAG_BITS
+    """
+    for qname, show_if_true in qualifier_filters.items():
+        if bool(flags & QUALIFIER_FLAG_BITS[qname]) != show_if_true:
+            return False
+    return True
 
 
-def enumerate_classes_filtered(context, classname, options):
+def enumerate_classes_filtered(context, classname, options, conn=None):
     """
     Execute EnumerateClasses or EnumerateClassNames in a single namespace
     defined in options['namespace'] and return results.
 
     If any of the class qualifier filters are defined in the options parameter,
-    enumerate the classes, filter the result for those parameters, and return
-    only class names if --names-only set.
+    filter the result for those parameters using the qualifier flags index of
+    the namespace.
 
     This function may be executed by multiple command action functions with
     varying options in the options. Each option must be tested to validate
@@ -518,6 +512,11 @@ def enumerate_classes_filtered(context, classname, options):
       options:Click options dictionary
         Options that form basis for this Enumerate and filter processing.
 
+      conn:
+        Optional connection to be used for the requests, for example one of
+        the connections from ContextObj.worker_connections(). If None, the
+        connection of the context is used.
+
     Returns:
         List of classes or classnames that satisfy the criteria
 
@@ -531,34 +530,108 @@ def enumerate_classes_filtered(context, classname, options):
 
     iq = options.get('no_qualifiers', True)
 
-    # Force IncludeQualifier true if results are to be filtered since
-    # the filter requires that qualifiers exist.
-    request_iq = True if qualifier_filters else iq
-
     local_only = options.get('local_only', False)
     deep_inheritance = options.get('deep_inheritance', True)
     include_classorigin = options.get('include_classorigin', True)
 
-    if names_only and not qualifier_filters:
-        results = context.conn.EnumerateClassNames(
-            ClassName=classname,
-            namespace=options['namespace'],
-            DeepInheritance=deep_inheritance)
+    # The results are kept in the session cache, so that repeated
+    # enumerations (ex. in interactive mode) are not sent to the server again.
+    conn = conn or context.conn
+    namespace = options['namespace'] or conn.default_namespace
+    cln_key = classname.lower() if classname else None
+    if names_only:
+        results = context.session_cache.get(
+            ('classnames', namespace.lower(), cln_key, deep_inheritance),
+            lambda: conn.EnumerateClassNames(
+                ClassName=classname,
+                namespace=namespace,
+                DeepInheritance=deep_inheritance))
     else:
-        results = context.conn.EnumerateClasses(
-            ClassName=classname,
-            namespace=options['namespace'],
-            LocalOnly=local_only,
-            DeepInheritance=deep_inheritance,
-            IncludeQualifiers=request_iq,
-            IncludeClassOrigin=include_classorigin)
-        if qualifier_filters:
-            results = _filter_classes_for_qualifiers(
-                qualifier_filters, results,
-                names_only, iq)
+        results = context.session_cache.get(
+            ('classes', namespace.lower(), cln_key, local_only,
+             deep_inheritance, iq, include_classorigin),
+            lambda: conn.EnumerateClasses(
+                ClassName=classname,
+                namespace=namespace,
+                LocalOnly=local_only,
+                DeepInheritance=deep_inheritance,
+                IncludeQualifiers=iq,
+                IncludeClassOrigin=include_classorigin))
+
+    # The qualifier filters are evaluated with the qualifier flags index of
+    # the namespace, so that the classes do not need to be retrieved with
+    # their qualifiers for the filters.
+    if qualifier_filters:
+        qualifier_flags = context.get_qualifier_flags(namespace, conn=conn)
+        if names_only:
+            results = [cln for cln in results if _matches_qualifier_filters(
+                qualifier_filters, qualifier_flags.get(cln, 0))]
+        else:
+            results = [cls for cls in results if _matches_qualifier_filters(
+                qualifier_filters, qualifier_flags.get(cls.classname, 0))]
     return results
 
 
+def delete_instances(context, instnames, workers):
+    """
+    Delete the instances defined by the list of instance paths instnames
+    using at most workers connections to the WBEM server concurrently.
+
+    Deletions that fail are retried up to DELETE_INSTANCE_RETRIES times. An
+    instance that no longer exists is considered deleted. In verbose mode,
+    the progress is displayed on stderr every DELETE_PROGRESS_INTERVAL
+    instances.
+
+    Raises:
+        click.ClickException: Some instances could not be deleted. The
+        message includes the number of failed deletions and the first error.
+    """
+    total = len(instnames)
+    deleted = [0]
+    lock = threading.Lock()
+
+    def delete_instance(conn, instname):
+        """
+        Delete one instance. Return None if it was deleted or the pywbem
+        Error exception otherwise.
+        """
+        try:
+            conn.DeleteInstance(instname)
+        except CIMError as ce:
+            if ce.status_code != CIM_ERR_NOT_FOUND:
+                return ce
+        except Error as er:
+            return er
+        with lock:
+            deleted[0] += 1
+            if context.verbose and (
+                    deleted[0] % DELETE_PROGRESS_INTERVAL == 0 or
+                    deleted[0] == total):
+                click.echo('Deleted {} of {} instances'.format(deleted[0],
+                                                               total),
+                           err=True)
+        return None
+
+    context.spinner_stop()
+    conns = context.worker_connections(workers)
+    failed = instnames
+    try:
+        for _ in range(DELETE_INSTANCE_RETRIES + 1):
+            errors = execute_concurrently(conns, delete_instance, failed)
+            failed_errors = [(instname, er) for instname, er in
+                             zip(failed, errors) if er is not None]
+            failed = [instname for instname, _ in failed_errors]
+            if not failed:
+                return
+    finally:
+        context.close_worker_connections(conns)
+
+    instname, er = failed_errors[0]
+    raise click.ClickException(
+        'Delete rejected; {} of {} instance deletes failed. First error: '
+        '{}: {}'.format(len(failed), total, instname, er))
+
+
 #####################################################################
 #
 #  Command functions for each of the commands in the class group
@@ -719,23 +792,30 @@ def cmd_class_find(context, classname_glob, options):
 
     context.spinner_stop()
 
-    namespaces = get_namespaces(context, options['namespace'])
-
+    namespaces = get_namespaces(context, options['namespace']) or []
+
+    # Set cmd options that are required for this command to get
+    # information on classes in server.
+    # 1. Always use deep_inheritance
+    # 2. Set namespace to each namespace searched
+    options['deep_inheritance'] = True
+    options['names_only'] = True
+
+    def find_classnames(conn, namespace):
+        """
+        Return the names of the classes in namespace that match the
+        classname_glob and the filter options.
+        """
+        ns_options = dict(options, namespace=namespace)
+        classnames = enumerate_classes_filtered(context, None, ns_options,
+                                                conn=conn)
+        return filter_namelist(classname_glob, classnames)
+
+    conns = context.worker_connections(options['workers'])
     try:
-        names_dict = {}
-        if namespaces:
-            for namespace in namespaces:
-                # Set cmd options that are required for this command to get
-                # information on classes in server.
-                # 1. Always use deep_inheritance
-                # 2. Set namespace to each namespace in loop
-                options['deep_inheritance'] = True
-                options['namespace'] = namespace
-                options['names_only'] = True
-
-                classnames = enumerate_classes_filtered(context, None, options)
-                names_dict[namespace] = filter_namelist(classname_glob,
-                                                        classnames)
+        names_dict = OrderedDict(zip(
+            namespaces,
+            execute_concurrently(conns, find_classnames, namespaces)))
 
         # build rows of namespace, classname for each namespace, sort if
         # necessary,  and add to common rows
@@ -763,77 +843,107 @@ def cmd_class_find(context, classname_glob, options):
 
     except Error as er:
         raise_pywbem_error_exception(er)
+    finally:
+        context.close_worker_connections(conns)
 
 
 def cmd_class_tree(context, classname, options):
     """
-    Execute the command to enumerate classes from the top or starting at the
-    classname argument. Then format the results to be displayed as a
-    left-justified tree using the asciitree library.
+    Execute the command to display the class hierarchy from the top or
+    starting at the classname argument as a left-justified tree using the
+    asciitree library.
     The --superclasses option determines if the superclass tree or the
     subclass tree is displayed.
+
+    Both trees are built from the superclass index of the namespace, which
+    is retrieved with a single request and shared with other commands.
     """
+    if options['superclasses'] and classname is None:
+        raise click.ClickException('CLASSNAME argument required for '
+                                   '--superclasses option')
+
     try:
+        superclass_index = context.get_superclass_index(options['namespace'])
+
         if options['superclasses']:
-            if classname is None:
-                raise click.ClickException('CLASSNAME argument required for '
-                                           '--superclasses option')
-
-            # get the superclasses into a list
-            class_ = context.conn.GetClass(classname,
-                                           namespace=options['namespace'])
-            classes = []
-            classes.append(class_)
-            while class_.superclass:
-                class_ = context.conn.GetClass(class_.superclass,
-                                               namespace=options['namespace'])
-                classes.append(class_)
+            if classname not in superclass_index:
+                raise CIMError(
+                    CIM_ERR_NOT_FOUND,
+                    'Class {0} not found in namespace {1}.'.format(
+                        classname, options['namespace'] or
+                        context.conn.default_namespace))
+            # The superclass chain of the class, from its top class
+            cn_subcn = NocaseDict()
+            cn = classname
+            while cn:
+                supercn = superclass_index[cn]
+                cn_subcn[supercn or ''] = [cn]
+                cn = supercn
             classname = None
 
         else:
-            # get the subclass hierarchy either complete or starting at the
-            # optional CLASSNAME
-            classes = context.conn.EnumerateClasses(
-                ClassName=classname,
-                namespace=options['namespace'],
-                DeepInheritance=True)
+            if classname and classname not in superclass_index:
+                raise CIMError(
+                    CIM_ERR_INVALID_CLASS,
+                    'Class {0} not found in namespace {1}.'.format(
+                        classname, options['namespace'] or
+                        context.conn.default_namespace))
+            cn_subcn = context.get_subclass_index(options['namespace'])
     except Error as er:
         raise_pywbem_error_exception(er)
 
-    # display the list of classes as a tree. The classname is the top
+    # display the class hierarchy as a tree. The classname is the top
     # of the tree.
     context.spinner_stop()
-    display_class_tree(classes, classname)
+    display_class_tree(cn_subcn, classname)
 
 
 def cmd_class_delete(context, classname, options):
     """Delete a class from the WBEM server repository"""
-    if options['namespace']:
-        classname = CIMClassName(classname, namespace=options['namespace'])
+    conn = context.conn
+    namespace = options['namespace']
+    cln = classname
+    if namespace:
+        classname = CIMClassName(classname, namespace=namespace)
 
     try:
-        instnames = context.conn.EnumerateInstanceNames(classname)
-        subclassnames = context.conn.EnumerateClassNames(ClassName=classname,
-                                                         DeepInheritance=True)
+        instnames = conn.PyWbemcliEnumerateInstancePaths(
+            cln, namespace=namespace, MaxObjectCount=context.pull_max_cnt)
+        subclassnames = conn.EnumerateClassNames(ClassName=classname,
+                                                 DeepInheritance=True)
     except Error as er:
         raise_pywbem_error_exception(er)
 
     if subclassnames:
         raise click.ClickException('Delete rejected; subclasses exist')
 
-    if not options['force']:
-        if instnames:
+    if instnames:
+        if not options['force']:
             raise click.ClickException('Delete rejected; instances exist')
-    else:
-        for instname in instnames:
-            context.conn.DeleteInstance(instname)
 
-    instnames = context.conn.EnumerateInstanceNames(classname)
-    if instnames:
-        raise click.ClickException('Delete rejected; instance delete failed')
+        delete_instances(context, instnames, options['workers'])
+
+        # Count the remaining instances without retaining their paths
+        try:
+            instnames = conn.PyWbemcliIterEnumerateInstancePaths(
+                cln, namespace=namespace, MaxObjectCount=context.pull_max_cnt)
+            remaining = sum(1 for _ in instnames)
+        except Error as er:
+            raise_pywbem_error_exception(er)
+        if remaining:
+            raise click.ClickException(
+                'Delete rejected; instance delete failed')
 
     try:
         context.conn.DeleteClass(classname)
+        # The cached classes of the namespace no longer reflect the server
+        namespace = options['namespace'] or context.conn.default_namespace
+        context.session_cache.invalidate(
+            namespace,
+            kinds=('class', 'classes', 'classnames', 'superclasses',
+                   'subclasses', 'qualifier_flags'))
+        if context.class_cache is not None:
+            context.class_cache.invalidate(namespace)
         if context.verbose:
             context.spinner_stop()
             click.echo('Deleted class {}.'.format(classname))
@@ -24,15 +24,22 @@ NOTE: Commands are ordered in help display by their order in this file.
 
 from __future__ import absolute_import, print_function
 
+import time
+import socket
+import ssl
 from copy import deepcopy
+from multiprocessing.pool import ThreadPool
+from timeit import default_timer
 import click
 import six
+from six.moves.urllib.parse import urlparse
 
-from pywbem import Error
+from pywbem import Error, CIMError, BaseOperationRecorder
 
 from .pywbemcli import cli
 from ._common import CMD_OPTS_TXT, pick_one_from_list, format_table, \
-    hide_empty_columns, raise_pywbem_error_exception
+    hide_empty_columns, raise_pywbem_error_exception, select_connections, \
+    fold_string
 from ._pywbem_server import PywbemServer
 from ._connection_repository import ConnectionRepository
 from ._context_obj import ContextObj
@@ -185,8 +192,30 @@ def connection_select(context, name, **options):
 
 
 @connection_group.command('test', options_metavar=CMD_OPTS_TXT)
+@click.option('-c', '--connections', 'patterns', type=str, multiple=True,
+              metavar='PATTERN',
+              help='Test the connection definitions in the connections file '
+                   'whose names match the shell-style wildcard pattern '
+                   'PATTERN (e.g. "bmc*") instead of the current connection. '
+                   'May be specified multiple times.')
+@click.option('--all', 'all_', is_flag=True, default=False,
+              help='Test all connection definitions in the connections file '
+                   'instead of the current connection.')
+@click.option('--workers', type=click.IntRange(1), default=10,
+              metavar='INTEGER',
+              help='Maximum number of connection definitions that are tested '
+                   'concurrently. Default: 10.')
+@click.option('--probe-timeout', type=click.IntRange(1), default=10,
+              metavar='INTEGER',
+              help='Timeout in seconds for connecting and for each request '
+                   'when testing a connection definition. Default: 10.')
+@click.option('--sort-by', type=click.Choice(['name', 'latency']),
+              default='name',
+              help='Sort the tested connection definitions by name or by '
+                   'the latency of the response of their WBEM server. '
+                   'Default: name.')
 @click.pass_obj
-def connection_test(context):
+def connection_test(context, **options):
     """
     Test the current connection with a predefined WBEM request.
 
@@ -194,11 +223,27 @@ def connection_test(context):
     the current connection to confirm that the connection exists and is
     working.
 
+    If the --connections or --all options are specified, the connection
+    definitions of the connections file that are selected by these options
+    are tested instead, concurrently and each with its own connection to its
+    WBEM server. The result is displayed in a table with the status, the time
+    to establish the TCP connection (including the TLS handshake for https)
+    and the latency of the response to the EnumerateClassNames operation
+    from sending its HTTP request to receiving the HTTP response, both in
+    milliseconds, and the brand of the WBEM server. Since pywbem opens a new
+    connection for each request, the latency also includes the time to
+    establish that connection. The exit code of
+    the command is 1 if the test failed for any connection definition. Since
+    the command cannot prompt for passwords, the connection definitions must
+    include the password if they define a user.
+
     Examples:
 
       pywbemcli --name mysrv connection test
+
+      pywbemcli connection test --all --sort-by latency
     """
-    context.execute_cmd(lambda: cmd_connection_test(context))
+    context.execute_cmd(lambda: cmd_connection_test(context, options))
 
 
 @connection_group.command('save', options_metavar=CMD_OPTS_TXT)
@@ -466,14 +511,21 @@ def cmd_connection_show(context, name, options):
                                 show_password=options['show_password'])
 
 
-def cmd_connection_test(context):
+def cmd_connection_test(context, options):
     """
     Test the current connection with a single command on the default_namespace.
     Uses enumerateClassNames against current workspace as most general
     possible operations that should work on all servers that support class
     operation. Even if class operations are not supported, a return from the
     server such as "unsupported" indicates the server exists.
+
+    If connection definitions are selected with the options, test these
+    connection definitions concurrently instead.
     """
+    if options['patterns'] or options['all_']:
+        cmd_connection_test_multiple(context, options)
+        return
+
     try:
         context.conn.EnumerateClassNames()
         context.spinner_stop()
@@ -482,6 +534,161 @@ def cmd_connection_test(context):
         raise_pywbem_error_exception(er)
 
 
+def cmd_connection_test_multiple(context, options):
+    """
+    Test the connection definitions of the connections file selected by
+    the options concurrently and display the results as a table.
+    """
+    connections = ConnectionRepository()
+    names = select_connections(
+        connections, None if options['all_'] else options['patterns'])
+    servers = [connections[name] for name in names]
+    timeout = options['probe_timeout']
+
+    pool = ThreadPool(min(options['workers'], len(servers)))
+    try:
+        results = pool.map(lambda server: probe_connection(server, timeout),
+                           servers)
+    finally:
+        pool.close()
+        pool.join()
+
+    rows = [[server.name, server.server or 'mock', fold_string(status, 60),
+             format_msec(connect_time), format_msec(latency), brand]
+            for server, (status, connect_time, latency, brand)
+            in zip(servers, results)]
+    if options['sort_by'] == 'latency':
+        # Connection definitions that failed are displayed last
+        rows = [row for _, row in sorted(
+            zip(results, rows),
+            key=lambda item: (item[0][2] is None, item[0][2] or 0,
+                              item[1][0]))]
+
+    failed = len([result for result in results if result[2] is None])
+    context.spinner_stop()
+    click.echo(format_table(
+        rows, ['Name', 'Server', 'Status', 'Connect (ms)', 'Response (ms)',
+               'Brand'],
+        title='Connection test for {} connections, {} failed'.
+        format(len(rows), failed),
+        table_format=context.output_format))
+    if failed:
+        click.get_current_context().exit(1)
+
+
+def probe_connection(server, timeout):
+    """
+    Test the WBEM server of the connection definition server (a PywbemServer
+    object) with a new connection that uses the timeout in seconds.
+
+    Returns:
+        tuple(status, connect_time, latency, brand): The status text, the
+        time in seconds to establish the TCP connection and TLS session (None
+        for a mock server), the latency in seconds of the response to the
+        EnumerateClassNames operation measured by a ResponseTimeRecorder
+        (None if the test failed), and the
+        brand of the WBEM server (None if it could not be determined). An
+        invalid URL of the connection definition is reported in the status.
+    """
+    server = PywbemServer.create(replace_underscores=True, **server.to_dict())
+    server.timeout = timeout
+    connect_time = None
+    try:
+        if not server.mock_server:
+            connect_time = measure_connect_time(server.server, timeout)
+        server.create_connection()
+        recorder = ResponseTimeRecorder()
+        server.conn.add_operation_recorder(recorder)
+        try:
+            server.conn.EnumerateClassNames()
+        except CIMError:
+            pass  # The WBEM server exists and responded
+        latency = recorder.response_time
+    except (Error, socket.error, click.ClickException, ValueError) as exc:
+        return 'Failed: {}'.format(exc), connect_time, None, None
+
+    try:
+        brand = server.wbem_server.brand
+    except Error:
+        brand = None
+    return 'OK', connect_time, latency, brand
+
+
+class ResponseTimeRecorder(BaseOperationRecorder):
+    """
+    Operation recorder that measures the response time of the first WBEM
+    operation executed on a connection, from sending its HTTP request to
+    receiving the HTTP response. This excludes the time for building the
+    CIM-XML request and for parsing the response. For a mock WBEM server,
+    which does not use HTTP, the time of the whole operation is measured.
+    """
+
+    def __init__(self):
+        self.response_time = None
+        self._start_time = None
+        self._request_time = None
+        super(ResponseTimeRecorder, self).__init__()
+
+    def stage_pywbem_args(self, method, **kwargs):
+        super(ResponseTimeRecorder, self).stage_pywbem_args(method, **kwargs)
+        if self._start_time is None:
+            self._start_time = default_timer()
+
+    def stage_http_request(self, conn_id, version, url, target, method,
+                           headers, payload):
+        # pylint: disable=too-many-arguments
+        super(ResponseTimeRecorder, self).stage_http_request(
+            conn_id, version, url, target, method, headers, payload)
+        if self._request_time is None:
+            self._request_time = default_timer()
+
+    def stage_http_response2(self, payload):
+        super(ResponseTimeRecorder, self).stage_http_response2(payload)
+        # pywbem stages an empty response when staging the request
+        if payload is not None and self.response_time is None:
+            self.response_time = default_timer() - self._request_time
+
+    def record(self, pywbem_args, pywbem_result, http_request, http_response):
+        if self._request_time is None and self.response_time is None:
+            # The mock WBEM server does not use HTTP
+            self.response_time = default_timer() - self._start_time
+
+
+def measure_connect_time(url, timeout):
+    """
+    Return the time in seconds to establish a TCP connection to the WBEM
+    server with the URL url, including the TLS handshake if the scheme of
+    the URL is https. The certificate of the WBEM server is not verified,
+    since the handshake is only timed.
+
+    Raises:
+        socket.error: The connection could not be established within the
+          timeout in seconds.
+        ValueError: The port in the URL is invalid.
+    """
+    parsed_url = urlparse(url if '://' in url else 'http://' + url)
+    use_tls = parsed_url.scheme.lower() == 'https'
+    port = parsed_url.port or (5989 if use_tls else 5988)
+
+    start_time = time.time()
+    sock = socket.create_connection((parsed_url.hostname, port), timeout)
+    try:
+        if use_tls:
+            ssl_context = ssl.create_default_context()
+            ssl_context.check_hostname = False
+            ssl_context.verify_mode = ssl.CERT_NONE
+            sock = ssl_context.wrap_socket(sock,
+                                           server_hostname=parsed_url.hostname)
+        return time.time() - start_time
+    finally:
+        sock.close()
+
+
+def format_msec(seconds):
+    """Return a time in seconds as a string in milliseconds, or None."""
+    return None if seconds is None else '{:.1f}'.format(seconds * 1000)
+
+
 def cmd_connection_select(context, name, options):
     """
     Select an existing connection to use as the current WBEM server. This
@@ -500,7 +707,8 @@ def cmd_connection_select(context, name, options):
                          context.pull_max_cnt,
                          context.timestats,
                          context.log,
-                         context.verbose)
+                         context.verbose,
+                         context.stats_file)
 
     # Update the root context making this context the basis for future
     # commands in the current interactive session
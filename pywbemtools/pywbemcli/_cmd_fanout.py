@@ -0,0 +1,187 @@
+# (C) Copyright 2020 IBM Corp.
+# (C) Copyright 2020 Inova Development Inc.
+# All Rights Reserved
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""
+Click Command definition for the fanout command, which executes a pywbemcli
+command for multiple connection definitions of the connections file
+concurrently.
+"""
+
+from __future__ import absolute_import, print_function
+
+import os
+import sys
+import time
+import threading
+from contextlib import contextmanager
+from multiprocessing.pool import ThreadPool
+import click
+from six import StringIO
+
+from .pywbemcli import cli, execute_batch_command
+from ._common import CMD_OPTS_TXT, TABLE_FORMATS, format_table, \
+    select_connections
+from ._context_obj import ContextObj
+from ._connection_repository import ConnectionRepository
+
+# Commands that cannot be executed by the fanout command
+DISALLOWED_CMDS = ('agent', 'batch', 'connection', 'fanout', 'repl')
+
+
+@cli.command('fanout', options_metavar=CMD_OPTS_TXT,
+             context_settings=dict(ignore_unknown_options=True,
+                                   allow_interspersed_args=False))
+@click.option('-c', '--connections', 'patterns', type=str, multiple=True,
+              metavar='PATTERN',
+              help='Select the connection definitions whose names match the '
+                   'shell-style wildcard pattern PATTERN (e.g. "bmc*"). '
+                   'May be specified multiple times. '
+                   'Default: All connection definitions.')
+@click.option('--workers', type=click.IntRange(1), default=10,
+              metavar='INTEGER',
+              help='Maximum number of connection definitions for which the '
+                   'command is executed concurrently. Default: 10.')
+@click.argument('command_args', nargs=-1, type=click.UNPROCESSED,
+                metavar='COMMAND [ARGS]...')
+@click.pass_context
+def fanout(ctx, patterns, workers, command_args):
+    """
+    Execute a command for multiple WBEM connection definitions.
+
+    Execute the pywbemcli command COMMAND with its arguments ARGS for each
+    connection definition in the connections file that is selected with the
+    --connections option, as if it was specified with the --name general
+    option. The command is executed for multiple connection definitions
+    concurrently, each with its own connection to its WBEM server.
+
+    The output of the command for all connection definitions is displayed in
+    a table with the connection name, exit code, execution time, standard
+    output and standard error of the command, using the output format of the
+    --output-format general option if it is a table format. The exit code of
+    the fanout command is 1 if the command failed for any connection
+    definition and otherwise 0.
+
+    The connection definitions must include the password if they define a
+    user, since the command cannot prompt for passwords.
+
+    Example:
+
+      pywbemcli fanout -c "bmc*" --workers 20 server brand
+    """
+    if not command_args:
+        raise click.ClickException('No command specified')
+    names = select_connections(ConnectionRepository(), patterns)
+    group_ctx = ctx.parent or ctx
+
+    with captured_output() as (stdout, stderr):
+
+        def execute(name):
+            """Execute the command for a connection definition."""
+            stdout.set_buffer(StringIO())
+            stderr.set_buffer(StringIO())
+            start_time = time.time()
+            try:
+                exit_code = execute_batch_command(
+                    group_ctx, ['--name', name] + list(command_args),
+                    mode='fanout', disallowed_cmds=DISALLOWED_CMDS)
+            finally:
+                elapsed = time.time() - start_time
+                out = stdout.set_buffer(None).getvalue()
+                err = stderr.set_buffer(None).getvalue()
+            return [name, exit_code, '{:.3f}'.format(elapsed), out.rstrip(),
+                    err.rstrip()]
+
+        pool = ThreadPool(min(workers, len(names)))
+        try:
+            rows = pool.map(execute, names)
+        finally:
+            pool.close()
+            pool.join()
+
+    output_format = ctx.obj.output_format if ctx.obj else None
+    if output_format not in TABLE_FORMATS:
+        output_format = 'simple'
+    failed = len([row for row in rows if row[1]])
+    title = 'Command "{}" for {} connections, {} failed'. \
+        format(' '.join(command_args), len(rows), failed)
+    click.echo(format_table(
+        rows, ['Connection', 'Exit code', 'Time (s)', 'Output', 'Error'],
+        title=title, table_format=output_format))
+    if failed:
+        ctx.exit(1)
+
+
+class ThreadOutputStream(object):
+    # pylint: disable=useless-object-inheritance
+    """
+    Text stream that writes to a buffer of the current thread if one has
+    been set for it with set_buffer(), and otherwise to the stream it
+    replaces. This captures the output of the commands executed concurrently
+    in multiple threads separately.
+    """
+
+    def __init__(self, stream):
+        self._stream = stream
+        self._local = threading.local()
+
+    def set_buffer(self, buffer_):
+        """
+        Set the buffer of the current thread (None for no buffer) and return
+        the previous buffer.
+        """
+        old_buffer = getattr(self._local, 'buffer', None)
+        self._local.buffer = buffer_
+        return old_buffer
+
+    def _target(self):
+        buffer_ = getattr(self._local, 'buffer', None)
+        return self._stream if buffer_ is None else buffer_
+
+    def write(self, text):
+        """Write text to the buffer of the thread or to the stream."""
+        return self._target().write(text)
+
+    def flush(self):
+        """Flush the buffer of the thread or the stream."""
+        self._target().flush()
+
+    def isatty(self):
+        """Captured output is not written to a terminal."""
+        target = self._target()
+        return target is self._stream and target.isatty()
+
+    def __getattr__(self, name):
+        return getattr(self._stream, name)
+
+
+@contextmanager
+def captured_output():
+    """
+    Context manager that replaces sys.stdout and sys.stderr with
+    ThreadOutputStream objects and disables the spinner.
+    """
+    saved_streams = sys.stdout, sys.stderr
+    saved_spinner = os.environ.get(ContextObj.spinner_envvar)
+    sys.stdout = ThreadOutputStream(sys.stdout)
+    sys.stderr = ThreadOutputStream(sys.stderr)
+    os.environ[ContextObj.spinner_envvar] = '0'
+    try:
+        yield sys.stdout, sys.stderr
+    finally:
+        sys.stdout, sys.stderr = saved_streams
+        if saved_spinner is None:
+            del os.environ[ContextObj.spinner_envvar]
+        else:
+            os.environ[ContextObj.spinner_envvar] = saved_spinner
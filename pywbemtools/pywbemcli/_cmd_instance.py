@@ -32,13 +32,13 @@ from ._common import display_cim_objects, parse_wbemuri_str, \
     pick_instance, resolve_propertylist, create_ciminstance, \
     filter_namelist, CMD_OPTS_TXT, format_table, verify_operation, \
     process_invokemethod, raise_pywbem_error_exception, \
-    create_ciminstancename, warning_msg
+    create_ciminstancename, warning_msg, execute_concurrently
 
 from ._common_options import add_options, propertylist_option, \
     names_only_option, include_classorigin_instance_option, namespace_option, \
     summary_option, verify_option, multiple_namespaces_option, \
     association_filter_option, indication_filter_option, \
-    experimental_filter_option
+    experimental_filter_option, workers_option
 from .config import DEFAULT_QUERY_LANGUAGE
 from ._click_extensions import PywbemcliGroup
 from ._cmd_class import get_namespaces, enumerate_classes_filtered
@@ -141,6 +141,18 @@ filter_query_option = [              # pylint: disable=invalid-name
                       'By default, and when traditional operations are used, '
                       'no such filtering takes place.')]
 
+stream_option = [              # pylint: disable=invalid-name
+    click.option('--stream', is_flag=True, required=False, default=False,
+                 help='Display each object as soon as it is received from '
+                      'the server instead of retrieving the complete result '
+                      'before displaying it. The objects are not sorted. '
+                      'When pull operations are used, the number of objects '
+                      'held in memory is bounded by the --pull-max-cnt '
+                      'general option. Table formats are displayed as a '
+                      'sequence of tables of limited size. '
+                      'Default: Retrieve and sort the complete result before '
+                      'displaying it.')]
+
 
 ##########################################################################
 #
@@ -179,6 +191,7 @@ def instance_group():
 @add_options(summary_option)
 @add_options(filter_query_option)
 @add_options(filter_query_language_option)
+@add_options(stream_option)
 @click.pass_obj
 def instance_enumerate(context, classname, **options):
     """
@@ -380,6 +393,7 @@ def instance_modify(context, instancename, **options):
 @add_options(summary_option)
 @add_options(filter_query_option)
 @add_options(filter_query_language_option)
+@add_options(stream_option)
 @click.pass_obj
 def instance_associators(context, instancename, **options):
     """
@@ -437,6 +451,7 @@ def instance_associators(context, instancename, **options):
 @add_options(summary_option)
 @add_options(filter_query_option)
 @add_options(filter_query_language_option)
+@add_options(stream_option)
 @click.pass_obj
 def instance_references(context, instancename, **options):
     """
@@ -542,6 +557,7 @@ def instance_invokemethod(context, instancename, methodname, **options):
               format(default=DEFAULT_QUERY_LANGUAGE))
 @add_options(namespace_option)
 @add_options(summary_option)
+@add_options(stream_option)
 @click.pass_obj
 def instance_query(context, query, **options):
     """
@@ -566,6 +582,7 @@ def instance_query(context, query, **options):
 @add_options(experimental_filter_option)
 @click.option('-s', '--sort', is_flag=True, required=False,
               help='Sort by instance count. Otherwise sorted by class name.')
+@add_options(workers_option)
 @click.pass_obj
 def instance_count(context, classname, **options):
     """
@@ -593,7 +610,9 @@ def instance_count(context, classname, **options):
     insensitive string "system".
 
     This command can take a long time to execute since it potentially
-    enumerates all instance names for all classes in all namespaces.
+    enumerates all instance names for all classes in all namespaces. The
+    --workers option reduces that time by enumerating the instance names of
+    multiple classes concurrently.
     """
     context.execute_cmd(lambda: cmd_instance_count(context, classname, options))
 
@@ -699,8 +718,7 @@ def get_instancename(context, instancename, options):
         assert classname is not None  # should be ensured by regexp
 
         try:
-            cim_class = context.conn.GetClass(classname, LocalOnly=False,
-                                              IncludeQualifiers=True)
+            cim_class = context.get_class(classname)
             instancepath = create_ciminstancename(cim_class, options['key'])
             instancepath.namespace = namespace
 
@@ -788,8 +806,7 @@ def cmd_instance_create(context, classname, options):
     """
     ns = options['namespace'] or context.conn.default_namespace
     try:
-        class_ = context.conn.GetClass(
-            classname, namespace=ns, LocalOnly=False)
+        class_ = context.get_class(classname, namespace=ns)
     except CIMError as ce:
         if ce.status_code == CIM_ERR_NOT_FOUND:
             raise click.ClickException('CIMClass: "{}" does not exist in '
@@ -845,8 +862,7 @@ def cmd_instance_modify(context, instancename, options):
     ns = options['namespace'] or context.conn.default_namespace
 
     try:
-        class_ = context.conn.GetClass(
-            instancepath.classname, namespace=ns, LocalOnly=False)
+        class_ = context.get_class(instancepath.classname, namespace=ns)
     except CIMError as ce:
         if ce.status_code == CIM_ERR_NOT_FOUND:
             raise click.ClickException(
@@ -916,16 +932,22 @@ def cmd_instance_enumerate(context, classname, options):
     Enumerate CIM instances or CIM instance names
 
     """
+    stream = options['stream']
+    conn = context.conn
     try:
         if options['names_only']:
-            results = context.conn.PyWbemcliEnumerateInstancePaths(
+            enum_paths = conn.PyWbemcliIterEnumerateInstancePaths if stream \
+                else conn.PyWbemcliEnumerateInstancePaths
+            results = enum_paths(
                 ClassName=classname,
                 namespace=options['namespace'],
                 FilterQuery=options['filter_query'],
                 FilterQueryLanguage=get_filterquerylanguage(options),
                 MaxObjectCount=context.pull_max_cnt)
         else:
-            results = context.conn.PyWbemcliEnumerateInstances(
+            enum_insts = conn.PyWbemcliIterEnumerateInstances if stream \
+                else conn.PyWbemcliEnumerateInstances
+            results = enum_insts(
                 ClassName=classname,
                 namespace=options['namespace'],
                 LocalOnly=options['local_only'],
@@ -963,9 +985,13 @@ def cmd_instance_references(context, instancename, options):
     if instancepath is None:
         return
 
+    stream = options['stream']
+    conn = context.conn
     try:
         if options['names_only']:
-            results = context.conn.PyWbemcliReferenceInstancePaths(
+            ref_paths = conn.PyWbemcliIterReferenceInstancePaths if stream \
+                else conn.PyWbemcliReferenceInstancePaths
+            results = ref_paths(
                 instancepath,
                 ResultClass=options['result_class'],
                 Role=options['role'],
@@ -973,7 +999,9 @@ def cmd_instance_references(context, instancename, options):
                 FilterQueryLanguage=get_filterquerylanguage(options),
                 MaxObjectCount=context.pull_max_cnt)
         else:
-            results = context.conn.PyWbemcliReferenceInstances(
+            ref_insts = conn.PyWbemcliIterReferenceInstances if stream \
+                else conn.PyWbemcliReferenceInstances
+            results = ref_insts(
                 instancepath,
                 ResultClass=options['result_class'],
                 Role=options['role'],
@@ -1007,9 +1035,13 @@ def cmd_instance_associators(context, instancename, options):
     if instancepath is None:
         return
 
+    stream = options['stream']
+    conn = context.conn
     try:
         if options['names_only']:
-            results = context.conn.PyWbemcliAssociatorInstancePaths(
+            assoc_paths = conn.PyWbemcliIterAssociatorInstancePaths \
+                if stream else conn.PyWbemcliAssociatorInstancePaths
+            results = assoc_paths(
                 instancepath,
                 AssocClass=options['assoc_class'],
                 Role=options['role'],
@@ -1019,7 +1051,9 @@ def cmd_instance_associators(context, instancename, options):
                 FilterQueryLanguage=get_filterquerylanguage(options),
                 MaxObjectCount=context.pull_max_cnt)
         else:
-            results = context.conn.PyWbemcliAssociatorInstances(
+            assoc_insts = conn.PyWbemcliIterAssociatorInstances if stream \
+                else conn.PyWbemcliAssociatorInstances
+            results = assoc_insts(
                 instancepath,
                 AssocClass=options['assoc_class'],
                 Role=options['role'],
@@ -1084,30 +1118,39 @@ def cmd_instance_count(context, classname, options):
     # alphabetic order.
     ns_cln_tuples.sort(key=lambda tup: (tup[0], tup[1]))
 
-    display_data = []
-    for tup in ns_cln_tuples:
-        ns = tup[0]
-        cln = tup[1]
+    def count_instances(conn, tup):
+        """
+        Return the number of instances of the class defined by tup (a tuple
+        of namespace, classname) with exactly that classname, i.e. not
+        including subclasses. The instance paths are counted as they are
+        received and are not retained.
+        """
+        ns, cln = tup
+        clnl = cln.lower()
         # Try block allows issues where enumerate does not properly execute
         # The totals may be wrong but at least it gets what it can.
         # This accounts for issues with some servers where there
         # are providers that return errors from the enumerate.
         try:
-            inst_names = context.conn.EnumerateInstanceNames(cln, namespace=ns)
+            inst_names = conn.PyWbemcliIterEnumerateInstancePaths(
+                cln, namespace=ns, MaxObjectCount=context.pull_max_cnt)
+            return sum(1 for inst_name in inst_names
+                       if inst_name.classname.lower() == clnl)
         except CIMError as ce:
             warning_msg('Server Error {} with {}:{}. Continuing.'
                         .format(ce, ns, cln))
+            return 0
 
-        # Sum the number of instances with the defined classname.
-        # this counts only classes with that specific classname and not
-        # subclasses
-        clnl = cln.lower()
-        count = sum(1 for inst_name in inst_names
-                    if (inst_name.classname.lower() == clnl))
+    conns = context.worker_connections(options['workers'])
+    try:
+        counts = execute_concurrently(conns, count_instances, ns_cln_tuples)
+    except Error as er:
+        raise_pywbem_error_exception(er)
+    finally:
+        context.close_worker_connections(conns)
 
-        if count != 0:
-            display_tuple = (ns, cln, count)
-            display_data.append(display_tuple)
+    display_data = [(ns, cln, count) for (ns, cln), count
+                    in zip(ns_cln_tuples, counts) if count != 0]
 
     # If sort set, resort by count size
     if options['sort']:
@@ -1128,8 +1171,11 @@ def cmd_instance_count(context, classname, options):
 def cmd_instance_query(context, query, options):
     """Execute the query defined by the inputs"""
 
+    conn = context.conn
+    query_insts = conn.PyWbemcliIterQueryInstances if options['stream'] \
+        else conn.PyWbemcliQueryInstances
     try:
-        results = context.conn.PyWbemcliQueryInstances(
+        results = query_insts(
             options['query_language'],
             query,
             namespace=options['namespace'],
@@ -105,8 +105,11 @@ def cmd_qualifier_get(context, qualifiername, options):
     Execute the command for get qualifier and display result
     """
     try:
-        qual_decl = context.conn.GetQualifier(qualifiername,
-                                              namespace=options['namespace'])
+        conn = context.conn
+        namespace = options['namespace'] or conn.default_namespace
+        qual_decl = context.session_cache.get(
+            ('qualifier', namespace.lower(), qualifiername.lower()),
+            lambda: conn.GetQualifier(qualifiername, namespace=namespace))
 
         display_cim_objects(context, qual_decl,
                             qual_outputformat(context.output_format))
@@ -120,8 +123,11 @@ def cmd_qualifier_enumerate(context, options):
     Execute the command for enumerate qualifiers and desplay the result.
     """
     try:
-        qual_decls = sort_cimobjects(context.conn.EnumerateQualifiers(
-            namespace=options['namespace']))
+        conn = context.conn
+        namespace = options['namespace'] or conn.default_namespace
+        qual_decls = sort_cimobjects(context.session_cache.get(
+            ('qualifiers', namespace.lower()),
+            lambda: conn.EnumerateQualifiers(namespace=namespace)))
 
         display_cim_objects(context, qual_decls, context.output_format,
                             summary=options['summary'])
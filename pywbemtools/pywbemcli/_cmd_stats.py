@@ -0,0 +1,214 @@
+# (C) Copyright 2020 IBM Corp.
+# (C) Copyright 2020 Inova Development Inc.
+# All Rights Reserved
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""
+Click Command definition for the stats command group which includes
+cmds to summarize and compare the statistics files written with the
+--stats-file general option.
+
+NOTE: Commands are ordered in help display by their order in this file.
+"""
+
+from __future__ import absolute_import, print_function
+
+import fnmatch
+import click
+
+from .pywbemcli import cli
+from ._common import CMD_OPTS_TXT, format_table
+from ._common_options import add_options
+from ._click_extensions import PywbemcliGroup
+from ._statistics import OperationStatistics, read_statistics_file
+
+# Record items by which the operations can be grouped, with the column
+# header for the group names
+GROUP_BY_CHOICES = {
+    'operation': 'Operation',
+    'connection': 'Connection',
+    'namespace': 'Namespace',
+    'server': 'Server',
+}
+
+stats_options = [              # pylint: disable=invalid-name
+    click.option('--by', type=click.Choice(sorted(GROUP_BY_CHOICES)),
+                 default='operation',
+                 help='Group the operations by operation name, connection '
+                      'definition name, namespace or WBEM server URL. '
+                      'Default: operation.'),
+    click.option('-c', '--connections', 'patterns', type=str, multiple=True,
+                 metavar='PATTERN',
+                 help='Include only the operations of the connection '
+                      'definitions whose names match the shell-style '
+                      'wildcard pattern PATTERN (e.g. "bmc*"). '
+                      'May be specified multiple times. '
+                      'Default: All operations.')]
+
+
+@cli.group('stats', cls=PywbemcliGroup, options_metavar=CMD_OPTS_TXT)
+def stats_group():
+    """
+    Command group for WBEM operation statistics files.
+
+    Pywbemcli appends a record for each WBEM operation to a statistics file
+    if the --stats-file general option is specified. The records include the
+    operation name, connection definition name, namespace, client and server
+    time, request and reply size, number of returned objects and whether the
+    operation raised an exception.
+
+    This command group defines commands to summarize and compare statistics
+    files, e.g. to track the response times of WBEM servers over time. These
+    commands do not use a WBEM server.
+
+    In addition to the command-specific options shown in this help text, the
+    general options (see 'pywbemcli --help') can also be specified before the
+    'stats' keyword.
+    """
+    pass  # pylint: disable=unnecessary-pass
+
+
+@stats_group.command('summary', options_metavar=CMD_OPTS_TXT)
+@click.argument('files', type=click.Path(exists=True, dir_okay=False),
+                metavar='FILE...', nargs=-1, required=True)
+@add_options(stats_options)
+@click.pass_obj
+def stats_summary(context, files, **options):
+    """
+    Summarize statistics files.
+
+    Display the statistics of the operations in the statistics files FILE
+    in the format of the --timestats general option, grouped as defined by
+    the --by option.
+
+    Examples:
+
+      pywbemcli stats summary --by connection stats-week1.jsonl
+    """
+    cmd_stats_summary(context, files, options)
+
+
+@stats_group.command('compare', options_metavar=CMD_OPTS_TXT)
+@click.argument('file1', type=click.Path(exists=True, dir_okay=False),
+                metavar='FILE1', required=True)
+@click.argument('file2', type=click.Path(exists=True, dir_okay=False),
+                metavar='FILE2', required=True)
+@add_options(stats_options)
+@click.pass_obj
+def stats_compare(context, file1, file2, **options):
+    """
+    Compare two statistics files.
+
+    Display the number of operations and the 50th and 99th percentile of the
+    client time of the operations in the statistics files FILE1 and FILE2,
+    grouped as defined by the --by option, and the change of the percentiles
+    from FILE1 to FILE2.
+
+    Examples:
+
+      pywbemcli stats compare stats-week1.jsonl stats-week2.jsonl
+    """
+    cmd_stats_compare(context, file1, file2, options)
+
+
+################################################################
+#
+#   Common methods for The action functions for the stats click group
+#
+###############################################################
+
+
+def load_statistics(file_paths, options):
+    """
+    Return an OperationStatistics object with the operations in the
+    statistics files file_paths selected by the options, grouped as defined
+    by the options. All times are kept, so that the percentiles are exact and
+    the same for each invocation.
+    """
+    statistics = OperationStatistics(sample_size=None)
+    patterns = options['patterns']
+    for file_path in file_paths:
+        try:
+            for record in read_statistics_file(file_path):
+                if patterns and not [
+                        p for p in patterns if fnmatch.fnmatchcase(
+                            record.get('connection') or '', p)]:
+                    continue
+                statistics.record(
+                    record.get(options['by']) or 'unknown',
+                    record['client_time'],
+                    server_time=record.get('server_time'),
+                    request_len=record.get('request_len') or 0,
+                    reply_len=record.get('reply_len') or 0,
+                    object_count=record.get('object_count') or 0,
+                    exception=record.get('exception', False))
+        except (IOError, OSError, ValueError) as exc:
+            raise click.ClickException(str(exc))
+    return statistics
+
+
+################################################################
+#
+#   stats command processors
+#
+###############################################################
+
+
+def cmd_stats_summary(context, files, options):
+    """
+    Display the statistics of the operations in the statistics files.
+    """
+    statistics = load_statistics(files, options)
+    if not statistics.snapshot():
+        raise click.ClickException('No operations in the statistics files')
+    click.echo(context.format_statistics(
+        statistics, name_header=GROUP_BY_CHOICES[options['by']]))
+
+
+def cmd_stats_compare(context, file1, file2, options):
+    """
+    Display the comparison of the operations in two statistics files.
+    """
+
+    def format_change(value1, value2):
+        """Display the relative change from value1 to value2"""
+        if value1 is None or value2 is None or not value1:
+            return None
+        return '{0:+.1f}%'.format((value2 - value1) * 100.0 / value1)
+
+    stats1 = {stat.name: stat for stat in
+              load_statistics([file1], options).snapshot()}
+    stats2 = {stat.name: stat for stat in
+              load_statistics([file2], options).snapshot()}
+
+    rows = []
+    for name in sorted(set(stats1) | set(stats2)):
+        row = [name]
+        for stat in (stats1.get(name), stats2.get(name)):
+            row.append(stat.count if stat else 0)
+        for percent in (50, 99):
+            values = [stat.time.percentile(percent) if stat else None
+                      for stat in (stats1.get(name), stats2.get(name))]
+            row.extend(['{0:.3f}'.format(value) if value is not None
+                        else None for value in values])
+            row.append(format_change(*values))
+        rows.append(row)
+
+    headers = [GROUP_BY_CHOICES[options['by']], 'Count 1', 'Count 2',
+               'p50 1', 'p50 2', 'p50 change', 'p99 1', 'p99 2',
+               'p99 change']
+    click.echo(format_table(
+        rows, headers,
+        title='Comparison of {} (1) and {} (2): Time in sec.'.
+        format(file1, file2),
+        table_format=context.output_format))
@@ -21,11 +21,12 @@ from __future__ import absolute_import, print_function, unicode_literals
 
 import fnmatch
 import re
+from types import GeneratorType
 from textwrap import fill
 from operator import itemgetter
 import six
+from six.moves import queue
 import click
-import tabulate
 
 from pywbem import CIMInstanceName, CIMInstance, CIMClass, \
     CIMQualifierDeclaration, CIMProperty, CIMClassName, \
@@ -33,7 +34,9 @@ from pywbem import CIMInstanceName, CIMInstance, CIMClass, \
 from pywbem.cim_obj import mofstr
 from pywbem.cim_obj import NocaseDict
 
-from .config import USE_TERMINAL_WIDTH, DEFAULT_TABLE_WIDTH
+from .config import USE_TERMINAL_WIDTH, DEFAULT_TABLE_WIDTH, \
+    DEFAULT_TABLE_CHUNK_SIZE
+from ._profile import profiled_phase, profile_phase, active_profile
 
 # Same as in pywbem.cimobj.py
 try:
@@ -265,6 +268,26 @@ def is_classname(str_):
     return not re.match(r'[a-zA_Z0-9_].*\.', str_)
 
 
+def select_connections(connections, patterns):
+    """
+    Return the sorted names of the connection definitions in the connection
+    repository connections that match any of the shell-style wildcard
+    patterns, or all names if there are no patterns.
+
+    Raises:
+        click.ClickException: No connection definition matches.
+    """
+    names = sorted(name for name in connections
+                   if not patterns or
+                   [p for p in patterns if fnmatch.fnmatchcase(name, p)])
+    if not names:
+        raise click.ClickException(
+            "No connection definitions in connections file '{}' match "
+            "'{}'".format(connections.connections_file,
+                          "', '".join(patterns or ['*'])))
+    return names
+
+
 def filter_namelist(pattern, name_list, ignore_case=True):
     """
     Filter out names in name_list that do not match glob pattern compiled
@@ -733,9 +756,7 @@ def process_invokemethod(context, objectname, methodname, options):
         if isinstance(objectname, (CIMClassName, CIMInstanceName)) \
         else objectname
 
-    cim_class = context.conn.GetClass(
-        classname,
-        namespace=options['namespace'], LocalOnly=False)
+    cim_class = context.get_class(classname, namespace=options['namespace'])
 
     cim_methods = cim_class.methods
     if methodname not in cim_methods:
@@ -761,6 +782,57 @@ def process_invokemethod(context, objectname, methodname, options):
             click.echo('{}={}'.format(pname, val[0]))
 
 
+def execute_concurrently(conns, func, items):
+    """
+    Execute func(conn, item) for each item in items and return the list of
+    results in the order of items.
+
+    The items are distributed over the connections in conns, with one worker
+    thread per connection so that each connection is used by only one thread
+    at a time. If conns has only one connection, the items are processed
+    sequentially in the current thread.
+
+    An exception raised by func for any item is raised by this function
+    after the worker threads have terminated.
+
+    Parameters:
+      conns (list of :class:`~pywbem.WBEMConnection`):
+        Connections to be used, for example from
+        ContextObj.worker_connections().
+
+      func (callable):
+        Function called with a connection and an item.
+
+      items (list):
+        The items to be processed.
+    """
+    if len(conns) <= 1 or len(items) <= 1:
+        return [func(conns[0], item) for item in items]
+
+    idle_conns = queue.Queue()
+    for conn in conns:
+        idle_conns.put(conn)
+
+    def _execute(item):
+        """Execute func for one item with an idle connection."""
+        conn = idle_conns.get()
+        try:
+            return func(conn, item)
+        finally:
+            idle_conns.put(conn)
+
+    # Imported only when needed, to keep the startup time low
+    # pylint: disable=import-outside-toplevel
+    from multiprocessing.pool import ThreadPool
+    pool = ThreadPool(min(len(conns), len(items)))
+    try:
+        return pool.map(_execute, items)
+    finally:
+        pool.close()
+        pool.join()
+
+
+@profiled_phase('sort_cimobjects')
 def sort_cimobjects(cim_objects):
     """
     Sort lists of CIMClass, CIMCLassName, CIMQualifierDecl, CIMInstance or
@@ -805,27 +877,87 @@ def display_cim_objects_summary(context, objects):
     """
     Display a summary of the objects received. This only displays the
     count.
+
+    The objects may be a list or a generator. The objects from a generator
+    are counted as they are received and are not retained.
     """
     context.spinner_stop()
 
     # default when displaying cim objects is mof
     output_format = context.output_format or 'mof'
 
-    if objects:
-        cim_type = get_cimtype(objects)
+    if isinstance(objects, GeneratorType):
+        count = 0
+        cim_type = None
+        for obj in objects:
+            if cim_type is None:
+                cim_type = get_cimtype([obj])
+            count += 1
+    else:
+        count = len(objects) if objects else 0
+        cim_type = get_cimtype(objects) if objects else None
 
+    if count:
         if output_format_is_table(output_format):
-            rows = [[len(objects), cim_type]]
+            rows = [[count, cim_type]]
             click.echo(format_table(rows, ['Count', 'CIM Type'],
                                     title='Summary of {} returned'
                                     .format(cim_type),
                                     table_format=output_format))
             return
-        click.echo('{} {}(s) returned'.format(len(objects), cim_type))
+        click.echo('{} {}(s) returned'.format(count, cim_type))
     else:
         click.echo('0 objects returned')
 
 
+def display_cim_objects_iter(context, cim_objects,
+                             chunk_size=DEFAULT_TABLE_CHUNK_SIZE):
+    """
+    Display the CIM objects produced by a generator, outputting each object
+    as soon as it is received rather than collecting the complete result
+    first. The objects are displayed in the order received; they are not
+    sorted.
+
+    Table output formats require the rows of a table to determine the column
+    widths so in that case the objects are displayed as a sequence of tables
+    of at most chunk_size rows each.
+
+    Parameters:
+      context (:class:`ContextObj`):
+        Click context contained in ContextObj object.
+
+      cim_objects (generator):
+        Generator that yields the CIM objects to be displayed, for example
+        the result of one of the PyWbemcliIter<...> methods.
+
+      chunk_size (:term:`integer`):
+        Maximum number of rows in each table for table output formats.
+    """
+    context.spinner_stop()
+
+    # default when displaying cim objects is mof
+    output_format = context.output_format or 'mof'
+
+    count = 0
+    if output_format in TABLE_FORMATS:
+        chunk = []
+        for obj in cim_objects:
+            chunk.append(obj)
+            count += 1
+            if len(chunk) >= chunk_size:
+                _print_objects_as_table(context, chunk)
+                chunk = []
+        if chunk:
+            _print_objects_as_table(context, chunk)
+    else:
+        for obj in cim_objects:
+            display_cim_objects(context, obj, output_format=output_format)
+            count += 1
+
+    if not count and context.verbose:
+        click.echo("No objects returned")
+
+
 def display_cim_objects(context, cim_objects, output_format=None, summary=False,
                         sort=False):
     """
@@ -867,6 +999,11 @@ def display_cim_objects(context, cim_objects, output_format=None, summary=False,
       summary(:class:`py:bool`):
         Boolean that defines whether the data in objects should be displayed
         or just a summary of the objects (ex. count of number of objects).
+
+      sort(:class:`py:bool`):
+        Boolean that defines whether a list of objects is sorted before it
+        is displayed. Objects from a generator are never sorted; they are
+        displayed as they are received (see display_cim_objects_iter).
     """
     context.spinner_stop()
 
@@ -874,6 +1011,10 @@ def display_cim_objects(context, cim_objects, output_format=None, summary=False,
         display_cim_objects_summary(context, cim_objects)
         return
 
+    if isinstance(cim_objects, GeneratorType):
+        display_cim_objects_iter(context, cim_objects)
+        return
+
     if not cim_objects and context.verbose:
         context.spinner_stop()
         click.echo("No objects returned")
@@ -1079,8 +1220,99 @@ def _print_qual_decls_as_table(qual_decls, table_width, table_format):
                             table_format=table_format))
 
 
+# CIM types of the scalar property values that are converted only once for
+# each distinct value when formatting the cells of an instance table, because
+# their values are typically repeated (e.g. values of properties with value
+# maps)
+MEMOIZED_CELL_TYPES = ('boolean', 'char16', 'uint8', 'uint16', 'uint32',
+                       'uint64', 'sint8', 'sint16', 'sint32', 'sint64')
+
+# Characters of string values that are escaped in mof output
+MOF_ESCAPED_CHARS = re.compile(u'[\x01-\x1f"\'\\\\]')
+
+
+def _instance_table_columns(insts):
+    """
+    Return the columns of the table of the instances in insts, as a list of
+    the CIMProperty objects of the first occurrence of each property name in
+    the instances (case insensitively), in the order of their first
+    occurrence. The CIMProperty object defines the header and the type of the
+    column.
+
+    Raises ValueError if insts includes objects that are not CIMInstance.
+    """
+    columns = []
+    names = set()
+    for inst in insts:
+        if not isinstance(inst, CIMInstance):
+            raise ValueError('Only accepts CIMInstance; not type {}'
+                             .format(type(inst)))
+        for prop in inst.properties.values():
+            lname = prop.name.lower()
+            if lname not in names:
+                names.add(lname)
+                columns.append(prop)
+    return columns
+
+
+def _cell_formatter(cim_type, is_array, max_cell_width):
+    """
+    Return a function that formats a property value (not None) of the CIM
+    type and array-ness for a cell of an instance table. The format is
+    consistent with mof output. Scalar values of the types in
+    MEMOIZED_CELL_TYPES are formatted only once for each distinct value.
+    """
+    def format_value(value):
+        """Format the value for a cell"""
+        val_str, _ = _value_tomof(value, cim_type, indent=0,
+                                  maxline=max_cell_width, line_pos=0,
+                                  end_space=0, avoid_splits=False)
+        return val_str
+
+    if cim_type == 'string' and not is_array:
+
+        def format_string(value):
+            """Format the value for a cell, without folding if it fits"""
+            if isinstance(value, six.text_type) and \
+                    len(value) + 2 <= max_cell_width and \
+                    not MOF_ESCAPED_CHARS.search(value):
+                return u'"' + value + u'"'
+            return format_value(value)
+
+        return format_string
+
+    if is_array or cim_type not in MEMOIZED_CELL_TYPES:
+        return format_value
+
+    cache = {}
+
+    def format_memoized(value):
+        """Format the value for a cell, or return its cached format"""
+        try:
+            return cache[value]
+        except KeyError:
+            val_str = cache[value] = format_value(value)
+            return val_str
+
+    return format_memoized
+
+
+def _profiled_cell_formatter(formatter, profile):
+    """
+    Return a function that calls the cell formatter in the phase _value_tomof
+    of the profile.
+    """
+    def format_profiled(value):
+        """Format the value for a cell in the phase of the profile"""
+        with profile.phase('_value_tomof'):
+            return formatter(value)
+
+    return format_profiled
+
+
+@profiled_phase('_format_instances_as_rows')
 def _format_instances_as_rows(insts, max_cell_width=DEFAULT_MAX_CELL_WIDTH,
-                              include_classes=False):
+                              include_classes=False, columns=None):
     """
     Format the list of instances properties into as a list of the property
     values for each instance( a row of the table) gathered into a list of
@@ -1094,6 +1326,11 @@ def _format_instances_as_rows(insts, max_cell_width=DEFAULT_MAX_CELL_WIDTH,
 
     Formatting is consistent with mof output for each value.
 
+    columns is the list of columns returned by _instance_table_columns() for
+    insts. If None, it is determined from insts. The columns are the union of
+    the properties of the instances. Cells of properties an instance does not
+    have and of properties without value are empty strings.
+
     NOTE: This is a separate function to allow testing of the table formatting
     independently of print output.
 
@@ -1104,41 +1341,49 @@ def _format_instances_as_rows(insts, max_cell_width=DEFAULT_MAX_CELL_WIDTH,
     # Avoid crash deeper in code if max_cell_width is None.
     if max_cell_width is None:
         max_cell_width = DEFAULT_MAX_CELL_WIDTH
+    if columns is None:
+        columns = _instance_table_columns(insts)
+
+    # The formatting of the cells is profiled only if a profile is active,
+    # since it is executed for every cell
+    profile = active_profile()
+
+    # Select the formatter of each column once, by the type of the column.
+    # The formatters are looked up by the property names in the case of the
+    # instances, and by the lower-cased property names if that fails.
+    formatters = {}
+    for index, col in enumerate(columns):
+        formatter = _cell_formatter(col.type, col.is_array, max_cell_width)
+        if profile is not None:
+            formatter = _profiled_cell_formatter(formatter, profile)
+        formatters[col.name.lower()] = (index, col.type, col.is_array,
+                                        formatter)
+
+    empty_line = [u''] * len(columns)
     lines = []
-    prop_names = []
-
-    # find instance with max number of properties
-    for inst in insts:
-        pn = inst.keys()
-        if len(pn) > len(prop_names):
-            prop_names = pn
-
     for inst in insts:
-        if not isinstance(inst, CIMInstance):
-            raise ValueError('Only accepts CIMInstance; not type {}'
-                             .format(type(inst)))
+        line = list(empty_line)
+        for prop in inst.properties.values():
+            value = prop.value
+            if value is None:
+                continue
+            try:
+                index, cim_type, is_array, formatter = formatters[prop.name]
+            except KeyError:
+                formatters[prop.name] = formatters[prop.name.lower()]
+                index, cim_type, is_array, formatter = formatters[prop.name]
+            if prop.type != cim_type or prop.is_array != is_array:
+                # The property has a different type than in the instance
+                # that defined the column
+                formatter = _cell_formatter(prop.type, prop.is_array,
+                                            max_cell_width)
+                if profile is not None:
+                    formatter = _profiled_cell_formatter(formatter, profile)
+            line[index] = formatter(value)
 
         # Insert classname as first col if flag set
-        line = [inst.classname] if include_classes else []
-
-        # get value for each property in this object
-        for name in prop_names:
-            # Account for possible instances without all properties
-            # Outputs empty  string.  Note that instance with no value
-            # results in same output as not instance name.
-            if name not in inst.properties:
-                val_str = ''
-            else:
-                value = inst.get(name)
-                p = inst.properties[name]
-                if value is None:
-                    val_str = u''
-                else:
-                    val_str, _ = _value_tomof(p.value, p.type, indent=0,
-                                              maxline=max_cell_width,
-                                              line_pos=0, end_space=0,
-                                              avoid_splits=False)
-            line.append(val_str)
+        if include_classes:
+            line.insert(0, inst.classname)
         lines.append(line)
 
     return lines
@@ -1149,7 +1394,7 @@ def _print_instances_as_table(insts, table_width, table_format,
     """
     Print the properties of the instances defined in insts as a table where
     each row is an instance and each column is a property value.  The properties
-    are formatted similar to mof output. All properties in the instance are
+    are formatted similar to mof output. All properties in the instances are
     included.
 
     The header line consists of property names.
@@ -1158,13 +1403,11 @@ def _print_instances_as_table(insts, table_width, table_format,
     if table_width is None:
         table_width = DEFAULT_TABLE_WIDTH
 
-    # Find instance with max number of prop names to determine number
-    # of columns
-    prop_names = []
-    for inst in insts:
-        pn = inst.keys()
-        if len(pn) > len(prop_names):
-            prop_names = pn
+    try:
+        columns = _instance_table_columns(insts)
+    except ValueError:
+        raise ValueError('Only CIMInstance display allows table output')
+    prop_names = [col.name for col in columns]
 
     # Try to estimate max cell width from number of cols
     # This allows folding long data.  However it is incomplete in
@@ -1190,12 +1433,9 @@ def _print_instances_as_table(insts, table_width, table_format,
         else:
             new_header_line.append(header)
 
-    for inst in insts:
-        if not isinstance(inst, CIMInstance):
-            raise ValueError('Only CIMInstance display allows table output')
-
     rows = _format_instances_as_rows(insts, max_cell_width=max_cell_width,
-                                     include_classes=include_classes)
+                                     include_classes=include_classes,
+                                     columns=columns)
 
     title = 'Instances: {}'.format(insts[0].classname)
     click.echo(format_table(rows, new_header_line, title=title,
@@ -1530,7 +1770,10 @@ def format_table(rows, headers, title=None, table_format='simple',
         raise click.ClickException('Invalid table format {}.'
                                    .format(table_format))
 
-    result = tabulate.tabulate(rows, headers, tablefmt=table_format)
+    # Imported only when needed, to keep the startup time low
+    import tabulate  # pylint: disable=import-outside-toplevel
+    with profile_phase('tabulate'):
+        result = tabulate.tabulate(rows, headers, tablefmt=table_format)
     if title:
         if table_format == 'html':
             result = '<p>{0}</p>\n{1}'.format(title, result)
@@ -85,6 +85,15 @@ multiple_namespaces_option = [              # pylint: disable=invalid-name
                       'May be specified multiple times. '
                       'Default: Search in all namespaces of the server.')]
 
+workers_option = [              # pylint: disable=invalid-name
+    click.option('--workers', type=click.IntRange(1), default=1,
+                 required=False, metavar='INTEGER',
+                 help='Number of connections to the WBEM server used to '
+                      'execute the requests of this command concurrently. '
+                      'With a mock server, requests are always executed '
+                      'sequentially. '
+                      'Default: 1 (execute requests sequentially).')]
+
 #
 #  The following options are implement the filtering of class request
 #  operations to filter by selected class qualifiers
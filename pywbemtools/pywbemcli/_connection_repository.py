@@ -19,14 +19,37 @@ a file that maintains defined connections. If any exist they are
 loaded at startup and available through an interactive session.  Functions
 are provided to create, delete, and view existing connections. A set function
 allows setting the current active connection into the repository.
+
+Since parsing a large connections file is slow, the parsed content of the
+connections file is kept in a cache file next to it (the connections file name
+with suffix '.cache'), which is used as long as the SHA-256 hash of the
+content of the connections file is unchanged. The cache file is in JSON
+format, so that reading a cache file planted in the directory of the
+connections file (by default, the current directory) cannot execute code.
+
+Updates of the connections file are serialized between pywbemcli processes by
+locking a lock file next to it (the connections file name with suffix
+'.lock'). An update is applied to the current content of the connections
+file, so that concurrent updates of different connection definitions are not
+lost.
 """
 
 from __future__ import absolute_import, print_function
 
 import os
+import json
+import shutil
+import hashlib
+from contextlib import contextmanager
 import yaml
 import six
 
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+    import msvcrt  # pylint: disable=import-error
+
 from ._pywbem_server import PywbemServer
 
 if six.PY2:
@@ -37,6 +60,65 @@ DEFAULT_CONNECTIONS_FILE = 'pywbemcli_connection_definitions.yaml'
 
 DEFAULT_CONNECTIONS_PATH = os.path.join(os.getcwd(), DEFAULT_CONNECTIONS_FILE)
 
+# Use the YAML loader and dumper of the LibYAML C library if available, since
+# they are much faster than the pure Python implementations.
+YAML_LOADER = getattr(yaml, 'CSafeLoader', yaml.SafeLoader)
+YAML_DUMPER = getattr(yaml, 'CSafeDumper', yaml.SafeDumper)
+
+
+@contextmanager
+def file_lock(lock_file):
+    """
+    Context manager that holds an exclusive lock on the file lock_file,
+    which is created if it does not exist. This serializes the code in its
+    context between processes.
+    """
+    with open(lock_file, 'a') as fp:
+        if fcntl:
+            fcntl.flock(fp.fileno(), fcntl.LOCK_EX)
+        else:
+            fp.seek(0)
+            msvcrt.locking(fp.fileno(), msvcrt.LK_LOCK, 1)
+        try:
+            yield
+        finally:
+            if fcntl:
+                fcntl.flock(fp.fileno(), fcntl.LOCK_UN)
+            else:
+                fp.seek(0)
+                msvcrt.locking(fp.fileno(), msvcrt.LK_UNLCK, 1)
+
+
+def replace_file(src, dst):
+    """
+    Rename the file src to dst, replacing dst if it exists.
+    """
+    if six.PY2:
+        if os.name == 'nt' and os.path.isfile(dst):
+            os.remove(dst)
+        os.rename(src, dst)
+    else:
+        os.replace(src, dst)  # pylint: disable=no-member
+
+
+def file_signature(data):
+    """
+    Return the signature of a file from its content (a byte string), that
+    changes when the file is modified.
+    """
+    return hashlib.sha256(data).hexdigest()
+
+
+def read_file_signature(file_path):
+    """
+    Return the signature of the file file_path, or None if it cannot be read.
+    """
+    try:
+        with open(file_path, 'rb') as fp:
+            return file_signature(fp.read())
+    except (IOError, OSError):
+        return None
+
 
 class ConnectionRepository(object):
     # pylint: disable=useless-object-inheritance
@@ -49,6 +131,7 @@ class ConnectionRepository(object):
     _pywbemcli_servers = {}
     _loaded = False
     _connections_file = None
+    _connections_file_signature = None
     connections_group_name = 'connection_definitions'
     default_connection_grp_name = 'default_connection_name'
 
@@ -112,8 +195,8 @@ class ConnectionRepository(object):
         return self._pywbemcli_servers[key]
 
     def __delitem__(self, key):
-        del self._pywbemcli_servers[key]
-        self._write_file()
+        with self._update():
+            del ConnectionRepository._pywbemcli_servers[key]
 
     def __len__(self):
         return len(ConnectionRepository._pywbemcli_servers)
@@ -153,36 +236,140 @@ class ConnectionRepository(object):
         for item in six.iteritems(self._pywbemcli_servers):
             yield item[1]
 
+    @property
+    def cache_file(self):
+        """
+        Return the path name of the cache file of the connections file.
+        """
+        return '{}.cache'.format(self._connections_file)
+
+    @property
+    def lock_file(self):
+        """
+        Return the path name of the lock file of the connections file.
+        """
+        return '{}.lock'.format(self._connections_file)
+
+    def reload(self):
+        """
+        Read the connections file again if it has been modified since it was
+        read, for a pywbemcli process that executes commands for a long time
+        or that updates the connections file.
+
+        The PywbemServer objects of connection definitions that did not change
+        are kept, so that their connections to the WBEM servers are kept.
+        """
+        signature = read_file_signature(self._connections_file)
+        if signature == ConnectionRepository._connections_file_signature:
+            return
+
+        old_servers = ConnectionRepository._pywbemcli_servers
+        ConnectionRepository._pywbemcli_servers = {}
+        ConnectionRepository.default_connection_name = None
+        self._read_connections_file()
+        for name, svr in list(ConnectionRepository._pywbemcli_servers.items()):
+            old_svr = old_servers.get(name)
+            if old_svr is not None and old_svr.to_dict() == svr.to_dict():
+                ConnectionRepository._pywbemcli_servers[name] = old_svr
+
     def _read_connections_file(self):
         """
         If there is a file, read it in and install into the dictionary.
 
+        The content of the file is taken from the cache file if it is valid
+        for the file, and otherwise the file is parsed and the cache file is
+        written.
         """
+        ConnectionRepository._connections_file_signature = None
         if os.path.isfile(self._connections_file):
-            with self.open_file(self._connections_file, 'r') as _fp:
+            with open(self._connections_file, 'rb') as _fp:
+                data = _fp.read()
+            signature = file_signature(data)
+            ConnectionRepository._connections_file_signature = signature
+            dict_ = self._read_cache_file(signature)
+            if dict_ is None:
                 try:
-                    dict_ = yaml.safe_load(_fp)
-                    # put all the connection definitions into a group
-                    # in the connection file
-                    connections_dict = dict_[
-                        ConnectionRepository.connections_group_name]
-
-                    ConnectionRepository.default_connection_name = dict_[
-                        ConnectionRepository.default_connection_grp_name]
-                    try:
-                        for name, svr in six.iteritems(connections_dict):
-                            ConnectionRepository._pywbemcli_servers[name] = \
-                                PywbemServer.create(
-                                    replace_underscores=True, **svr)
-                            ConnectionRepository._loaded = True
-                    except KeyError as ke:
-                        raise KeyError("Items missing from record %s in "
-                                       "connections file %s" %
-                                       (ke, self._connections_file))
-                except ValueError as ve:
+                    # The YAML loader decodes the UTF-8 encoded content
+                    dict_ = yaml.load(data, Loader=YAML_LOADER)
+                except yaml.YAMLError as ye:
                     raise ValueError("Invalid YAML in connections file %s. "
                                      "Exception %s" %
-                                     (self._connections_file, ve))
+                                     (self._connections_file, ye))
+                self._write_cache_file(signature, dict_)
+            try:
+                # put all the connection definitions into a group
+                # in the connection file
+                connections_dict = dict_[
+                    ConnectionRepository.connections_group_name]
+
+                ConnectionRepository.default_connection_name = dict_[
+                    ConnectionRepository.default_connection_grp_name]
+                try:
+                    for name, svr in six.iteritems(connections_dict):
+                        ConnectionRepository._pywbemcli_servers[name] = \
+                            PywbemServer.create(
+                                replace_underscores=True, **svr)
+                        ConnectionRepository._loaded = True
+                except KeyError as ke:
+                    raise KeyError("Items missing from record %s in "
+                                   "connections file %s" %
+                                   (ke, self._connections_file))
+            except (ValueError, TypeError) as ve:
+                raise ValueError("Invalid YAML in connections file %s. "
+                                 "Exception %s" %
+                                 (self._connections_file, ve))
+
+    def _read_cache_file(self, signature):
+        """
+        Return the content of the connections file from the cache file, or
+        None if there is no cache file for the connections file with the
+        signature or if it cannot be read.
+        """
+        try:
+            with open(self.cache_file, 'r') as fp:
+                cache = json.load(fp)
+            if cache['signature'] == signature:
+                return cache['data']
+        except (IOError, OSError, ValueError, TypeError, KeyError):
+            # Missing or invalid cache file
+            pass
+        return None
+
+    def _write_cache_file(self, signature, dict_):
+        """
+        Write the content of the connections file with the signature to the
+        cache file. Failures are ignored, since the cache file only speeds up
+        reading the connections file. The cache file is not written if the
+        content cannot be represented in JSON without change (e.g. YAML
+        timestamps or non-string keys).
+        """
+        cache = {'signature': signature, 'data': dict_}
+        try:
+            cache_data = json.dumps(cache)
+            if json.loads(cache_data) != cache:
+                return
+        except (TypeError, ValueError):
+            return
+        tmpfile = '{}.{}.tmp'.format(self.cache_file, os.getpid())
+        try:
+            with open(tmpfile, 'w') as fp:
+                fp.write(cache_data)
+            replace_file(tmpfile, self.cache_file)
+        except (IOError, OSError):
+            if os.path.isfile(tmpfile):
+                os.remove(tmpfile)
+
+    @contextmanager
+    def _update(self):
+        """
+        Context manager for updating the connection definitions. The update
+        is made with the lock file locked, to the current content of the
+        connections file, which is then written.
+        """
+        with file_lock(self.lock_file):
+            self.reload()
+            yield
+            self._write_file()
 
     def add(self, name, svr_definition):
         """
@@ -191,16 +378,20 @@ class ConnectionRepository(object):
         they do not want to replace an existing entry.
         """
         assert svr_definition.mock_server is not None  # must be empty list
-        ConnectionRepository._pywbemcli_servers[name] = svr_definition
-        self._write_file()
+        with self._update():
+            ConnectionRepository._pywbemcli_servers[name] = svr_definition
 
     def delete(self, name):  # pylint: disable=no-self-use
-        """Delete a definition from the connections repository"""
-        del ConnectionRepository._pywbemcli_servers[name]
-        # remove default_name if it is the one being deleted
-        if name == self.default_connection_name:
-            self.default_connection_name = None
-        self._write_file()
+        """
+        Delete a definition from the connections repository. A definition that
+        has already been deleted (e.g. by another pywbemcli process) is
+        ignored.
+        """
+        with self._update():
+            ConnectionRepository._pywbemcli_servers.pop(name, None)
+            # remove default_name if it is the one being deleted
+            if name == ConnectionRepository.default_connection_name:
+                ConnectionRepository.default_connection_name = None
 
     @staticmethod
     def open_file(filename, file_mode='w'):
@@ -238,45 +429,56 @@ class ConnectionRepository(object):
         Write the connections file if one has been loaded.
         If the dictionary is empty, it attempts to delete the file.
 
-        If there is an existing file it is moved to filename.bak and a new
-        current file written.
+        If there is an existing file it is copied to filename.bak and the
+        new content is written to a temporary file that then replaces the
+        file, so that concurrent pywbemcli processes never see a partially
+        written or missing file. The cache file is updated with the new
+        content.
+
+        This method must be called with the lock file locked.
         """
         conn_dict = {}
         if self._pywbemcli_servers:
             if ConnectionRepository._pywbemcli_servers:
                 conn_dict = \
-                    {name: value.to_dict() for name, value in
+                    {name: dict(value.to_dict()) for name, value in
                      ConnectionRepository._pywbemcli_servers.items()}
 
             # build dictionary for yaml output
             yaml_dict = {ConnectionRepository.connections_group_name: conn_dict,
                          ConnectionRepository.default_connection_grp_name:
-                             self.default_connection_name}
+                             ConnectionRepository.default_connection_name}
 
             # Write to tmpfile and if successful create backup file and
             # move the tmpfile to be the new connections file contents.
             tmpfile = '{}.tmp'.format(self._connections_file)
 
             with self.open_file(tmpfile, 'w') as _fp:
-                data = yaml.safe_dump(yaml_dict,
-                                      encoding=None,
-                                      allow_unicode=True,
-                                      default_flow_style=False,
-                                      indent=4)
+                data = yaml.dump(yaml_dict,
+                                 Dumper=YAML_DUMPER,
+                                 encoding=None,
+                                 allow_unicode=True,
+                                 default_flow_style=False,
+                                 indent=4)
                 data = data.replace('\n\n', '\n')  # YAML dump dups newlines
                 _fp.write(data)
                 _fp.flush()
 
-        # create bak file and then rename tmp file
-        if os.path.isfile(self._connections_file):
-            bakfile = '{}.bak'.format(self._connections_file)
-            if os.path.isfile(bakfile):
-                os.remove(bakfile)
-            if os.path.isfile(self._connections_file):
-                os.rename(self._connections_file, bakfile)
-
+        # create bak file and then replace the file with the tmp file
+        bakfile = '{}.bak'.format(self._connections_file)
         if self._pywbemcli_servers:
-            os.rename(tmpfile, self._connections_file)
+            if os.path.isfile(self._connections_file):
+                shutil.copyfile(self._connections_file, bakfile)
+            replace_file(tmpfile, self._connections_file)
+            signature = read_file_signature(self._connections_file)
+            self._write_cache_file(signature, yaml_dict)
+        else:
+            signature = None
+            if os.path.isfile(self._connections_file):
+                replace_file(self._connections_file, bakfile)
+            if os.path.isfile(self.cache_file):
+                os.remove(self.cache_file)
+        ConnectionRepository._connections_file_signature = signature
 
     def set_default_connection(self, connection_name):
         """
@@ -286,15 +488,14 @@ class ConnectionRepository(object):
         This is accomplished by modifying the "current_connection" entry
         and rewriting the file.
         """
-        if connection_name in self._pywbemcli_servers:
+        with self._update():
+            if connection_name not in self._pywbemcli_servers:
+                # TODO should "Default failed be part of this message"?
+                raise ValueError('Connection name "{}" does not exist in '
+                                 'connection repository {}'
+                                 .format(connection_name,
+                                         self.connections_file))
             ConnectionRepository.default_connection_name = connection_name
-            self._write_file()
-
-        else:
-            # TODO should "Default failed be part of this message"?
-            raise ValueError('Connection name "{}" does not exist in '
-                             'connection repository {}'
-                             .format(connection_name, self.connections_file))
 
     def get_default_connection_name(self):
         """
@@ -25,10 +25,19 @@ This object is attached to the Click Context in pywbemcli.py
 from __future__ import absolute_import, print_function, unicode_literals
 
 import os
+import six
 import click
 import click_spinner
 
+from pywbem.cim_obj import NocaseDict
+
 from ._common import format_table
+from ._statistics import enable_statistics, connection_statistics, \
+    StatisticsFile, PERCENTILES, LATENCY_BUCKETS
+from ._profile import CommandProfile, enable_profile, profile_phase, \
+    PHASE_CONNECT
+from ._class_cache import ClassCache, NAMESPACE_INDEXES
+from .config import USE_CLASS_CACHE
 
 
 class ContextObj(object):  # pylint: disable=useless-object-inheritance
@@ -43,7 +52,8 @@ class ContextObj(object):  # pylint: disable=useless-object-inheritance
 
     # pylint: disable=unused-argument
     def __init__(self, pywbem_server, output_format, use_pull,
-                 pull_max_cnt, timestats, log, verbose):
+                 pull_max_cnt, timestats, log, verbose, stats_file=None,
+                 profile=False, profile_file=None, no_class_cache=False):
 
         self._pywbem_server = pywbem_server
         self._output_format = output_format
@@ -52,11 +62,16 @@ class ContextObj(object):  # pylint: disable=useless-object-inheritance
         self._timestats = timestats
         self._log = log
         self._verbose = verbose
+        self._stats_file = stats_file
+        self._profile = profile
+        self._profile_file = profile_file
+        self._no_class_cache = no_class_cache
 
         self._spinner_enabled = None  # Deferred init in getter
         self._spinner_obj = click_spinner.Spinner()
         self._conn = None
         self._wbem_server = None
+        self._class_cache = None
 
     def __repr__(self):
         return 'ContextObj(at {:08x}, pywbem_server={!r}, outputformat={}, ' \
@@ -143,14 +158,14 @@ class ContextObj(object):  # pylint: disable=useless-object-inheritance
                 # TODO there are two creates and also, since all the inputs
                 # are self, why do that here
                 self._pywbem_server.get_password(self)
-                self._pywbem_server.create_connection(
-                    log=self.log,
-                    use_pull=self.use_pull,
-                    pull_max_cnt=self.pull_max_cnt,
-                    timestats=self.timestats,
-                    verbose=self.verbose)
-                if self._conn and self.timestats:  # Enable stats gathering
-                    self.conn.statistics.enable()
+                with profile_phase(PHASE_CONNECT):
+                    self._pywbem_server.create_connection(
+                        log=self.log,
+                        use_pull=self.use_pull,
+                        pull_max_cnt=self.pull_max_cnt,
+                        timestats=self.timestats,
+                        verbose=self.verbose)
+                self.setup_recorders()
                 self._wbem_server = self._pywbem_server.wbem_server
             return self._pywbem_server.wbem_server
         else:
@@ -161,6 +176,185 @@ class ContextObj(object):  # pylint: disable=useless-object-inheritance
                 'corresponding environment variables, or in interactive mode '
                 'use "connection select"')
 
+    def worker_connections(self, workers):
+        """
+        Return a list of at most workers connections to the WBEM server of
+        this context for commands that execute requests concurrently. The
+        first connection is the connection of this context (see the conn
+        property), which is established if necessary.
+        """
+        conn = self.conn
+        if workers <= 1:
+            return [conn]
+        return self._pywbem_server.create_worker_connections(
+            workers, use_pull=self.use_pull, timestats=self.timestats)
+
+    def close_worker_connections(self, conns):
+        """
+        Close the connections returned by worker_connections() except the
+        connection of this context. Must be called when the command no longer
+        needs the connections.
+        """
+        if len(conns) > 1:
+            self._pywbem_server.close_worker_connections(conns)
+
+    @property
+    def class_cache(self):
+        """
+        :class:`ClassCache`: Persistent class cache for the WBEM server of
+        this context, or None if classes are not cached. Classes are cached
+        only for connections defined in the connections file that are not
+        mock servers, and only if the USE_CLASS_CACHE config variable is
+        True and the --no-class-cache general option is not set.
+        """
+        if self._class_cache is None and USE_CLASS_CACHE and \
+                not self.no_class_cache and \
+                self._pywbem_server and self._pywbem_server.server and \
+                not self._pywbem_server.mock_server and \
+                self._pywbem_server.name != 'not-saved':
+            self._class_cache = ClassCache(self._pywbem_server.name,
+                                           self._pywbem_server.server)
+        return self._class_cache
+
+    @property
+    def session_cache(self):
+        """
+        :class:`SessionCache`: Cache of the objects retrieved from the WBEM
+        server of this context. The cache is maintained in the pywbem_server
+        object so that in interactive mode it is kept across commands that
+        use the same connection.
+        """
+        return self._pywbem_server.session_cache
+
+    def get_class(self, classname, namespace=None):
+        """
+        Return the class classname in the namespace, with all properties,
+        methods and qualifiers including those inherited (i.e. as returned by
+        GetClass with LocalOnly=False). The class is returned from the
+        session cache or from the class cache if it has already been
+        retrieved.
+
+        The returned class is shared with the caches and must not be
+        modified.
+
+        If namespace is None, the default namespace of the connection is used.
+
+        Raises:
+            pywbem.Error: Exceptions from the WBEM server, for example
+            CIMError(CIM_ERR_NOT_FOUND) if the class does not exist.
+        """
+        conn = self.conn
+        namespace = namespace or conn.default_namespace
+
+        def retrieve_class():
+            """Get the class from the class cache or the WBEM server."""
+            if self.class_cache is None:
+                return conn.GetClass(classname, namespace=namespace,
+                                     LocalOnly=False)
+            return self.class_cache.get_class(conn, classname, namespace)
+
+        return self.session_cache.get(
+            ('class', namespace.lower(), classname.lower()), retrieve_class)
+
+    def get_superclass_index(self, namespace=None):
+        """
+        Return a dictionary of the names of all classes in the namespace with
+        the name of the superclass of each class (None for top classes).
+
+        The index is built from a single EnumerateClasses request that does
+        not return qualifiers, inherited properties and methods, or class
+        origin information. It is kept in the session cache and in the class
+        cache so that it can be shared by commands that need the class
+        hierarchy (ex. to walk the superclass chain of a class without a
+        GetClass request per level).
+
+        The returned dictionary is case insensitive, is shared with the
+        session cache and must not be modified.
+
+        If namespace is None, the default namespace of the connection is used.
+
+        Raises:
+            pywbem.Error: Exceptions from the WBEM server.
+        """
+        return self._get_class_index('superclasses', namespace)
+
+    def get_qualifier_flags(self, namespace=None, conn=None):
+        """
+        Return a dictionary of the names of all classes in the namespace with
+        the qualifier flags of each class, a bit mask of the bits in
+        QUALIFIER_FLAG_BITS (_class_cache module) for the Association,
+        Indication and Experimental qualifiers that are True in the class.
+
+        The index is built from a single EnumerateClasses request that does
+        not return inherited properties and methods, or class origin
+        information. It is kept in the session cache and in the class cache
+        so that classes can be filtered by these qualifiers without
+        retrieving the class definitions with their qualifiers.
+
+        The returned dictionary is case insensitive, is shared with the
+        session cache and must not be modified.
+
+        If namespace is None, the default namespace of the connection is used.
+        If conn is None, the connection of the context is used.
+
+        Raises:
+            pywbem.Error: Exceptions from the WBEM server.
+        """
+        return self._get_class_index('qualifier_flags', namespace, conn)
+
+    def _get_class_index(self, index_name, namespace, conn=None):
+        """
+        Return the index of the classes of the namespace defined by
+        index_name (see NAMESPACE_INDEXES in the _class_cache module) from the
+        session cache, the class cache or the WBEM server, as a NocaseDict.
+        """
+        conn = conn or self.conn
+        namespace = namespace or conn.default_namespace
+
+        def retrieve_index():
+            """Get the index from the class cache or the WBEM server."""
+            if self.class_cache is None:
+                index = NAMESPACE_INDEXES[index_name](conn, namespace)
+            else:
+                index = self.class_cache.get_index(conn, index_name,
+                                                   namespace)
+            return NocaseDict(index)
+
+        return self.session_cache.get((index_name, namespace.lower()),
+                                      retrieve_index)
+
+    def get_subclass_index(self, namespace=None):
+        """
+        Return a dictionary of the names of the classes in the namespace that
+        have subclasses, with the list of names of the direct subclasses of
+        each class. The top classes of the namespace are the subclasses of
+        the empty string key.
+
+        This adjacency map is derived from the superclass index of the
+        namespace (see :meth:`get_superclass_index`) and is kept in the
+        session cache.
+
+        The returned dictionary is case insensitive, is shared with the
+        session cache and must not be modified.
+
+        If namespace is None, the default namespace of the connection is used.
+
+        Raises:
+            pywbem.Error: Exceptions from the WBEM server.
+        """
+        namespace = namespace or self.conn.default_namespace
+
+        def build_index():
+            """Invert the superclass index."""
+            index = NocaseDict()
+            superclass_index = self.get_superclass_index(namespace)
+            for cn, supercn in six.iteritems(superclass_index):
+                index.setdefault(supercn or '', []).append(cn)
+            return index
+
+        return self.session_cache.get(('subclasses', namespace.lower()),
+                                      build_index)
+
     @property
     def pywbem_server(self):
         """
@@ -224,6 +418,38 @@ class ContextObj(object):  # pylint: disable=useless-object-inheritance
         """
         return self._verbose
 
+    @property
+    def stats_file(self):
+        """
+        :term:`string`: Path name of the statistics file to which the WBEM
+        operations are appended, or None.
+        """
+        return self._stats_file
+
+    @property
+    def profile(self):
+        """
+        :class:`py:bool`: Indicates that the time of the phases of the
+        processing of each command is shown.
+        """
+        return self._profile
+
+    @property
+    def profile_file(self):
+        """
+        :term:`string`: Path name of the file to which the cProfile profile
+        data of each command is saved, or None.
+        """
+        return self._profile_file
+
+    @property
+    def no_class_cache(self):
+        """
+        :class:`py:bool`: Indicates that the persistent class cache is not
+        used.
+        """
+        return self._no_class_cache
+
     def set_connection(self, connection):
         """ Set the connection parameter as the current connection object and
             establish the new connection
@@ -251,82 +477,133 @@ class ContextObj(object):  # pylint: disable=useless-object-inheritance
                                                           ctx.params))
             display_click_context_parents(display_attrs=True)
 
+        # A connection reused from a previous command in interactive mode may
+        # have been created without statistics or with another statistics
+        # file
+        self.setup_recorders()
+
+        profile = CommandProfile(self.profile_file) \
+            if self.profile or self.profile_file else None
+
         self.spinner_start()
         try:
-            cmd()
+            if profile:
+                with profile:
+                    cmd()
+            else:
+                cmd()
         finally:
             self.spinner_stop()
 
+            if self.profile and profile.total_time is not None:
+                click.echo(self.format_profile(profile))
+
             # Issue statistics if required. Note that we use _conn in order
             # not to create the connection if not created.
             if self.timestats and self._conn:
-                click.echo(self.format_statistics(self.conn.statistics))
+                statistics = connection_statistics(self._conn)
+                if statistics is not None:
+                    click.echo(self.format_statistics(statistics))
 
-    def format_statistics(self, statistics):
+    def format_statistics(self, statistics, name_header='Operation'):
         """
-        table formatted output of statistics
+        Return the table formatted output of the statistics (an
+        OperationStatistics object), with a table of latency histograms in
+        verbose mode. name_header is the header of the column with the names
+        by which the operations are grouped in the statistics.
         """
 
-        def format_float3(avg, min_, max_):
-            """Display float statistics with 3 places"""
+        def format_float3(stat):
+            """Display float statistics avg/min/max with 3 places"""
+            avg, min_, max_ = stat.avg, stat.min, stat.max
             if avg == min_ == max_:
                 return '{0:.3f}'.format(avg)
             return '{0:.3f}/{1:.3f}/{2:.3f}'.format(avg, min_, max_)
 
-        def format_float0(avg, min_, max_):
-            """Display float statistics with 0 places"""
+        def format_float0(stat):
+            """Display float statistics avg/min/max with 0 places"""
+            avg, min_, max_ = stat.avg, stat.min, stat.max
             if avg == min_ == max_:
                 return '{0:.0f}'.format(avg)
             return '{0:.0f}/{1:.0f}/{2:.0f}'.format(avg, min_, max_)
 
-        snapshot = sorted(statistics.snapshot(),
-                          key=lambda item: item[1].avg_time,
-                          reverse=True)
+        def format_percentiles(stat):
+            """Display the percentiles of time statistics with 3 places"""
+            return '/'.join('{0:.3f}'.format(stat.percentile(percent))
+                            for percent in PERCENTILES)
+
+        def format_rate(rate):
+            """Display a rate with 0 places, or nothing if unknown"""
+            return None if rate is None else '{0:.0f}'.format(rate)
+
+        snapshot = statistics.snapshot()
 
         # Test to see if any server time is non-zero
-        include_svr = False
-        for name, stats in snapshot:  # pylint: disable=unused-variable
-            # TODO: clean up pywbem stats so this is in pywbem, not here
-            if stats._server_time_stored:  # pylint: disable=protected-access
-                include_svr = True
+        include_svr = any(stats.server_time.count for stats in snapshot)
 
         # build list of column names
-        hdr = ['Count', 'Exc', 'Time']
+        pct_hdr = '/'.join('p{}'.format(percent) for percent in PERCENTILES)
+        hdr = ['Count', 'Exc', 'Time', 'Time ' + pct_hdr]
         if include_svr:
-            hdr.append('SvrTime')
-        hdr.extend(['ReqLen', 'ReplyLen', 'Operation'])
+            hdr.extend(['SvrTime', 'SvrTime ' + pct_hdr])
+        hdr.extend(['ReqLen', 'ReplyLen', 'Obj/s', 'Bytes/s', name_header])
 
-        # build table rows from snapshot of OperationStatistics
+        # build table rows from snapshot of OperationStatistic objects
         rows = []
-        for name, stats in snapshot:  # pylint: disable=unused-variable
-            time = format_float3(stats.avg_time,
-                                 stats.min_time,
-                                 stats.max_time)
-            req_len = format_float0(stats.avg_request_len,
-                                    stats.min_request_len,
-                                    stats.max_request_len)
-            reply_len = format_float0(stats.avg_reply_len,
-                                      stats.min_reply_len,
-                                      stats.max_reply_len)
+        hist_rows = []
+        for stats in snapshot:
+            row = [stats.count, stats.exception_count,
+                   format_float3(stats.time),
+                   format_percentiles(stats.time)]
+            hist_rows.append(stats.time.buckets + ['Time', stats.name])
             if include_svr:
-                svrtime = format_float3(stats.avg_server_time,
-                                        stats.min_server_time,
-                                        stats.max_server_time)
-                row = [stats.count, stats.exception_count, time, svrtime,
-                       req_len, reply_len, stats.name]
-            else:
-                row = [stats.count, stats.exception_count, time,
-                       req_len, reply_len, stats.name]
+                if stats.server_time.count:
+                    row.extend([format_float3(stats.server_time),
+                                format_percentiles(stats.server_time)])
+                    hist_rows.append(stats.server_time.buckets +
+                                     ['SvrTime', stats.name])
+                else:
+                    row.extend([None, None])
+            row.extend([format_float0(stats.request_len),
+                        format_float0(stats.reply_len),
+                        format_rate(stats.objects_per_sec),
+                        format_rate(stats.bytes_per_sec),
+                        stats.name])
             rows.append(row)
 
-        # only add table description if verbose on.
-        if self.verbose:
-            title = 'Statistics: Time in sec. Time, ReqLen, etc are single ' \
-                    'value if average/min/max are the same'
-        else:
-            title = None
+        # only add table description and histograms if verbose on.
+        if not self.verbose:
+            return format_table(rows, hdr)
 
-        click.echo(format_table(rows, hdr, title=title))
+        title = 'Statistics: Time in sec. Time, ReqLen and ReplyLen are ' \
+                'single values if average/min/max are the same.'
+        if statistics.sample_size is not None:
+            title += ' Percentiles of more than {} operations are estimated ' \
+                'from a sample'.format(statistics.sample_size)
+        hist_hdr = ['<={:g}'.format(bound) for bound in LATENCY_BUCKETS] + \
+            ['>{:g}'.format(LATENCY_BUCKETS[-1]), 'Measure', name_header]
+        return '{}\n\n{}'.format(
+            format_table(rows, hdr, title=title),
+            format_table(hist_rows, hist_hdr,
+                         title='Latency histogram: Number of operations by '
+                               'time in sec.'))
+
+    def format_profile(self, profile):
+        """
+        Return the table formatted output of the time of the phases of a
+        command in the profile (a CommandProfile object).
+        """
+        rows = []
+        for phase in profile.phase_times():
+            percent = phase.time * 100.0 / profile.total_time \
+                if profile.total_time else 0.0
+            rows.append([phase.name, phase.count,
+                         '{0:.1f}'.format(phase.time * 1000),
+                         '{0:.1f}'.format(percent)])
+        title = 'Profile: Time of the phases of the command, total ' \
+            '{0:.3f} sec.'.format(profile.total_time)
+        return format_table(rows, ['Phase', 'Count', 'Time (ms)', 'Percent'],
+                            title=title)
 
     def connect_wbem_server(self):
         """
@@ -357,12 +634,49 @@ class ContextObj(object):  # pylint: disable=useless-object-inheritance
             # get the password if it is required.  This may involve a
             # prompt.
             self._pywbem_server.get_password(self)
-            self._pywbem_server.create_connection(
-                log=self.log,
-                use_pull=self.use_pull,
-                pull_max_cnt=self.pull_max_cnt,
-                timestats=self.timestats,
-                verbose=self.verbose)
+            with profile_phase(PHASE_CONNECT):
+                self._pywbem_server.create_connection(
+                    log=self.log,
+                    use_pull=self.use_pull,
+                    pull_max_cnt=self.pull_max_cnt,
+                    timestats=self.timestats,
+                    verbose=self.verbose)
+            self.setup_recorders()
+
+    def setup_recorders(self):
+        """
+        Set up the operation recorders of the connection to the WBEM server of
+        this context for the statistics and the profile of the commands, if
+        the connection exists.
+        """
+        self.setup_statistics()
+        if self.profile and self._pywbem_server and \
+                self._pywbem_server.conn is not None:
+            enable_profile(self._pywbem_server.conn)
+
+    def setup_statistics(self):
+        """
+        Set up the statistics of the connection to the WBEM server of this
+        context, if the connection exists: The operations are recorded in the
+        statistics if the --timestats or --stats-file general options are
+        specified, and are appended to the statistics file of the
+        --stats-file general option.
+        """
+        if not self._pywbem_server or self._pywbem_server.conn is None:
+            return
+        conn = self._pywbem_server.conn
+        if self.timestats or self.stats_file:
+            statistics = enable_statistics(conn)
+        else:
+            statistics = connection_statistics(conn)
+        if statistics is None:
+            return
+        if self.stats_file:
+            statistics.stats_file = StatisticsFile(
+                self.stats_file, self._pywbem_server.name,
+                self._pywbem_server.server)
+        else:
+            statistics.stats_file = None
 
     @staticmethod
     def update_root_click_context(ctx_obj):
@@ -20,7 +20,6 @@ cmds for get and enumerate for CIM qualifier types.
 
 from __future__ import absolute_import, print_function
 
-import six
 from asciitree import LeftAligned
 import click
 
@@ -64,36 +63,28 @@ def build_tree(class_subclass_dict, top_class):
     return rtn_dict
 
 
-def display_class_tree(classes, top_class=None):
+def display_class_tree(cn_subcn, top_class=None):
     """
-    Display the list of classes as a left justified tree  in ascii to the
+    Display the class hierarchy defined by a dictionary of class names and
+    their subclass names as a left justified tree in ascii to the
     click.echo output
 
     Parameters:
-        classes (list of :class:`~pywbem.CIMClass`)
+        cn_subcn (dict or NocaseDict)
+            Dictionary with the names of the classes that have subclasses
+            as keys and lists of the names of their direct subclasses as
+            values. The top classes are the subclasses of the empty string
+            key.
 
         top_class (:term: `string`)
             The top level class to display or None if the display is
             from root.
     """
+    tree = build_tree(cn_subcn, top_class or '')
 
-    # build dictionary of classname : superclassname
-    cn_supercn = {cl.classname: cl.superclass for cl in classes}
-
-    # if top_class is none, create artifical root
+    # if top_class is none, display the top classes under an artifical root
     if top_class is None:
-        for cn in cn_supercn:
-            if not cn_supercn[cn]:
-                cn_supercn[cn] = 'root'
-        top_class = 'root'
-
-    # Hack to build the class to subclass dictionary from the
-    # superclass to class dictionary
-    cn_subcn = NocaseDict()
-    # pylint: disable=bad-continuation, expression-not-assigned
-    [cn_subcn.setdefault(v, []).append(k) for (k, v) in
-            six.iteritems(cn_supercn)]  # noqa: F841
-    tree = build_tree(cn_subcn, top_class)
+        tree = {'root': tree['']}
 
     tr = LeftAligned()
     click.echo(tr(tree))
@@ -0,0 +1,293 @@
+# (C) Copyright 2020 IBM Corp.
+# (C) Copyright 2020 Inova Development Inc.
+# All Rights Reserved
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""
+Profiling of the phases of the processing of a pywbemcli command, for the
+--profile and --profile-file general options.
+
+The time of a command is broken down into the following phases:
+
+* Connect: Establishing the connection to the WBEM server.
+
+* The phases of the WBEM operations, which are measured by a pywbem operation
+  recorder that is added to the connection to the WBEM server: building the
+  CIM-XML request, the HTTP exchange with the WBEM server (or the execution
+  of the operation by the mock WBEM server), and parsing the CIM-XML reply
+  into CIM objects.
+
+* The phases of displaying the result, which are measured by the functions of
+  pywbemcli that are decorated with profiled_phase(), and by the code that
+  is enclosed in a profile_phase() context. The formatting of the cells of
+  instance tables (phase _value_tomof) is measured by
+  _format_instances_as_rows() only if a profile is active, since it is
+  executed for every cell.
+
+* Other: The remaining time of the command.
+
+The time of a phase excludes the time of the phases that are nested in it
+(e.g. _value_tomof in _format_instances_as_rows), so that the times of the
+phases add up to the time of the command.
+
+The profile of a command is active in the thread executing the command, so
+that commands executed concurrently (e.g. by the fanout command) are profiled
+separately. Without an active profile, the decorated functions have only the
+overhead of an additional function call.
+"""
+
+from __future__ import absolute_import, print_function
+
+import functools
+import threading
+from contextlib import contextmanager
+from timeit import default_timer
+
+from pywbem import BaseOperationRecorder
+
+__all__ = []
+
+# Phase for establishing the connection to the WBEM server (including the
+# compilation of the model of a mock WBEM server)
+PHASE_CONNECT = 'Connect'
+
+# Phases of the WBEM operations
+PHASE_REQUEST = 'CIM-XML request'
+PHASE_SERVER = 'Server and network'
+PHASE_PARSE = 'CIM-XML parse'
+
+# Phase for the time of the command that is not in any other phase
+PHASE_OTHER = 'Other'
+
+# Phases in the order in which they are displayed. Phases that are not in this
+# list are displayed after them in the order in which they were entered first.
+PHASES = (PHASE_CONNECT, PHASE_REQUEST, PHASE_SERVER, PHASE_PARSE,
+          'sort_cimobjects', '_format_instances_as_rows', '_value_tomof',
+          'tabulate')
+
+# The CommandProfile that is active in the current thread
+_ACTIVE = threading.local()
+
+
+def active_profile():
+    """
+    Return the CommandProfile object that is active in the current thread,
+    or None.
+    """
+    return getattr(_ACTIVE, 'profile', None)
+
+
+@contextmanager
+def profile_phase(name):
+    """
+    Context manager that accounts the time of the enclosed code to the phase
+    name of the active profile, if any.
+    """
+    profile = active_profile()
+    if profile is None:
+        yield
+    else:
+        with profile.phase(name):
+            yield
+
+
+def profiled_phase(name):
+    """
+    Decorator that accounts the time of the decorated function to the phase
+    name of the active profile, if any.
+    """
+    def decorator(func):
+        """The decorator for the phase name"""
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            """Call func in the phase, if a profile is active"""
+            profile = getattr(_ACTIVE, 'profile', None)
+            if profile is None:
+                return func(*args, **kwargs)
+            with profile.phase(name):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+class PhaseTime(object):
+    # pylint: disable=useless-object-inheritance,too-few-public-methods
+    """
+    Number of times a phase was entered and time spent in it, in seconds.
+    """
+
+    def __init__(self, name):
+        self.name = name
+        self.count = 0
+        self.time = 0.0
+
+
+class CommandProfile(object):
+    # pylint: disable=useless-object-inheritance
+    """
+    Profile of the phases of the execution of a command, optionally with a
+    cProfile profile of the command that is saved to a file in the pstats
+    format.
+
+    The profile is a context manager that makes it the active profile of the
+    current thread while the command is executed. If a profile is already
+    active in the thread, the profile does nothing and the enclosed command
+    is accounted to the active profile.
+    """
+
+    def __init__(self, profile_file=None):
+        self.profile_file = profile_file
+        self.total_time = None
+        self._phases = {}
+        self._order = []
+        # Stack of the times of the nested phases entered in the current
+        # phase, for each entered phase
+        self._nested_times = []
+        self._start_time = None
+        self._cprofile = None
+        self._active = False
+
+    def __enter__(self):
+        if active_profile() is not None:
+            return self
+        self._active = True
+        _ACTIVE.profile = self
+        if self.profile_file:
+            # Imported only when needed, to keep the startup time low
+            import cProfile  # pylint: disable=import-outside-toplevel
+            self._cprofile = cProfile.Profile()
+            self._cprofile.enable()
+        self._start_time = default_timer()
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        if not self._active:
+            return
+        self.total_time = default_timer() - self._start_time
+        _ACTIVE.profile = None
+        self._active = False
+        if self._cprofile is not None:
+            self._cprofile.disable()
+            self._cprofile.dump_stats(self.profile_file)
+            self._cprofile = None
+
+    def _phase_time(self, name):
+        """Return the PhaseTime object of the phase name."""
+        if name not in self._phases:
+            self._phases[name] = PhaseTime(name)
+            self._order.append(name)
+        return self._phases[name]
+
+    def add(self, name, time):
+        """
+        Account the time in seconds to the phase name, and exclude it from
+        the time of the enclosing phase, if any.
+        """
+        phase = self._phase_time(name)
+        phase.count += 1
+        phase.time += time
+        if self._nested_times:
+            self._nested_times[-1] += time
+
+    @contextmanager
+    def phase(self, name):
+        """
+        Context manager that accounts the time of the enclosed code,
+        excluding the time of the nested phases, to the phase name.
+        """
+        self._phase_time(name)
+        self._nested_times.append(0.0)
+        start_time = default_timer()
+        try:
+            yield
+        finally:
+            time = default_timer() - start_time
+            nested_time = self._nested_times.pop()
+            self.add(name, time - nested_time)
+            # The nested phases were accounted to the enclosing phase by
+            # add() and are part of time
+            if self._nested_times:
+                self._nested_times[-1] += nested_time
+
+    def phase_times(self):
+        """
+        Return a list of PhaseTime objects of the phases of the command in
+        display order, with a last PhaseTime object for the remaining time of
+        the command.
+        """
+        names = [name for name in PHASES if name in self._phases] + \
+            [name for name in self._order if name not in PHASES]
+        phases = [self._phases[name] for name in names]
+        other = PhaseTime(PHASE_OTHER)
+        other.count = 1
+        other.time = max(
+            (self.total_time or 0.0) - sum(phase.time for phase in phases),
+            0.0)
+        return phases + [other]
+
+
+class ProfileRecorder(BaseOperationRecorder):
+    """
+    Operation recorder that accounts the phases of the WBEM operations
+    executed on a connection to the active profile of the thread executing
+    the operation, if any.
+    """
+
+    def __init__(self):
+        self._start_time = None
+        self._request_time = None
+        self._response_time = None
+        super(ProfileRecorder, self).__init__()
+
+    def reset(self, pull_op=None):
+        super(ProfileRecorder, self).reset(pull_op)
+        self._start_time = None
+        self._request_time = None
+        self._response_time = None
+
+    def stage_pywbem_args(self, method, **kwargs):
+        super(ProfileRecorder, self).stage_pywbem_args(method, **kwargs)
+        self._start_time = default_timer()
+
+    def stage_http_request(self, conn_id, version, url, target, method,
+                           headers, payload):
+        # pylint: disable=too-many-arguments
+        super(ProfileRecorder, self).stage_http_request(
+            conn_id, version, url, target, method, headers, payload)
+        self._request_time = default_timer()
+
+    def stage_http_response2(self, payload):
+        super(ProfileRecorder, self).stage_http_response2(payload)
+        self._response_time = default_timer()
+
+    def record(self, pywbem_args, pywbem_result, http_request, http_response):
+        profile = active_profile()
+        if profile is None or self._start_time is None:
+            return
+        end_time = default_timer()
+        if self._request_time is None or self._response_time is None:
+            # The mock WBEM server does not use HTTP
+            profile.add(PHASE_SERVER, end_time - self._start_time)
+            return
+        profile.add(PHASE_REQUEST, self._request_time - self._start_time)
+        profile.add(PHASE_SERVER, self._response_time - self._request_time)
+        profile.add(PHASE_PARSE, end_time - self._response_time)
+
+
+def enable_profile(conn):
+    """
+    Add a ProfileRecorder to the connection conn, unless it already has one.
+    """
+    if not any(isinstance(recorder, ProfileRecorder)
+               for recorder in conn.operation_recorders):
+        conn.add_operation_recorder(ProfileRecorder())
@@ -28,7 +28,9 @@ from pywbem import WBEMServer, configure_loggers_from_string
 
 from .config import DEFAULT_URL_SCHEME, DEFAULT_CONNECTION_TIMEOUT, \
     DEFAULT_NAMESPACE, MAX_TIMEOUT
-from ._pywbemcli_operations import PYWBEMCLIConnection, PYWBEMCLIFakedConnection
+from ._pywbemcli_operations import PYWBEMCLIConnection
+from ._session_cache import SessionCache
+from ._statistics import enable_statistics, connection_statistics
 
 WBEM_SERVER_OBJ = None
 
@@ -98,6 +100,8 @@ class PywbemServer(object):
     verify_envvar = 'PYWBEMCLI_VERIFY'
     ca_certs_envvar = 'PYWBEMCLI_CA_CERTS'
     timestats_envvar = 'PYWBEMCLI_TIMESTATS'
+    stats_file_envvar = 'PYWBEMCLI_STATS_FILE'
+    no_class_cache_envvar = 'PYWBEMCLI_NO_CLASS_CACHE'
     use_pull_envvar = 'PYWBEMCLI_USE_PULL'
     pull_max_cnt_envvar = 'PYWBEMCLI_PULL_MAX_CNT'
     mock_server_envvar = 'PYWBEMCLI_MOCK_SERVER'
@@ -131,6 +135,7 @@ class PywbemServer(object):
 
         # dynamically created in create_connection
         self._wbem_server = None
+        self._session_cache = None
 
     def __str__(self):
         return 'PywbemServer(url={} name={})'.format(self.server, self.name)
@@ -373,6 +378,17 @@ class PywbemServer(object):
                             "ca-certs": self.ca_certs,
                             "mock-server": self.mock_server})
 
+    def connection_key(self):
+        """
+        Return a hashable key for the connection definition of this object,
+        i.e. its name and the parameters that determine the connection to the
+        WBEM server. PywbemServer objects with the same key can share their
+        connection.
+        """
+        return (self.name, self.server, tuple(self.mock_server),
+                self.default_namespace, self.user, self.password, self.timeout,
+                self.verify, self.certfile, self.keyfile, self.ca_certs)
+
     @staticmethod
     def create(replace_underscores=False, **kwargs):
         """Create PywbemServer object from kwargs. If replace_underscore is
@@ -383,12 +399,33 @@ class PywbemServer(object):
             kwargsout = {k.replace('-', '_'): v for k, v in kwargs.items()}
         return PywbemServer(**kwargsout)
 
+    @property
+    def session_cache(self):
+        """
+        :class:`SessionCache`: Cache of the objects retrieved from the WBEM
+        server that is kept as long as the connection of this object is
+        not reset.
+        """
+        if self._session_cache is None:
+            self._session_cache = SessionCache()
+        return self._session_cache
+
     def reset(self):
         """ Reset the connection attributes of this pywbem server so that the
         connection must be restablished
         """
-        self._conn = None
-        self._wbemserver = None
+        self._wbem_server = None
+        self._session_cache = None
+
+    def clear_session_cache(self):
+        """
+        Clear the session cache and discard the information about the WBEM
+        server (namespaces, Interop namespace, brand, profiles) that is
+        kept in the WBEMServer object, while keeping the connection.
+        """
+        self.session_cache.clear()
+        if self._wbem_server is not None:
+            self._wbem_server = WBEMServer(self._wbem_server.conn)
 
     def create_connection(self, log=None, use_pull=None, pull_max_cnt=None,
                           verbose=None, timestats=None):
@@ -412,6 +449,9 @@ class PywbemServer(object):
         """
         if self._mock_server:
             if self.conn is None:
+                # Imported here to import pywbem_mock only when needed
+                from ._pywbemcli_faked_operations import \
+                    PYWBEMCLIFakedConnection
                 conn = PYWBEMCLIFakedConnection(
                     default_namespace=self.default_namespace,
                     use_pull_operations=use_pull,
@@ -430,58 +470,14 @@ class PywbemServer(object):
                         err=True)
 
         else:  # mock_server does not exist
-            if not self.server:
-                raise click.ClickException('No server found. Cannot '
-                                           'connect.')
-            if self.keyfile is not None and self.certfile is None:
-                ValueError('keyfile option requires certfile option')
-
-            creds = (self.user, self.password) if self.user or \
-                self.password else None
-
-            # If client cert and key provided, create dictionary for
-            # wbem connection certs (WBEMConnection takes dictionary for this
-            # info)
-            x509_dict = None
-            if self.certfile is not None:
-                x509_dict = {"cert_file": self.certfile}
-                if self.keyfile is not None:
-                    x509_dict.update({'key_file': self.keyfile})
-
-            # Create the WBEMConnection object and the _wbem_server object
-
-            # Negate verify to no_verification
-            if self.verify is None:
-                no_verification = self.verify
-            else:
-                no_verification = not self.verify
-
-            # Convert ca_certs command line option to ca_certs parameter
-            if getattr(pywbem, 'PYWBEM_USES_REQUESTS', False):
-                if self.ca_certs == 'certifi':
-                    ca_certs = None
-                else:
-                    ca_certs = self.ca_certs
-            else:
-                ca_certs = self.ca_certs
-
-            try:
-                conn = PYWBEMCLIConnection(
-                    self.server, creds,
-                    default_namespace=self.default_namespace,
-                    no_verification=no_verification,
-                    x509=x509_dict, ca_certs=ca_certs,
-                    timeout=self.timeout,
-                    use_pull_operations=use_pull,
-                    stats_enabled=timestats)
-            except IOError as exc:
-                raise click.ClickException(
-                    'Cannot create connection to {}: {}'.
-                    format(self.server, exc))
+            conn = self._create_wbem_connection(use_pull, timestats)
 
             # Create a WBEMServer object
             self._wbem_server = WBEMServer(conn)
 
+        if timestats and self.conn is not None:
+            enable_statistics(self.conn)
+
         if log:
             try:
                 configure_loggers_from_string(log,
@@ -490,3 +486,103 @@ class PywbemServer(object):
             except ValueError as ve:
                 raise click.ClickException('Logger configuration error. input: '
                                            '{}. Exception: {}'.format(log, ve))
+
+    def create_worker_connections(self, count, use_pull=None, timestats=None):
+        """
+        Return a list of at most count connections to the WBEM server of
+        this object, for commands that execute independent requests
+        concurrently, one connection per worker thread.
+
+        The first connection in the list is the existing connection of this
+        object; the others are new connections with the same connection
+        parameters. The new connections are not configured for logging, and
+        record their operations in the statistics of the existing
+        connection if it has statistics.
+
+        For a mock server, the mock repository exists only within the
+        existing connection so the list contains only that connection.
+
+           Return:
+                list of PYWBEMCLIConnection or PYWBEMCLIFakedConnection
+                objects.
+        """
+        conns = [self.conn]
+        if self._mock_server:
+            return conns
+        statistics = connection_statistics(self.conn)
+        for _ in range(count - 1):
+            conn = self._create_wbem_connection(use_pull, timestats)
+            if statistics is not None:
+                enable_statistics(conn, statistics)
+            conns.append(conn)
+        return conns
+
+    def close_worker_connections(self, conns):
+        """
+        Close the connections in conns that have been created by
+        create_worker_connections(), i.e. all connections except the existing
+        connection of this object.
+
+        The connections are closed only with pywbem versions that support
+        closing a connection (1.0.0 and higher); with earlier versions, the
+        HTTP connections are not kept open across requests.
+        """
+        for conn in conns:
+            if conn is not self.conn:
+                close = getattr(conn, 'close', None)
+                if close is not None:
+                    close()
+
+    def _create_wbem_connection(self, use_pull, timestats):
+        """
+        Create and return a new PYWBEMCLIConnection object for the server
+        defined in this object.
+        """
+        if not self.server:
+            raise click.ClickException('No server found. Cannot '
+                                       'connect.')
+        if self.keyfile is not None and self.certfile is None:
+            ValueError('keyfile option requires certfile option')
+
+        creds = (self.user, self.password) if self.user or \
+            self.password else None
+
+        # If client cert and key provided, create dictionary for
+        # wbem connection certs (WBEMConnection takes dictionary for this
+        # info)
+        x509_dict = None
+        if self.certfile is not None:
+            x509_dict = {"cert_file": self.certfile}
+            if self.keyfile is not None:
+                x509_dict.update({'key_file': self.keyfile})
+
+        # Create the WBEMConnection object
+
+        # Negate verify to no_verification
+        if self.verify is None:
+            no_verification = self.verify
+        else:
+            no_verification = not self.verify
+
+        # Convert ca_certs command line option to ca_certs parameter
+        if getattr(pywbem, 'PYWBEM_USES_REQUESTS', False):
+            if self.ca_certs == 'certifi':
+                ca_certs = None
+            else:
+                ca_certs = self.ca_certs
+        else:
+            ca_certs = self.ca_certs
+
+        try:
+            return PYWBEMCLIConnection(
+                self.server, creds,
+                default_namespace=self.default_namespace,
+                no_verification=no_verification,
+                x509=x509_dict, ca_certs=ca_certs,
+                timeout=self.timeout,
+                use_pull_operations=use_pull,
+                stats_enabled=timestats)
+        except IOError as exc:
+            raise click.ClickException(
+                'Cannot create connection to {}: {}'.
+                format(self.server, exc))
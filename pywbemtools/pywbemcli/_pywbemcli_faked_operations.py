@@ -0,0 +1,298 @@
+# (C) Copyright 2017 IBM Corp.
+# (C) Copyright 2017 Inova Development Inc.
+# All Rights Reserved
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""
+Connection class for mock WBEM servers that adds the methods of the
+PYWBEMCLIConnectionMixin class and a method to build the mock repository to
+FakedWBEMConnection.
+
+This module is imported only when a mock WBEM server is used, since importing
+pywbem_mock adds significantly to the startup time of pywbemcli.
+"""
+
+from __future__ import absolute_import, print_function
+
+import os
+import sys
+import threading
+import hashlib
+import traceback
+import six
+from six.moves import cPickle as pickle
+import click
+
+import pywbem
+from pywbem import MOFParseError
+import pywbem_mock
+
+from ._pywbemcli_operations import PYWBEMCLIConnectionMixin
+from .config import USE_MOCK_CACHE, PYWBEMCLI_MOCK_CACHE_DIR
+
+#  __all__ = ['PYWBEMCLIFakedConnection']
+
+# Pickle protocol that can be read by all supported Python versions
+PICKLE_PROTOCOL = 2
+
+# Environment variable that overrides the directory of the mock cache
+MOCK_CACHE_DIR_ENVVAR = 'PYWBEMCLI_MOCK_CACHE_DIR'
+
+# Name of the global variable of a mock Python script that declares the path
+# names of the files the script uses to build the mock repository (relative
+# to the directory of the script). The mock repository of a script that does
+# not declare its dependencies is not cached.
+MOCK_DEPENDENCIES_NAME = 'MOCK_DEPENDENCIES'
+
+# Attributes of FakedWBEMConnection that contain the mock repository
+MOCK_REPOSITORY_ATTRS = ('namespaces', 'classes', 'qualifiers', 'instances',
+                         'methods')
+
+
+def mock_cache_file(conn, file_path_list, cache_dir=None):
+    """
+    Return the path name of the file in the mock cache for the mock
+    repository of conn built from the files in file_path_list.
+
+    The file is identified by the absolute path names of the files and the
+    default namespace of conn, so that a changed file replaces the outdated
+    mock repository in the cache.
+
+    The directory of the mock cache is cache_dir if specified, otherwise the
+    directory in the PYWBEMCLI_MOCK_CACHE_DIR environment variable if set,
+    and otherwise the directory in the config variable of the same name.
+    """
+    if not cache_dir:
+        cache_dir = os.environ.get(MOCK_CACHE_DIR_ENVVAR) or \
+            PYWBEMCLI_MOCK_CACHE_DIR
+    ident = [conn.default_namespace.lower()] + \
+        [os.path.abspath(fp) for fp in file_path_list]
+    digest = hashlib.sha1('\n'.join(ident).encode('utf-8')).hexdigest()
+    return os.path.join(
+        os.path.expanduser(cache_dir),
+        '{}.pickle'.format(digest))
+
+
+def mock_cache_key(conn, file_path_list):
+    """
+    Return the key of the mock repository of conn built from the files in
+    file_path_list, a string that changes when the absolute path name, the
+    modification time or the content of any of the files, the default
+    namespace of conn, the pywbem version or the Python version changes.
+
+    Raises:
+        IOError/OSError: A file cannot be read.
+    """
+    hasher = hashlib.sha1()
+    hasher.update('{}|{}|{}'.format(
+        pywbem.__version__, '.'.join(map(str, sys.version_info[0:2])),
+        conn.default_namespace.lower()).encode('utf-8'))
+    for file_path in file_path_list:
+        with open(file_path, 'rb') as fp:
+            content_digest = hashlib.sha1(fp.read()).hexdigest()
+        hasher.update('|{}|{}|{}'.format(
+            os.path.abspath(file_path), os.path.getmtime(file_path),
+            content_digest).encode('utf-8'))
+    return hasher.hexdigest()
+
+
+class BuildRepositoryMixin(object):
+    # pylint: disable=too-few-public-methods
+    """
+    Builds the mock repository from the definitions in self._mock_server.
+
+    Each item in the iterable in self._mock_server must be a file path
+    identifying a file to be used to prepare for the mock test.
+
+    Each file path may be:
+
+      a python file if the suffix is 'mof'. A mof file is compiled into the
+      repository with the method
+
+    Returns a variety of errors for file not found, MOF syntax errors, and
+    python syntax errors.
+    """
+    def build_repository(self, conn, server, file_path_list, verbose):
+        """
+        Build the repository from the file_path list.
+
+        If USE_MOCK_CACHE is True, the repository is loaded from the mock
+        cache if it has been built from the same files before, and otherwise
+        it is built and then stored in the mock cache. The files include the
+        dependencies declared by the Python scripts in their
+        MOCK_DEPENDENCIES variable; the repository is not stored in the mock
+        cache if a Python script does not declare its dependencies. In
+        verbose mode, the repository is always built so that the output of
+        the Python scripts is displayed.
+        """
+        for file_path in file_path_list:
+            if not os.path.exists(file_path):
+                raise IOError('No such file: {}'.format(file_path))
+
+        if not USE_MOCK_CACHE:
+            self._build_repository(conn, server, file_path_list, verbose)
+            return
+
+        cache_file = mock_cache_file(conn, file_path_list)
+        if not verbose and \
+                self._load_repository(conn, cache_file, file_path_list):
+            return
+        dependencies = self._build_repository(conn, server, file_path_list,
+                                              verbose)
+        if dependencies is not None:
+            self._save_repository(conn, cache_file, file_path_list,
+                                  dependencies)
+
+    @staticmethod
+    def _load_repository(conn, cache_file, file_path_list):
+        """
+        Load the mock repository of conn from the cache file if the file
+        exists and contains the mock repository built from the files in
+        file_path_list and its dependencies in their current state.
+
+        Returns:
+            bool: Indicates whether the mock repository has been loaded.
+        """
+        if not os.path.isfile(cache_file):
+            return False
+        try:
+            with open(cache_file, 'rb') as fp:
+                snapshot = pickle.load(fp)
+        except Exception:  # pylint: disable=broad-except
+            return False  # A file that cannot be read is simply rebuilt
+        if not isinstance(snapshot, dict) or \
+                not isinstance(snapshot.get('dependencies'), list):
+            return False
+        try:
+            cache_key = mock_cache_key(
+                conn, file_path_list + snapshot['dependencies'])
+        except (IOError, OSError):
+            return False  # A dependency has been removed
+        if snapshot.get('key') != cache_key:
+            return False
+        for attr in MOCK_REPOSITORY_ATTRS:
+            setattr(conn, attr, snapshot['repository'][attr])
+        return True
+
+    @staticmethod
+    def _save_repository(conn, cache_file, file_path_list, dependencies):
+        """
+        Save the mock repository of conn built from the files in
+        file_path_list and the files in dependencies to the cache file. The
+        file is
+        written to a temporary file that then replaces the file so that
+        concurrent pywbemcli processes never see a partially written file.
+
+        A mock repository that cannot be saved, for example because Python
+        scripts added method callbacks that cannot be pickled, is not cached.
+        """
+        tmpfile = '{}.{}.{}.tmp'.format(cache_file, os.getpid(),
+                                        threading.current_thread().ident)
+        try:
+            snapshot = {
+                'key': mock_cache_key(conn, file_path_list + dependencies),
+                'dependencies': dependencies,
+                'repository': {attr: getattr(conn, attr)
+                               for attr in MOCK_REPOSITORY_ATTRS}}
+            data = pickle.dumps(snapshot, PICKLE_PROTOCOL)
+            cache_dir = os.path.dirname(cache_file)
+            if not os.path.isdir(cache_dir):
+                os.makedirs(cache_dir)
+            with open(tmpfile, 'wb') as fp:
+                fp.write(data)
+            if six.PY2:
+                os.rename(tmpfile, cache_file)
+            else:
+                os.replace(tmpfile, cache_file)  # pylint: disable=no-member
+        except Exception:  # pylint: disable=broad-except
+            if os.path.isfile(tmpfile):
+                os.remove(tmpfile)
+
+    @staticmethod
+    def _build_repository(conn, server, file_path_list, verbose):
+        """
+        Build the repository by compiling the MOF files and executing the
+        Python scripts in the file_path list.
+
+        Returns:
+            list of string: The absolute path names of the files declared as
+            dependencies by the Python scripts, or None if a Python script
+            does not declare its dependencies.
+        """
+        dependencies = []
+        for file_path in file_path_list:
+            ext = os.path.splitext(file_path)[1]
+            if ext == '.mof':
+                try:
+                    # Displays any MOFParseError already
+                    conn.compile_mof_file(file_path)
+                except MOFParseError:
+                    # Abort the entire pywbemcli command because the
+                    # MOF compilation might have caused inconsistencies in the
+                    # mock repository.
+                    click.echo(
+                        "Mock MOF file '{}' failed compiling (see above)".
+                        format(file_path),
+                        err=True)
+                    raise click.Abort()
+            else:
+                assert ext == '.py'  # already checked
+                with open(file_path) as fp:
+                    # May raise IOError
+                    file_source = fp.read()
+                    # the exec includes CONN and VERBOSE
+                    globalparams = {'CONN': conn,
+                                    'SERVER': server,
+                                    'VERBOSE': verbose}
+                    try:
+                        # Using compile+exec instead of just exec allows
+                        # specifying the file name, causing it to appear in
+                        # any tracebacks.
+                        file_code = compile(file_source, file_path, 'exec')
+                        # pylint: disable=exec-used
+                        exec(file_code, globalparams, None)
+                    except Exception:
+                        exc_type, exc_value, exc_traceback = sys.exc_info()
+                        tb = traceback.format_exception(exc_type, exc_value,
+                                                        exc_traceback)
+                        # Abort the entire pywbemcli command because the
+                        # script might have caused inconsistencies in the
+                        # Python namespace and in the mock repository.
+                        click.echo(
+                            "Mock Python script '{}' failed:\n{}".
+                            format(file_path, "\n".join(tb)),
+                            err=True)
+                        raise click.Abort()
+                script_dependencies = globalparams.get(MOCK_DEPENDENCIES_NAME)
+                if script_dependencies is None or dependencies is None:
+                    dependencies = None
+                else:
+                    script_dir = os.path.dirname(os.path.abspath(file_path))
+                    dependencies.extend(
+                        os.path.join(script_dir, dep_path)
+                        for dep_path in script_dependencies)
+        return dependencies
+
+
+class PYWBEMCLIFakedConnection(pywbem_mock.FakedWBEMConnection,
+                               PYWBEMCLIConnectionMixin,
+                               BuildRepositoryMixin):
+    """
+    PyWBEMCLIFakedConnection subclass adds the methods added by
+    PYWBEMCLIConnectionMixin
+    """
+    def __init__(self, *args, **kwargs):
+        """
+        ctor passes all input parameters to superclass
+        """
+        super(PYWBEMCLIFakedConnection, self).__init__(*args, **kwargs)
@@ -22,22 +22,18 @@ the complete iterations so that we can use these as common operations for
 pywbemcli instead of having to execute an algorithm of pull vs non-pull
 everywhere a WBEMConnection possible pull operation is called.
 
-It also adds a method to FakeWBEMConnection to build the repository.
+The connection class for mock WBEM servers is defined in the
+_pywbemcli_faked_operations module so that pywbem_mock is imported only when
+a mock WBEM server is used.
 """
 
 from __future__ import absolute_import, print_function
 
-import os
-import sys
-import traceback
-import click
-
-from pywbem import WBEMConnection, MOFParseError
-import pywbem_mock
+from pywbem import WBEMConnection
 
 from .config import DEFAULT_MAXPULLCNT
 
-#  __all__ = ['PYWBEMCLIConnection', 'PYWBEMCLIFakedConnection']
+#  __all__ = ['PYWBEMCLIConnection']
 
 
 # pylint: disable=useless-object-inheritance
@@ -55,6 +51,10 @@ class PYWBEMCLIConnectionMixin(object):
 
     They are a pywbemcli convience to simplify the individual action processing
     methods to a single call.
+
+    Each of these methods has a streaming counterpart named
+    PyWbemcliIter<...> that returns the generator rather than the complete
+    list so that objects can be processed as they are received.
     """
     def PyWbemcliEnumerateInstancePaths(self, ClassName, namespace=None,
                                         FilterQueryLanguage=None,
@@ -75,14 +75,14 @@ class PYWBEMCLIConnectionMixin(object):
         method.
         """
 
-        result = [path for path in self.IterEnumerateInstancePaths(
+        result = list(self.PyWbemcliIterEnumerateInstancePaths(
             ClassName,
             namespace=namespace,
             FilterQueryLanguage=FilterQueryLanguage,
             FilterQuery=FilterQuery,
             OperationTimeout=OperationTimeout,
             ContinueOnError=ContinueOnError,
-            MaxObjectCount=MaxObjectCount)]
+            MaxObjectCount=MaxObjectCount))
         return result
 
     def PyWbemcliEnumerateInstances(self, ClassName, namespace=None,
@@ -106,7 +106,7 @@ class PYWBEMCLIConnectionMixin(object):
         method.
         """
 
-        result = [inst for inst in self.IterEnumerateInstances(
+        result = list(self.PyWbemcliIterEnumerateInstances(
             ClassName,
             namespace=namespace,
             LocalOnly=LocalOnly,
@@ -118,7 +118,7 @@ class PYWBEMCLIConnectionMixin(object):
             FilterQuery=FilterQuery,
             OperationTimeout=OperationTimeout,
             ContinueOnError=ContinueOnError,
-            MaxObjectCount=MaxObjectCount)]
+            MaxObjectCount=MaxObjectCount))
         return result
 
     def PyWbemcliReferenceInstancePaths(self, InstanceName, ResultClass=None,
@@ -141,7 +141,7 @@ class PYWBEMCLIConnectionMixin(object):
         method.
         """
 
-        result = [path for path in self.IterReferenceInstancePaths(
+        result = list(self.PyWbemcliIterReferenceInstancePaths(
             InstanceName,
             ResultClass=ResultClass,
             Role=Role,
@@ -149,7 +149,7 @@ class PYWBEMCLIConnectionMixin(object):
             FilterQuery=FilterQuery,
             OperationTimeout=OperationTimeout,
             ContinueOnError=ContinueOnError,
-            MaxObjectCount=MaxObjectCount)]
+            MaxObjectCount=MaxObjectCount))
         return result
 
     def PyWbemcliReferenceInstances(self, InstanceName, ResultClass=None,
@@ -171,7 +171,7 @@ class PYWBEMCLIConnectionMixin(object):
         method.
         """
 
-        result = [inst for inst in self.IterReferenceInstances(
+        result = list(self.PyWbemcliIterReferenceInstances(
             InstanceName,
             ResultClass=ResultClass,
             Role=Role,
@@ -182,7 +182,7 @@ class PYWBEMCLIConnectionMixin(object):
             FilterQuery=FilterQuery,
             OperationTimeout=OperationTimeout,
             ContinueOnError=ContinueOnError,
-            MaxObjectCount=MaxObjectCount)]
+            MaxObjectCount=MaxObjectCount))
         return result
 
     def PyWbemcliAssociatorInstancePaths(self, InstanceName, AssocClass=None,
@@ -206,7 +206,7 @@ class PYWBEMCLIConnectionMixin(object):
         method.
         """
 
-        result = [path for path in self.IterAssociatorInstancePaths(
+        result = list(self.PyWbemcliIterAssociatorInstancePaths(
             InstanceName,
             AssocClass=AssocClass,
             ResultClass=ResultClass,
@@ -216,7 +216,7 @@ class PYWBEMCLIConnectionMixin(object):
             FilterQuery=FilterQuery,
             OperationTimeout=OperationTimeout,
             ContinueOnError=ContinueOnError,
-            MaxObjectCount=MaxObjectCount)]
+            MaxObjectCount=MaxObjectCount))
         return result
 
     def PyWbemcliAssociatorInstances(self, InstanceName, AssocClass=None,
@@ -241,7 +241,7 @@ class PYWBEMCLIConnectionMixin(object):
         method.
         """
 
-        result = [inst for inst in self.IterAssociatorInstances(
+        result = list(self.PyWbemcliIterAssociatorInstances(
             InstanceName,
             AssocClass=AssocClass,
             ResultClass=ResultClass,
@@ -254,7 +254,7 @@ class PYWBEMCLIConnectionMixin(object):
             FilterQuery=FilterQuery,
             OperationTimeout=OperationTimeout,
             ContinueOnError=ContinueOnError,
-            MaxObjectCount=MaxObjectCount)]
+            MaxObjectCount=MaxObjectCount))
         return result
 
     def PyWbemcliQueryInstances(self, FilterQueryLanguage, FilterQuery,
@@ -273,107 +273,259 @@ class PYWBEMCLIConnectionMixin(object):
         method.
         """
 
-        result = [inst for inst in self.IterQueryInstances(
+        result = list(self.PyWbemcliIterQueryInstances(
             FilterQueryLanguage,
             FilterQuery,
             namespace=namespace,
             ReturnQueryResultClass=ReturnQueryResultClass,
             OperationTimeout=OperationTimeout,
             ContinueOnError=ContinueOnError,
-            MaxObjectCount=MaxObjectCount)]
+            MaxObjectCount=MaxObjectCount))
         return result
 
+    #
+    #   The following methods are the streaming counterparts of the methods
+    #   above. They return the generator from the corresponding
+    #   Iter<...> method so that the caller can process each object as the
+    #   open/pull response containing it is received from the server rather
+    #   than waiting for the complete result set. Only MaxObjectCount objects
+    #   (plus those not yet consumed by the caller) are held in memory at
+    #   any time when pull operations are used.
+    #
+
+    def PyWbemcliIterEnumerateInstancePaths(self, ClassName, namespace=None,
+                                            FilterQueryLanguage=None,
+                                            FilterQuery=None,
+                                            OperationTimeout=None,
+                                            ContinueOnError=None,
+                                            MaxObjectCount=DEFAULT_MAXPULLCNT,
+                                            **extra):
+        # pylint: disable=unused-argument
+        # pylint: disable=invalid-name
+        """
+        Execute IterEnumerateInstancePaths and return the generator that
+        yields the instance paths.
 
-class BuildRepositoryMixin(object):
-    # pylint: disable=too-few-public-methods
-    """
-    Builds the mock repository from the definitions in self._mock_server.
+        Uses the same parameters as the IterEnumerateInstancePaths method.
 
-    Each item in the iterable in self._mock_server must be a file path
-    identifying a file to be used to prepare for the mock test.
+        All exceptions from the underlying method are passed through this
+        method when the generator is consumed.
+        """
+        return self.IterEnumerateInstancePaths(
+            ClassName,
+            namespace=namespace,
+            FilterQueryLanguage=FilterQueryLanguage,
+            FilterQuery=FilterQuery,
+            OperationTimeout=OperationTimeout,
+            ContinueOnError=ContinueOnError,
+            MaxObjectCount=MaxObjectCount)
+
+    def PyWbemcliIterEnumerateInstances(self, ClassName, namespace=None,
+                                        LocalOnly=None,
+                                        DeepInheritance=None,
+                                        IncludeQualifiers=None,
+                                        IncludeClassOrigin=None,
+                                        PropertyList=None,
+                                        FilterQueryLanguage=None,
+                                        FilterQuery=None,
+                                        OperationTimeout=None,
+                                        ContinueOnError=None,
+                                        MaxObjectCount=DEFAULT_MAXPULLCNT,
+                                        **extra):
+        # pylint: disable=unused-argument
+        # pylint: disable=invalid-name
+        """
+        Execute IterEnumerateInstances and return the generator that yields
+        the instances.
 
-    Each file path may be:
+        Uses the same parameters as the IterEnumerateInstances method.
 
-      a python file if the suffix is 'mof'. A mof file is compiled into the
-      repository with the method
+        All exceptions from the underlying method are passed through this
+        method when the generator is consumed.
+        """
+        return self.IterEnumerateInstances(
+            ClassName,
+            namespace=namespace,
+            LocalOnly=LocalOnly,
+            DeepInheritance=DeepInheritance,
+            IncludeQualifiers=IncludeQualifiers,
+            IncludeClassOrigin=IncludeClassOrigin,
+            PropertyList=PropertyList,
+            FilterQueryLanguage=FilterQueryLanguage,
+            FilterQuery=FilterQuery,
+            OperationTimeout=OperationTimeout,
+            ContinueOnError=ContinueOnError,
+            MaxObjectCount=MaxObjectCount)
+
+    def PyWbemcliIterReferenceInstancePaths(self, InstanceName,
+                                            ResultClass=None,
+                                            Role=None,
+                                            FilterQueryLanguage=None,
+                                            FilterQuery=None,
+                                            OperationTimeout=None,
+                                            ContinueOnError=None,
+                                            MaxObjectCount=DEFAULT_MAXPULLCNT,
+                                            **extra):
+        # pylint: disable=unused-argument
+        # pylint: disable=invalid-name
+        """
+        Execute IterReferenceInstancePaths and return the generator that
+        yields the instance paths.
 
-    Returns a variety of errors for file not found, MOF syntax errors, and
-    python syntax errors.
-    """
-    def build_repository(self, conn, server, file_path_list, verbose):
+        Uses the same parameters as the IterReferenceInstancePaths method.
+
+        All exceptions from the underlying method are passed through this
+        method when the generator is consumed.
         """
-        Build the repository from the file_path list
+        return self.IterReferenceInstancePaths(
+            InstanceName,
+            ResultClass=ResultClass,
+            Role=Role,
+            FilterQueryLanguage=FilterQueryLanguage,
+            FilterQuery=FilterQuery,
+            OperationTimeout=OperationTimeout,
+            ContinueOnError=ContinueOnError,
+            MaxObjectCount=MaxObjectCount)
+
+    def PyWbemcliIterReferenceInstances(self, InstanceName, ResultClass=None,
+                                        Role=None, IncludeQualifiers=None,
+                                        IncludeClassOrigin=None,
+                                        PropertyList=None,
+                                        FilterQueryLanguage=None,
+                                        FilterQuery=None,
+                                        OperationTimeout=None,
+                                        ContinueOnError=None,
+                                        MaxObjectCount=DEFAULT_MAXPULLCNT,
+                                        **extra):
+        # pylint: disable=unused-argument
+        # pylint: disable=invalid-name
         """
-        for file_path in file_path_list:
-            if not os.path.exists(file_path):
-                raise IOError('No such file: {}'.format(file_path))
-
-            ext = os.path.splitext(file_path)[1]
-            if ext == '.mof':
-                try:
-                    # Displays any MOFParseError already
-                    conn.compile_mof_file(file_path)
-                except MOFParseError:
-                    # Abort the entire pywbemcli command because the
-                    # MOF compilation might have caused inconsistencies in the
-                    # mock repository.
-                    click.echo(
-                        "Mock MOF file '{}' failed compiling (see above)".
-                        format(file_path),
-                        err=True)
-                    raise click.Abort()
-            else:
-                assert ext == '.py'  # already checked
-                with open(file_path) as fp:
-                    # May raise IOError
-                    file_source = fp.read()
-                    # the exec includes CONN and VERBOSE
-                    globalparams = {'CONN': conn,
-                                    'SERVER': server,
-                                    'VERBOSE': verbose}
-                    try:
-                        # Using compile+exec instead of just exec allows
-                        # specifying the file name, causing it to appear in
-                        # any tracebacks.
-                        file_code = compile(file_source, file_path, 'exec')
-                        # pylint: disable=exec-used
-                        exec(file_code, globalparams, None)
-                    except Exception:
-                        exc_type, exc_value, exc_traceback = sys.exc_info()
-                        tb = traceback.format_exception(exc_type, exc_value,
-                                                        exc_traceback)
-                        # Abort the entire pywbemcli command because the
-                        # script might have caused inconsistencies in the
-                        # Python namespace and in the mock repository.
-                        click.echo(
-                            "Mock Python script '{}' failed:\n{}".
-                            format(file_path, "\n".join(tb)),
-                            err=True)
-                        raise click.Abort()
+        Execute IterReferenceInstances and return the generator that yields
+        the instances.
 
+        Uses the same parameters as the IterReferenceInstances method.
 
-class PYWBEMCLIConnection(WBEMConnection, PYWBEMCLIConnectionMixin):
-    """
-    PyWBEMCLIConnection subclass adds the methods added by
-    PYWBEMCLIConnectionMixin
-    """
+        All exceptions from the underlying method are passed through this
+        method when the generator is consumed.
+        """
+        return self.IterReferenceInstances(
+            InstanceName,
+            ResultClass=ResultClass,
+            Role=Role,
+            IncludeQualifiers=IncludeQualifiers,
+            IncludeClassOrigin=IncludeClassOrigin,
+            PropertyList=PropertyList,
+            FilterQueryLanguage=FilterQueryLanguage,
+            FilterQuery=FilterQuery,
+            OperationTimeout=OperationTimeout,
+            ContinueOnError=ContinueOnError,
+            MaxObjectCount=MaxObjectCount)
+
+    def PyWbemcliIterAssociatorInstancePaths(self, InstanceName,
+                                             AssocClass=None,
+                                             ResultClass=None,
+                                             Role=None, ResultRole=None,
+                                             FilterQueryLanguage=None,
+                                             FilterQuery=None,
+                                             OperationTimeout=None,
+                                             ContinueOnError=None,
+                                             MaxObjectCount=DEFAULT_MAXPULLCNT,
+                                             **extra):
+        # pylint: disable=unused-argument
+        # pylint: disable=invalid-name
+        """
+        Execute IterAssociatorInstancePaths and return the generator that
+        yields the instance paths.
 
-    def __init__(self, *args, **kwargs):
+        Uses the same parameters as the IterAssociatorInstancePaths method.
+
+        All exceptions from the underlying method are passed through this
+        method when the generator is consumed.
         """
-        ctor passes all input parameters to superclass
+        return self.IterAssociatorInstancePaths(
+            InstanceName,
+            AssocClass=AssocClass,
+            ResultClass=ResultClass,
+            Role=Role,
+            ResultRole=ResultRole,
+            FilterQueryLanguage=FilterQueryLanguage,
+            FilterQuery=FilterQuery,
+            OperationTimeout=OperationTimeout,
+            ContinueOnError=ContinueOnError,
+            MaxObjectCount=MaxObjectCount)
+
+    def PyWbemcliIterAssociatorInstances(self, InstanceName, AssocClass=None,
+                                         ResultClass=None,
+                                         Role=None, ResultRole=None,
+                                         IncludeQualifiers=None,
+                                         IncludeClassOrigin=None,
+                                         PropertyList=None,
+                                         FilterQueryLanguage=None,
+                                         FilterQuery=None,
+                                         OperationTimeout=None,
+                                         ContinueOnError=None,
+                                         MaxObjectCount=DEFAULT_MAXPULLCNT,
+                                         **extra):
+        # pylint: disable=unused-argument
+        # pylint: disable=invalid-name
         """
-        super(PYWBEMCLIConnection, self).__init__(*args, **kwargs)
+        Execute IterAssociatorInstances and return the generator that yields
+        the instances.
+
+        Uses the same parameters as the IterAssociatorInstances method.
+
+        All exceptions from the underlying method are passed through this
+        method when the generator is consumed.
+        """
+        return self.IterAssociatorInstances(
+            InstanceName,
+            AssocClass=AssocClass,
+            ResultClass=ResultClass,
+            Role=Role,
+            ResultRole=ResultRole,
+            IncludeQualifiers=IncludeQualifiers,
+            IncludeClassOrigin=IncludeClassOrigin,
+            PropertyList=PropertyList,
+            FilterQueryLanguage=FilterQueryLanguage,
+            FilterQuery=FilterQuery,
+            OperationTimeout=OperationTimeout,
+            ContinueOnError=ContinueOnError,
+            MaxObjectCount=MaxObjectCount)
+
+    def PyWbemcliIterQueryInstances(self, FilterQueryLanguage, FilterQuery,
+                                    namespace=None, ReturnQueryResultClass=None,
+                                    OperationTimeout=None, ContinueOnError=None,
+                                    MaxObjectCount=DEFAULT_MAXPULLCNT,
+                                    **extra):
+        # pylint: disable=unused-argument
+        # pylint: disable=invalid-name
+        """
+        Execute IterQueryInstances and return the generator that yields the
+        instances.
+
+        Uses the same parameters as the IterQueryInstances method.
+
+        All exceptions from the underlying method are passed through this
+        method when the generator is consumed.
+        """
+        return self.IterQueryInstances(
+            FilterQueryLanguage,
+            FilterQuery,
+            namespace=namespace,
+            ReturnQueryResultClass=ReturnQueryResultClass,
+            OperationTimeout=OperationTimeout,
+            ContinueOnError=ContinueOnError,
+            MaxObjectCount=MaxObjectCount)
 
 
-class PYWBEMCLIFakedConnection(pywbem_mock.FakedWBEMConnection,
-                               PYWBEMCLIConnectionMixin,
-                               BuildRepositoryMixin):
+class PYWBEMCLIConnection(WBEMConnection, PYWBEMCLIConnectionMixin):
     """
-    PyWBEMCLIFakedConnection subclass adds the methods added by
+    PyWBEMCLIConnection subclass adds the methods added by
     PYWBEMCLIConnectionMixin
     """
+
     def __init__(self, *args, **kwargs):
         """
         ctor passes all input parameters to superclass
         """
-        super(PYWBEMCLIFakedConnection, self).__init__(*args, **kwargs)
+        super(PYWBEMCLIConnection, self).__init__(*args, **kwargs)
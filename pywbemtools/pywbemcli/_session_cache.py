@@ -0,0 +1,169 @@
+# (C) Copyright 2020 IBM Corp.
+# (C) Copyright 2020 Inova Development Inc.
+# All Rights Reserved
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""
+Cache of CIM objects retrieved from a WBEM server during a pywbemcli session.
+
+The cache is attached to a PywbemServer object so that in interactive mode it
+lives across the commands that use the same connection. It keeps class
+definitions, class enumeration results and qualifier declarations, which
+rarely change, so that repeated commands do not retrieve them again from
+the WBEM server.
+"""
+
+from __future__ import absolute_import, print_function
+
+import threading
+from collections import OrderedDict
+
+from pywbem.cim_obj import NocaseDict
+
+from .config import SESSION_CACHE_MAX_OBJECTS
+
+__all__ = []
+
+
+class SessionCache(object):
+    # pylint: disable=useless-object-inheritance
+    """
+    Size limited cache of results of requests to a WBEM server.
+
+    Each entry is keyed by a tuple whose first two items are the kind of the
+    cached result (ex. 'class', 'qualifiers') and the lower case namespace
+    name. The remaining items identify the request within the namespace.
+
+    The size of an entry is the number of CIM objects in the cached result,
+    or the number of items of a cached dictionary.
+    When the total size exceeds the maximum size, the least recently used
+    entries are evicted.
+
+    The cache may be used from multiple threads.
+    """
+
+    def __init__(self, max_objects=SESSION_CACHE_MAX_OBJECTS):
+        self._max_objects = max_objects
+        self._entries = OrderedDict()
+        self._size = 0
+        self._hits = 0
+        self._misses = 0
+        self._lock = threading.Lock()
+
+    def __repr__(self):
+        return 'SessionCache(entries={}, size={}, max_objects={}, hits={}, ' \
+               'misses={})'.format(len(self._entries), self._size,
+                                   self._max_objects, self._hits,
+                                   self._misses)
+
+    def __deepcopy__(self, memo):
+        # The cached objects are not copied with the PywbemServer object
+        # that owns the cache since a copy is only used for a modified
+        # connection.
+        return SessionCache(self._max_objects)
+
+    def __len__(self):
+        return len(self._entries)
+
+    @property
+    def size(self):
+        """
+        :term:`integer`: Total number of CIM objects in the cache.
+        """
+        return self._size
+
+    @property
+    def max_objects(self):
+        """
+        :term:`integer`: Maximum number of CIM objects in the cache.
+        """
+        return self._max_objects
+
+    @property
+    def hits(self):
+        """
+        :term:`integer`: Number of requests that were satisfied from the
+        cache.
+        """
+        return self._hits
+
+    @property
+    def misses(self):
+        """
+        :term:`integer`: Number of requests that were not satisfied from the
+        cache.
+        """
+        return self._misses
+
+    def get(self, key, retrieve):
+        """
+        Return the result cached for key. If no result is cached for key,
+        call retrieve() to get the result from the WBEM server and add it
+        to the cache.
+
+        Lists are returned as a new list so that callers can modify the list
+        without modifying the cache. Other results, including dictionaries,
+        are shared with the cache and must not be modified.
+
+        Exceptions raised by retrieve() are raised and nothing is cached.
+        """
+        with self._lock:
+            if key in self._entries:
+                value, size = self._entries.pop(key)
+                self._entries[key] = (value, size)  # Most recently used
+                self._hits += 1
+                return list(value) if isinstance(value, list) else value
+            self._misses += 1
+
+        value = retrieve()
+
+        size = len(value) if isinstance(value, (list, dict, NocaseDict)) \
+            else 1
+        with self._lock:
+            if key in self._entries:
+                self._size -= self._entries.pop(key)[1]
+            self._entries[key] = (value, size)
+            self._size += size
+            while self._size > self._max_objects and len(self._entries) > 1:
+                _, (_, evicted_size) = self._entries.popitem(last=False)
+                self._size -= evicted_size
+        return list(value) if isinstance(value, list) else value
+
+    def invalidate(self, namespace, kinds=None):
+        """
+        Remove the entries for the namespace. If kinds is not None, only the
+        entries whose kind is in kinds are removed.
+        """
+        ns = namespace.lower()
+        with self._lock:
+            for key in list(self._entries):
+                if key[1] == ns and (kinds is None or key[0] in kinds):
+                    self._size -= self._entries.pop(key)[1]
+
+    def clear(self):
+        """
+        Remove all entries and reset the statistics.
+        """
+        with self._lock:
+            self._entries.clear()
+            self._size = 0
+            self._hits = 0
+            self._misses = 0
+
+    def entries(self):
+        """
+        Return a list of tuples (key, size) for the entries in the cache,
+        from least recently to most recently used.
+        """
+        with self._lock:
+            return [(key, entry[1]) for key, entry in self._entries.items()]
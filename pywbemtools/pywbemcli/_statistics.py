@@ -0,0 +1,430 @@
+# (C) Copyright 2020 IBM Corp.
+# (C) Copyright 2020 Inova Development Inc.
+# All Rights Reserved
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""
+Statistics of the WBEM operations executed by pywbemcli, for the --timestats
+and --stats-file general options.
+
+The statistics are gathered by a pywbem operation recorder that is added to
+the connections to the WBEM server. Unlike the statistics of pywbem, they keep
+a latency histogram and a sample of the times of the operations of bounded
+size so that latency percentiles can be shown, and they count the CIM objects
+returned by the operations. The statistics are kept with the connection, so
+in the interactive mode and in the batch command they accumulate across the
+commands that use the same connection. The statistics loaded from statistics
+files by the stats commands keep all times, so that their percentiles are
+exact.
+
+The operations can also be appended to a statistics file for the --stats-file
+general option, in the JSON Lines format with one JSON object per operation
+with the following items:
+
+* time: Start time of the operation in seconds since the epoch.
+* operation: Name of the WBEMConnection method (e.g. "EnumerateInstances").
+* connection: Name of the connection definition ("not-saved" if the WBEM
+  server was not specified by a connection definition).
+* server: URL of the WBEM server, or null for a mock WBEM server.
+* namespace: Target namespace of the operation.
+* client_time: Time of the operation in seconds measured by pywbemcli.
+* server_time: Time of the operation in seconds reported by the WBEM server,
+  or null.
+* request_len, reply_len: Size of the request and reply in bytes.
+* object_count: Number of CIM objects returned by the operation.
+* exception: Boolean indicating that the operation raised an exception.
+"""
+
+from __future__ import absolute_import, print_function
+
+import io
+import json
+import math
+import copy
+import random
+import time as _time
+import threading
+from timeit import default_timer
+import six
+
+from pywbem import BaseOperationRecorder
+
+__all__ = []
+
+# Upper bounds in seconds of the buckets of the latency histograms. The last
+# bucket holds the times above the last bound.
+LATENCY_BUCKETS = (0.001, 0.01, 0.1, 1.0, 10.0)
+
+# Percentiles of the operation times that are shown
+PERCENTILES = (50, 90, 99)
+
+# Default maximum number of the times of an operation that are kept for the
+# percentiles. The percentiles of operations that are executed more often are
+# estimated from a random sample of their times of this size.
+SAMPLE_SIZE = 1000
+
+
+def percentile(sorted_values, percent):
+    """
+    Return the percentile percent of a non-empty sorted list of values, using
+    the nearest-rank method.
+    """
+    rank = int(math.ceil(percent / 100.0 * len(sorted_values)))
+    return sorted_values[max(rank, 1) - 1]
+
+
+def bucket_index(value, buckets=LATENCY_BUCKETS):
+    """
+    Return the index of the bucket defined by the upper bounds buckets that
+    holds the value, or len(buckets) if the value is above the last bound.
+    """
+    for i, bound in enumerate(buckets):
+        if value <= bound:
+            return i
+    return len(buckets)
+
+
+def histogram(values, buckets=LATENCY_BUCKETS):
+    """
+    Return a list with the number of values in each bucket defined by the
+    upper bounds buckets, and the number of values above the last bound.
+    """
+    counts = [0] * (len(buckets) + 1)
+    for value in values:
+        counts[bucket_index(value, buckets)] += 1
+    return counts
+
+
+def result_object_count(ret):
+    """
+    Return the number of CIM objects in the return value ret of a
+    WBEMConnection method.
+    """
+    if ret is None:
+        return 0
+    # The result tuples of the pull operations
+    for name in ('instances', 'paths'):
+        if hasattr(ret, name):
+            return len(getattr(ret, name))
+    if isinstance(ret, list):
+        return len(ret)
+    return 1
+
+
+def operation_namespace(conn, args):
+    """
+    Return the target namespace of the WBEMConnection method with the
+    arguments args (a dictionary), executed on the connection conn.
+    """
+    if args.get('namespace'):
+        return args['namespace']
+    for name in ('ClassName', 'InstanceName', 'ObjectName', 'NewInstance',
+                 'ModifiedInstance'):
+        obj = args.get(name)
+        path = getattr(obj, 'path', obj)
+        namespace = getattr(path, 'namespace', None)
+        if namespace:
+            return namespace
+    # The enumeration context of the pull operations includes the namespace
+    context = args.get('context')
+    if isinstance(context, tuple) and len(context) == 2:
+        return context[1]
+    return conn.default_namespace
+
+
+class StatisticsFile(object):
+    # pylint: disable=useless-object-inheritance,too-few-public-methods
+    """
+    Statistics file to which a record is appended for each WBEM operation
+    executed for a connection definition, in the JSON Lines format.
+    """
+
+    def __init__(self, file_path, connection_name, server):
+        self.file_path = file_path
+        self.connection_name = connection_name
+        self.server = server
+        self._lock = threading.Lock()
+
+    def write(self, record):
+        """
+        Append the record (a dictionary with the operation specific items) to
+        the file, with the connection name and server. The file is opened for
+        each record so that it is never left open and the records of
+        concurrent pywbemcli processes are not interleaved.
+        """
+        record = dict(record, connection=self.connection_name,
+                      server=self.server)
+        line = json.dumps(record, sort_keys=True) + '\n'
+        with self._lock:
+            with io.open(self.file_path, 'a', encoding='utf-8') as fp:
+                fp.write(six.text_type(line))
+
+
+class ValueStatistic(object):
+    # pylint: disable=useless-object-inheritance
+    """
+    Count, total, minimum and maximum of the values of a measure of the
+    executions of a WBEM operation (e.g. the request length).
+    """
+
+    def __init__(self):
+        self.count = 0
+        self.total = 0
+        self.min = None
+        self.max = None
+
+    def record(self, value):
+        """Record the value of an execution."""
+        self.count += 1
+        self.total += value
+        if self.min is None or value < self.min:
+            self.min = value
+        if self.max is None or value > self.max:
+            self.max = value
+
+    @property
+    def avg(self):
+        """float: Average of the values, or None if there are none."""
+        return float(self.total) / self.count if self.count else None
+
+
+class TimeStatistic(ValueStatistic):
+    """
+    Statistics of the times in seconds of the executions of a WBEM operation,
+    with a latency histogram and a sample of at most sample_size times for
+    the percentiles. Once more times have been recorded, the sample is kept
+    as a uniformly random sample of all times (reservoir sampling), so that
+    the memory does not grow with the number of executions. If sample_size
+    is None, all times are kept and the percentiles are exact.
+    """
+
+    def __init__(self, sample_size=SAMPLE_SIZE):
+        super(TimeStatistic, self).__init__()
+        self.sample_size = sample_size
+        # Number of times in each bucket of LATENCY_BUCKETS
+        self.buckets = [0] * (len(LATENCY_BUCKETS) + 1)
+        self.sample = []
+
+    def record(self, value):
+        """Record the time of an execution."""
+        super(TimeStatistic, self).record(value)
+        self.buckets[bucket_index(value)] += 1
+        if self.sample_size is None or len(self.sample) < self.sample_size:
+            self.sample.append(value)
+        else:
+            index = random.randrange(self.count)
+            if index < self.sample_size:
+                self.sample[index] = value
+
+    def percentile(self, percent):
+        """
+        Return the percentile percent of the times, which is estimated from
+        the sample if more than sample_size times have been recorded.
+        """
+        return percentile(sorted(self.sample), percent)
+
+
+class OperationStatistic(object):
+    # pylint: disable=useless-object-inheritance,too-many-instance-attributes
+    """
+    Statistics of the executions of one WBEM operation, keeping a sample of
+    at most sample_size times (all times if None) for the percentiles.
+    """
+
+    def __init__(self, name, sample_size=SAMPLE_SIZE):
+        self.name = name
+        self.count = 0
+        self.exception_count = 0
+        # Client and server time in seconds of the executions
+        self.time = TimeStatistic(sample_size)
+        self.server_time = TimeStatistic(sample_size)
+        # Length in bytes of the requests and replies
+        self.request_len = ValueStatistic()
+        self.reply_len = ValueStatistic()
+        self.object_count = 0
+
+    def record(self, time, server_time, request_len, reply_len, object_count,
+               exception):
+        # pylint: disable=too-many-arguments
+        """Record an execution of the operation."""
+        self.count += 1
+        if exception:
+            self.exception_count += 1
+        self.time.record(time)
+        if server_time is not None:
+            self.server_time.record(server_time)
+        self.request_len.record(request_len)
+        self.reply_len.record(reply_len)
+        self.object_count += object_count
+
+    @property
+    def total_time(self):
+        """float: Total client time of the executions in seconds."""
+        return self.time.total
+
+    @property
+    def objects_per_sec(self):
+        """float: Number of returned CIM objects per second of client time,
+        or None if the time is 0."""
+        total_time = self.total_time
+        return self.object_count / total_time if total_time else None
+
+    @property
+    def bytes_per_sec(self):
+        """float: Number of request and reply bytes per second of client
+        time, or None if the time is 0."""
+        total_time = self.total_time
+        return (self.request_len.total + self.reply_len.total) / \
+            total_time if total_time else None
+
+    def copy(self):
+        """Return a copy of this object."""
+        return copy.deepcopy(self)
+
+
+class OperationStatistics(object):
+    # pylint: disable=useless-object-inheritance
+    """
+    Statistics of the WBEM operations executed on one or more connections,
+    by operation name. Operations may be recorded concurrently by multiple
+    threads.
+
+    The percentiles of the operations are estimated from a sample of at most
+    sample_size times, or are exact if sample_size is None.
+    """
+
+    def __init__(self, sample_size=SAMPLE_SIZE):
+        self.sample_size = sample_size
+        self._lock = threading.Lock()
+        self._operations = {}
+        # StatisticsFile object to which the operations are appended, or None
+        self.stats_file = None
+
+    def record(self, name, time, server_time=None, request_len=0,
+               reply_len=0, object_count=0, exception=False):
+        # pylint: disable=too-many-arguments
+        """Record an execution of the operation name."""
+        with self._lock:
+            if name not in self._operations:
+                self._operations[name] = OperationStatistic(
+                    name, self.sample_size)
+            self._operations[name].record(time, server_time, request_len,
+                                          reply_len, object_count, exception)
+
+    def snapshot(self):
+        """
+        Return a list of copies of the OperationStatistic objects of the
+        operations, ordered by decreasing average time.
+        """
+        with self._lock:
+            stats = [stat.copy() for stat in self._operations.values()]
+        return sorted(stats, key=lambda stat: stat.total_time / stat.count,
+                      reverse=True)
+
+
+class StatisticsRecorder(BaseOperationRecorder):
+    """
+    Operation recorder that records the WBEM operations executed on a
+    connection in an OperationStatistics object.
+    """
+
+    def __init__(self, statistics):
+        self.statistics = statistics
+        self._conn = None
+        self._start_time = None
+        self._start_timestamp = None
+        super(StatisticsRecorder, self).__init__()
+
+    def reset(self, pull_op=None):
+        super(StatisticsRecorder, self).reset(pull_op)
+        self._start_time = None
+
+    def stage_wbem_connection(self, wbem_connection):
+        self._conn = wbem_connection
+
+    def stage_pywbem_args(self, method, **kwargs):
+        super(StatisticsRecorder, self).stage_pywbem_args(method, **kwargs)
+        self._start_time = default_timer()
+        self._start_timestamp = _time.time()
+
+    def record(self, pywbem_args, pywbem_result, http_request, http_response):
+        if self._start_time is None:
+            return
+        time = default_timer() - self._start_time
+        conn = self._conn
+        record = dict(
+            server_time=conn.last_server_response_time,
+            request_len=conn.last_request_len or 0,
+            reply_len=conn.last_reply_len or 0,
+            object_count=result_object_count(pywbem_result.ret),
+            exception=pywbem_result.exc is not None)
+        self.statistics.record(pywbem_args.method, time, **record)
+
+        stats_file = self.statistics.stats_file
+        if stats_file is not None:
+            record.update(
+                time=self._start_timestamp,
+                operation=pywbem_args.method,
+                namespace=operation_namespace(conn, pywbem_args.args),
+                client_time=time)
+            stats_file.write(record)
+
+
+def connection_statistics(conn):
+    """
+    Return the OperationStatistics object of the StatisticsRecorder of the
+    connection conn, or None if it has none.
+    """
+    for recorder in conn.operation_recorders:
+        if isinstance(recorder, StatisticsRecorder):
+            return recorder.statistics
+    return None
+
+
+def enable_statistics(conn, statistics=None):
+    """
+    Record the WBEM operations executed on the connection conn in the
+    OperationStatistics object statistics (a new one if None), unless they
+    are already recorded. Return the OperationStatistics object of the
+    connection.
+    """
+    existing = connection_statistics(conn)
+    if existing is not None:
+        return existing
+    if statistics is None:
+        statistics = OperationStatistics()
+    conn.add_operation_recorder(StatisticsRecorder(statistics))
+    return statistics
+
+
+def read_statistics_file(file_path):
+    """
+    Generator for the records (dictionaries) in the statistics file
+    file_path.
+
+    Raises:
+        IOError: The file cannot be read.
+        ValueError: A line of the file is not a valid record.
+    """
+    with io.open(file_path, 'r', encoding='utf-8') as fp:
+        for lineno, line in enumerate(fp, 1):
+            if not line.strip():
+                continue
+            try:
+                record = json.loads(line)
+                if 'operation' not in record or 'client_time' not in record:
+                    raise ValueError('missing operation or client_time')
+            except ValueError as exc:
+                raise ValueError('Invalid record in statistics file {} line '
+                                 '{}: {}'.format(file_path, lineno, exc))
+            yield record
@@ -42,7 +42,11 @@ However, they should be used from the ``pywbemcli`` namespace.
 __all__ = ['DEFAULT_CONNECTION_TIMEOUT', 'DEFAULT_OUTPUT_FORMAT',
            'DEFAULT_NAMESPACE', 'PYWBEMCLI_PROMPT', 'PYWBEMCLI_HISTORY_FILE',
            'DEFAULT_MAXPULLCNT', 'MAX_TIMEOUT', 'DEFAULT_URL_SCHEME',
-           'USE_TERMINAL_WIDTH', 'DEFAULT_TABLE_WIDTH']
+           'USE_TERMINAL_WIDTH', 'DEFAULT_TABLE_WIDTH',
+           'DEFAULT_TABLE_CHUNK_SIZE', 'USE_CLASS_CACHE',
+           'PYWBEMCLI_CLASS_CACHE_DIR', 'CLASS_CACHE_CHECK_INTERVAL',
+           'SESSION_CACHE_MAX_OBJECTS', 'USE_MOCK_CACHE',
+           'PYWBEMCLI_MOCK_CACHE_DIR', 'PYWBEMCLI_AGENT_DIR']
 
 #: Default value in seconds for a WBEMConnection to timeout if the value
 #: is not set by an input parameter.
@@ -100,6 +104,65 @@ USE_TERMINAL_WIDTH = True
 #: are output with no limit on width.
 DEFAULT_TABLE_WIDTH = 150
 
+#: Maximum number of rows in each table when objects that are received
+#: incrementally (ex. instance enumerate --stream) are displayed in a table
+#: output format. The result is displayed as a sequence of tables of at most
+#: this many rows so that the complete result is never held in memory.
+#: Positive integer.
+DEFAULT_TABLE_CHUNK_SIZE = 1000
+
+#: If True, the class definitions that commands retrieve as a basis for
+#: their processing (ex. instance create, instance modify, instance
+#: invokemethod) are kept in a persistent class cache for connections
+#: defined in the connections file, so that they are retrieved from the WBEM
+#: server only once. Mock servers are never cached. Since the cache of a
+#: namespace is checked against the WBEM server only every
+#: CLASS_CACHE_CHECK_INTERVAL seconds, and only for changed class names,
+#: changes of classes made by other clients may not be seen. The cache can be
+#: bypassed for a command with the --no-class-cache general option.
+#: If False, the class definitions are retrieved from the server each time.
+USE_CLASS_CACHE = True
+
+#: Directory path of the persistent class cache. It contains a subdirectory
+#: for each connection name with a file for each namespace.
+#: If the path starts with tilde, it is properly expanded.
+PYWBEMCLI_CLASS_CACHE_DIR = '~/.pywbemcli_class_cache'
+
+#: Minimum time in seconds between checks of the class cache of a namespace
+#: against the WBEM server. The check compares the class names in the
+#: namespace with those recorded in the cache and invalidates the cache of
+#: the namespace if they differ. 0 causes a check on each command.
+CLASS_CACHE_CHECK_INTERVAL = 600
+
+#: Maximum number of CIM objects (classes, class names and qualifier
+#: declarations) kept in the session cache of a connection. In interactive
+#: mode, the session cache keeps these objects across commands. If the
+#: maximum is exceeded, the least recently used results are removed.
+SESSION_CACHE_MAX_OBJECTS = 20000
+
+#: If True, the mock repository built from the files specified with the
+#: --mock-server general option is kept in a persistent mock cache, so that
+#: subsequent pywbemcli commands with the same files load it instead of
+#: compiling the MOF files and executing the Python scripts again. The
+#: cached mock repository is rebuilt when any of the files, the files that
+#: the Python scripts declare as their dependencies, or the pywbem version
+#: changes. Mock repositories built by Python scripts that do not declare
+#: their dependencies or that define method callbacks are not cached.
+#: If False, the mock repository is built on each command.
+USE_MOCK_CACHE = True
+
+#: Directory path of the persistent mock cache. It contains a file for each
+#: combination of mock files and default namespace. It can be overridden
+#: with the environment variable of the same name.
+#: If the path starts with tilde, it is properly expanded.
+PYWBEMCLI_MOCK_CACHE_DIR = '~/.pywbemcli_mock_cache'
+
+#: Directory path of the sockets of the pywbemcli agents. It contains a Unix
+#: domain socket for each connections file that is served by an agent, and
+#: is accessible only by its owner since the agents execute commands with the
+#: connection definitions of their connections file.
+#: If the path starts with tilde, it is properly expanded.
+PYWBEMCLI_AGENT_DIR = '~/.pywbemcli_agent'
 
 #: If True, the auto-suggestion capability is enabled in the interactive
 #: mode.  This capability uses the history file to provide suggestions for
@@ -22,12 +22,10 @@ from __future__ import absolute_import, print_function
 
 import os
 import sys
+import time
+import shlex
 import traceback
-from copy import deepcopy
 import click
-import click_repl
-from prompt_toolkit.history import FileHistory
-from prompt_toolkit.auto_suggest import AutoSuggestFromHistory
 
 import pywbem
 from pywbem import LOGGER_SIMPLE_NAMES, \
@@ -36,11 +34,12 @@ from pywbem import LOGGER_SIMPLE_NAMES, \
 
 from ._context_obj import ContextObj, display_click_context
 from ._common import GENERAL_OPTIONS_METAVAR, TABLE_FORMATS, \
-    CIM_OBJECT_OUTPUT_FORMATS
+    CIM_OBJECT_OUTPUT_FORMATS, CMD_OPTS_TXT, format_table
 from ._pywbem_server import PywbemServer
 from .config import DEFAULT_OUTPUT_FORMAT, DEFAULT_NAMESPACE, \
     PYWBEMCLI_PROMPT, PYWBEMCLI_HISTORY_FILE, DEFAULT_MAXPULLCNT, \
-    DEFAULT_CONNECTION_TIMEOUT, MAX_TIMEOUT, USE_AUTOSUGGEST
+    DEFAULT_CONNECTION_TIMEOUT, MAX_TIMEOUT, USE_AUTOSUGGEST, \
+    CLASS_CACHE_CHECK_INTERVAL
 from ._connection_repository import ConnectionRepository
 from ._click_extensions import PywbemcliTopGroup
 
@@ -54,13 +53,45 @@ DEFAULT_TIMESTATS = False
 DEFAULT_PULL_CHOICE = 'either'
 USE_PULL_CHOICE = {'either': None, 'yes': True, 'no': False}
 
+# Key of the connection pool of the interactive session in the click context
+# meta data
+CONNECTION_POOL_META_KEY = 'pywbemcli.connection_pool'
+
 # enable -h as additional help option
 CONTEXT_SETTINGS = dict(help_option_names=['-h', '--help'])
 
+# Command groups defined in separate modules, with the module name and the
+# short help of the command group. The modules are imported only when the
+# command group is used, to reduce the startup time of pywbemcli. The short
+# help is displayed in the general help and must be the first line of the
+# docstring of the command group.
+_PACKAGE = __name__.rpartition('.')[0]
+LAZY_COMMANDS = {
+    'agent': (_PACKAGE + '._cmd_agent',
+              'Command group for the pywbemcli agent.'),
+    'cache': (_PACKAGE + '._cmd_cache',
+              'Command group for caches of the current connection.'),
+    'class': (_PACKAGE + '._cmd_class',
+              'Command group for CIM classes.'),
+    'connection': (_PACKAGE + '._cmd_connection',
+                   'Command group for WBEM connection definitions.'),
+    'fanout': (_PACKAGE + '._cmd_fanout',
+               'Execute a command for multiple WBEM connection definitions.'),
+    'instance': (_PACKAGE + '._cmd_instance',
+                 'Command group for CIM instances.'),
+    'qualifier': (_PACKAGE + '._cmd_qualifier',
+                  'Command group for CIM qualifier declarations.'),
+    'server': (_PACKAGE + '._cmd_server',
+               'Command group for WBEM servers.'),
+    'stats': (_PACKAGE + '._cmd_stats',
+              'Command group for WBEM operation statistics files.'),
+}
+
 
 # pylint: disable=bad-continuation
 # PywbemcliTopGroup sets order commands listed in help output
 @click.group(invoke_without_command=True, cls=PywbemcliTopGroup,
+             lazy_commands=LAZY_COMMANDS,
              context_settings=CONTEXT_SETTINGS,
              options_metavar=GENERAL_OPTIONS_METAVAR)
 @click.option('-n', '--name', 'svr_name', type=str, metavar='NAME',
@@ -186,6 +217,38 @@ CONTEXT_SETTINGS = dict(help_option_names=['-h', '--help'])
 @click.option('-T', '--timestats', is_flag=True,
               # defaulted in code
               help='Show time statistics of WBEM server operations.')
+@click.option('--stats-file', type=str, metavar='FILE',
+              # defaulted in code
+              envvar=PywbemServer.stats_file_envvar,
+              help='Append a record with the statistics of each WBEM server '
+                   'operation to the statistics file FILE, in the JSON Lines '
+                   'format. The statistics files can be summarized and '
+                   'compared with the stats command group. '
+                   'Default: EnvVar {ev}, or no statistics file.'.
+                   format(ev=PywbemServer.stats_file_envvar))
+@click.option('--profile', is_flag=True,
+              # defaulted in code
+              help='Show the time of the phases of the processing of each '
+                   'command: the WBEM server operations (CIM-XML request, '
+                   'server and network, CIM-XML parse) and the sorting and '
+                   'formatting of the result.')
+@click.option('--profile-file', type=str, metavar='FILE',
+              # defaulted in code
+              help='Save the cProfile profile data of each command to the '
+                   'file FILE in the format of the Python pstats module. The '
+                   'file is overwritten by each command. '
+                   'Default: No profile data is saved.')
+@click.option('--no-class-cache', is_flag=True,
+              # defaulted in code
+              envvar=PywbemServer.no_class_cache_envvar,
+              help='Retrieve the classes from the WBEM server instead of using '
+                   'the persistent class cache of the connection. Without '
+                   'this option, changes of classes made by other clients are '
+                   'detected only when the class names of the namespace '
+                   'change, and at most every {interval} seconds. '
+                   'Default: EnvVar {ev}, or the class cache is used.'.
+                   format(ev=PywbemServer.no_class_cache_envvar,
+                          interval=CLASS_CACHE_CHECK_INTERVAL))
 @click.option('-d', '--default-namespace', type=str, metavar='NAMESPACE',
               default=None,
               envvar=PywbemServer.defaultnamespace_envvar,
@@ -229,7 +292,9 @@ CONTEXT_SETTINGS = dict(help_option_names=['-h', '--help'])
 @click.pass_context
 def cli(ctx, server, svr_name, default_namespace, user, password, timeout,
         verify, certfile, keyfile, ca_certs, output_format, use_pull,
-        pull_max_cnt, mock_server, verbose=None, timestats=None, log=None):
+        pull_max_cnt, mock_server, verbose=None, timestats=None, log=None,
+        stats_file=None, profile=None, profile_file=None,
+        no_class_cache=None):
     """
     Pywbemcli is a command line WBEM client that uses the DMTF CIM-XML protocol
     to communicate with WBEM servers. Pywbemcli can:
@@ -479,12 +544,16 @@ def cli(ctx, server, svr_name, default_namespace, user, password, timeout,
                     "connections file '{}'".
                     format(svr_name, connections.connections_file))
 
-        # If other parameters, modify the existing connection and reset it.
-        # TODO: refactor this code to avoid deepcopy when not needed.
+        # If other connection parameters, apply them to a copy of the
+        # definition of the current connection and use the server with these
+        # parameters from the connection pool of the interactive session.
         else:
-            if pywbem_server is None:
-                # Copy to keep the original clean from any changes
-                pywbem_server = deepcopy(ctx.obj.pywbem_server)
+            if ctx.obj.pywbem_server:
+                # Copy the definition to keep the original clean from any
+                # changes, without copying its connection and caches
+                pywbem_server = PywbemServer.create(
+                    replace_underscores=True,
+                    **ctx.obj.pywbem_server.to_dict())
             if pywbem_server:
                 modified_server = False
                 if server:
@@ -517,6 +586,7 @@ def cli(ctx, server, svr_name, default_namespace, user, password, timeout,
                     modified_server = True
                 if timeout:
                     pywbem_server.timeout = resolved_timeout
+                    modified_server = True
                 if server:
                     pywbem_server.server = server
                     modified_server = True
@@ -524,11 +594,16 @@ def cli(ctx, server, svr_name, default_namespace, user, password, timeout,
                     pywbem_server.default_namespace = resolved_default_namespace
                     modified_server = True
                 if modified_server:
-                    pywbem_server.reset()
+                    pywbem_server = pooled_server(ctx, pywbem_server)
                 else:
+                    # Keep the current server, and make it available for
+                    # later commands that switch back to its parameters
                     pywbem_server = ctx.obj.pywbem_server
+                    pooled_server(ctx, pywbem_server)
             else:
                 pywbem_server = create_server_instance(svr_name)
+                if pywbem_server:
+                    pywbem_server = pooled_server(ctx, pywbem_server)
 
         # The following variables are maintained only in the context_obj and
         # not attached to any particular connection. If the cli argument is
@@ -544,6 +619,14 @@ def cli(ctx, server, svr_name, default_namespace, user, password, timeout,
             resolved_timestats = ctx.obj.timestats
         if log is None:
             log = ctx.obj.log
+        if stats_file is None:
+            stats_file = ctx.obj.stats_file
+        if not profile:  # Defaults to False, not None
+            profile = ctx.obj.profile
+        if profile_file is None:
+            profile_file = ctx.obj.profile_file
+        if not no_class_cache:  # Defaults to False, not None
+            no_class_cache = ctx.obj.no_class_cache
         if verbose is None:
             verbose = ctx.obj.verbose
 
@@ -554,7 +637,8 @@ def cli(ctx, server, svr_name, default_namespace, user, password, timeout,
                          resolved_use_pull,
                          resolved_pull_max_cnt,
                          resolved_timestats,
-                         log, verbose)
+                         log, verbose, stats_file, profile, profile_file,
+                         no_class_cache)
     if verbose and os.getenv('PYWBEMCLI_DIAGNOSTICS'):
         print('CONTEXT_OBJ {!r}'.format(ctx.obj))
         print('CLICK CTX {}'.format(ctx))
@@ -565,6 +649,25 @@ def cli(ctx, server, svr_name, default_namespace, user, password, timeout,
         ctx.invoke(repl)
 
 
+def pooled_server(ctx, pywbem_server):
+    """
+    Return the PywbemServer object from the connection pool of the
+    interactive session that has the same connection parameters as
+    pywbem_server, adding pywbem_server to the pool if there is none.
+
+    The connection pool keeps the PywbemServer objects used in an interactive
+    session with their connection to the WBEM server, WBEMServer object and
+    session cache, so that commands that only change general options that
+    are not connection parameters (e.g. --output-format) or that switch back
+    to a connection used before do not connect to the WBEM server again. The
+    pool is kept in the meta data of the click context, which is shared by
+    the contexts of all commands of the interactive session.
+    """
+    connection_pool = ctx.meta.setdefault(CONNECTION_POOL_META_KEY, {})
+    return connection_pool.setdefault(pywbem_server.connection_key(),
+                                      pywbem_server)
+
+
 @cli.command('help')
 @click.pass_context
 def repl_help(ctx):  # pylint: disable=unused-argument
@@ -602,6 +705,11 @@ def repl(ctx):
     Pywbemcli may be terminated from this mode by entering
     <CTRL-D>, :q, :quit, :exit
     """
+    # Imported here since the interactive mode packages add significantly to
+    # the startup time of pywbemcli
+    import click_repl
+    from prompt_toolkit.history import FileHistory
+    from prompt_toolkit.auto_suggest import AutoSuggestFromHistory
 
     history_file = PYWBEMCLI_HISTORY_FILE
     if history_file.startswith('~'):
@@ -618,3 +726,99 @@ def repl(ctx):
         prompt_kwargs['auto_suggest'] = AutoSuggestFromHistory()
 
     click_repl.repl(ctx, prompt_kwargs=prompt_kwargs)
+
+
+@cli.command('batch', options_metavar=CMD_OPTS_TXT)
+@click.argument('command_file', type=click.File('r'), metavar='FILE',
+                required=False, default='-')
+@click.option('--stop-on-error', is_flag=True, default=False,
+              help='Stop executing commands after the first command that '
+                   'failed. Default: Execute all commands.')
+@click.pass_context
+def batch(ctx, command_file, stop_on_error):
+    """
+    Execute the pywbemcli commands in a file.
+
+    Execute the pywbemcli commands in FILE, one command per line, using the
+    same connection to the WBEM server for all commands, like in interactive
+    mode. If FILE is '-' or omitted, the commands are read from standard
+    input. Each line has the syntax of a command in interactive mode, i.e.
+    optional general options followed by a command and its arguments. Empty
+    lines and comments starting with '#' are ignored.
+
+    After the commands, a summary with the exit code and execution time of
+    each command is displayed on standard error. The exit code of the batch
+    command is 1 if any command failed and otherwise 0.
+
+    Example:
+
+      pywbemcli -n myconn batch commands.txt
+    """
+    group_ctx = ctx.parent or ctx
+    rows = []
+    for line_num, line in enumerate(command_file, 1):
+        try:
+            args = shlex.split(line, comments=True)
+        except ValueError as exc:
+            click.echo('Line {}: {}'.format(line_num, exc), err=True)
+            args = None
+            exit_code = 1
+            elapsed = 0.0
+        else:
+            if not args:
+                continue
+            start_time = time.time()
+            exit_code = execute_batch_command(group_ctx, args)
+            elapsed = time.time() - start_time
+        rows.append([line_num, line.strip(), exit_code,
+                     '{:.3f}'.format(elapsed)])
+        if exit_code and stop_on_error:
+            break
+
+    output_format = ctx.obj.output_format if ctx.obj else None
+    if output_format not in TABLE_FORMATS:
+        output_format = 'simple'
+    failed = len([row for row in rows if row[2]])
+    title = 'Batch summary: {} commands, {} failed'.format(len(rows), failed)
+    click.echo(format_table(rows, ['Line', 'Command', 'Exit code', 'Time (s)'],
+                            title=title, table_format=output_format),
+               err=True)
+    if failed:
+        ctx.exit(1)
+
+
+def execute_batch_command(group_ctx, args, mode='batch',
+                          disallowed_cmds=('batch', 'repl')):
+    """
+    Execute a command of the batch command as a subcommand of the context of
+    the pywbemcli command, like an interactive command, and return its exit
+    code. Error messages are displayed on standard error.
+
+    The commands in disallowed_cmds are rejected with an error message that
+    they are not allowed in the mode (e.g. 'batch').
+    """
+    group = group_ctx.command
+    try:
+        with group.make_context(None, args, parent=group_ctx) as cmd_ctx:
+            cmd_name = cmd_ctx.protected_args[0] if cmd_ctx.protected_args \
+                else None
+            if cmd_name is None:
+                raise click.ClickException('No command specified')
+            if cmd_name in disallowed_cmds:
+                raise click.ClickException(
+                    "Command '{}' is not allowed in {} mode".
+                    format(cmd_name, mode))
+            group.invoke(cmd_ctx)
+    except click.ClickException as exc:
+        exc.show()
+        return exc.exit_code
+    except click.exceptions.Exit as exc:
+        return exc.exit_code
+    except click.Abort:
+        click.echo('Aborted!', err=True)
+        return 1
+    except SystemExit as exc:
+        if exc.code is None:
+            return 0
+        return exc.code if isinstance(exc.code, int) else 1
+    return 0
@@ -0,0 +1,338 @@
+#!/usr/bin/env python
+
+# (C) Copyright 2020 IBM Corp.
+# (C) Copyright 2020 Inova Development Inc.
+# All Rights Reserved
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""
+Benchmarks of pywbemcli commands against mock WBEM servers with synthetic
+models of realistic sizes (see synthetic_model.py).
+
+The 'run' command executes the benchmark scenarios for each model size with
+the batch command of pywbemcli, so that the mock repository is built (or
+loaded from the mock cache) only once per model size, and saves the times of
+the scenarios in a JSON results file. The 'compare' command compares two
+results files, for example the baseline of a previous commit with the
+results of the current commit, and fails if a scenario got slower by more
+than a threshold.
+
+Examples:
+
+    tests/benchmark/run_benchmarks.py run --sizes 10k,100k -o new.json
+    tests/benchmark/run_benchmarks.py compare baseline.json new.json
+"""
+
+from __future__ import absolute_import, print_function
+
+import os
+import re
+import sys
+import json
+import argparse
+import platform
+import tempfile
+from datetime import datetime
+from subprocess import Popen, PIPE
+import tabulate
+
+import pywbem
+
+BENCHMARK_DIR = os.path.dirname(os.path.abspath(__file__))
+REPO_DIR = os.path.dirname(os.path.dirname(BENCHMARK_DIR))
+sys.path.insert(0, REPO_DIR)
+
+# pylint: disable=wrong-import-position
+from pywbemtools.pywbemcli import __version__ as \
+    pywbemtools_version  # noqa: E402
+from pywbemtools.pywbemcli._common import TABLE_FORMATS, \
+    CIM_OBJECT_OUTPUT_FORMATS  # noqa: E402
+from tests.benchmark.synthetic_model import ROOT_CLASSNAME, \
+    ASSOC_CLASSNAME, mock_script  # noqa: E402
+
+# Model sizes by name, with the parameters of synthetic_model.build_model()
+# that differ from its defaults. The models of the sizes 10k and up have 1111
+# classes. The smoke model is for quickly verifying the benchmarks themselves.
+MODEL_SIZES = {
+    'smoke': dict(depth=2, width=10, instances_per_class=9),
+    '10k': dict(depth=3, width=10, instances_per_class=9),
+    '100k': dict(depth=3, width=10, instances_per_class=90),
+    '1m': dict(depth=3, width=10, instances_per_class=900),
+}
+
+DEFAULT_SIZES = '10k'
+
+# Change of the median time of a scenario in percent that is reported as
+# a regression by the compare command
+DEFAULT_THRESHOLD = 10.0
+
+# Minimum increase of the median time of a scenario in seconds that is
+# reported as a regression, so that the noise of very fast scenarios is not
+DEFAULT_MIN_DELTA = 0.01
+
+INSTANCE_NAME = '{}.InstanceID="bench-0"'.format(ROOT_CLASSNAME)
+
+# Benchmark scenarios, as tuples of name and pywbemcli command (as in
+# interactive mode)
+SCENARIOS = \
+    [('instance enumerate -o {}'.format(fmt),
+      '-o {} instance enumerate {}'.format(fmt, ROOT_CLASSNAME))
+     for fmt in TABLE_FORMATS + CIM_OBJECT_OUTPUT_FORMATS] + \
+    [('instance enumerate --names-only',
+      'instance enumerate {} --names-only'.format(ROOT_CLASSNAME)),
+     ('instance count', 'instance count BENCH_*'),
+     ('class find', 'class find BENCH_*'),
+     ('class tree', 'class tree'),
+     ('class references', 'class references {}'.format(ROOT_CLASSNAME)),
+     ('class associators', 'class associators {}'.format(ROOT_CLASSNAME)),
+     ('instance references',
+      "instance references '{}'".format(INSTANCE_NAME)),
+     ('instance associators',
+      "instance associators '{}'".format(INSTANCE_NAME)),
+     ('instance references -o table',
+      "-o table instance references '{}'".format(INSTANCE_NAME))]
+
+# Command executed before the scenarios, to establish the connection to the
+# mock WBEM server
+WARMUP_COMMAND = 'class get {}'.format(ASSOC_CLASSNAME)
+
+# Command executed before each scenario so that the scenarios do not use the
+# results of previous scenarios
+CLEAR_COMMAND = 'cache clear'
+
+# Line of the summary of the batch command for a command
+BATCH_SUMMARY_LINE = re.compile(r'^ *([0-9]+) +.*? +([0-9]+) +([0-9.]+)$')
+
+
+def model_script(work_dir, size):
+    """
+    Write the mock Python script that builds the synthetic model of the size
+    in the work directory and return its path name.
+    """
+    script_file = os.path.join(work_dir, 'model_{}.py'.format(size))
+    with open(script_file, 'w') as fp:
+        fp.write(mock_script(MODEL_SIZES[size]))
+    return script_file
+
+
+def run_size(work_dir, size, scenarios, repeat, verbose):
+    """
+    Run the scenarios for the model size repeat times and return a
+    dictionary with the list of times in seconds of each scenario.
+    """
+    lines = [WARMUP_COMMAND]
+    line_scenarios = {}
+    for _ in range(repeat):
+        for name, command in scenarios:
+            lines.append(CLEAR_COMMAND)
+            lines.append(command)
+            line_scenarios[len(lines)] = name
+
+    batch_file = os.path.join(work_dir, 'commands_{}.txt'.format(size))
+    with open(batch_file, 'w') as fp:
+        fp.write('\n'.join(lines) + '\n')
+
+    args = ['pywbemcli', '--mock-server', model_script(work_dir, size),
+            'batch', batch_file]
+    if verbose:
+        print('Executing: {}'.format(' '.join(args)))
+    with open(os.devnull, 'w') as devnull:
+        proc = Popen(args, stdout=devnull, stderr=PIPE,
+                     universal_newlines=True)
+        _, stderr = proc.communicate()
+
+    times = {}
+    for line in stderr.splitlines():
+        match = BATCH_SUMMARY_LINE.match(line)
+        if not match or int(match.group(1)) not in line_scenarios:
+            continue
+        name = line_scenarios[int(match.group(1))]
+        if int(match.group(2)) != 0:
+            raise RuntimeError('Scenario {!r} failed for model {}:\n{}'.
+                               format(name, size, stderr))
+        times.setdefault(name, []).append(float(match.group(3)))
+    if len(times) != len(scenarios):
+        raise RuntimeError('pywbemcli batch command failed for model {}:\n{}'.
+                           format(size, stderr))
+    return times
+
+
+def median(values):
+    """Return the median of a non-empty list of values."""
+    values = sorted(values)
+    mid = len(values) // 2
+    if len(values) % 2:
+        return values[mid]
+    return (values[mid - 1] + values[mid]) / 2.0
+
+
+def git_commit():
+    """Return the commit ID of the repository, or None if unknown."""
+    try:
+        proc = Popen(['git', 'rev-parse', 'HEAD'], cwd=REPO_DIR, stdout=PIPE,
+                     stderr=PIPE, universal_newlines=True)
+        stdout, _ = proc.communicate()
+    except OSError:
+        return None
+    return stdout.strip() if proc.returncode == 0 else None
+
+
+def cmd_run(args):
+    """Execute the run command."""
+    sizes = [size.strip().lower() for size in args.sizes.split(',')]
+    for size in sizes:
+        if size not in MODEL_SIZES:
+            sys.exit('Invalid model size {!r}; valid sizes are: {}'.format(
+                size, ', '.join(MODEL_SIZES)))
+    scenarios = [(name, command) for name, command in SCENARIOS
+                 if not args.scenarios or
+                 re.search(args.scenarios, name)]
+    if not scenarios:
+        sys.exit('No scenarios match {!r}'.format(args.scenarios))
+
+    work_dir = args.work_dir or tempfile.mkdtemp(prefix='pywbemcli_bench_')
+    if not os.path.isdir(work_dir):
+        os.makedirs(work_dir)
+
+    results = {}
+    for size in sizes:
+        print('Running {} scenarios for model {} ...'.
+              format(len(scenarios), size))
+        times = run_size(work_dir, size, scenarios, args.repeat, args.verbose)
+        results[size] = {name: {'median': median(times[name]),
+                                'min': min(times[name]),
+                                'times': times[name]}
+                         for name in times}
+
+    data = {
+        'date': datetime.now().isoformat(),
+        'commit': git_commit(),
+        'pywbemtools_version': pywbemtools_version,
+        'pywbem_version': pywbem.__version__,
+        'python_version': platform.python_version(),
+        'platform': platform.platform(),
+        'repeat': args.repeat,
+        'models': {size: MODEL_SIZES[size] for size in sizes},
+        'results': results,
+    }
+    with open(args.output, 'w') as fp:
+        json.dump(data, fp, indent=2, sort_keys=True)
+        fp.write('\n')
+
+    rows = [[size, name, result['median'], result['min']]
+            for size in sizes
+            for name, result in sorted(results[size].items())]
+    print(tabulate.tabulate(rows, ['Model', 'Scenario', 'Median (s)',
+                                   'Min (s)'], floatfmt='.3f'))
+    print('Results saved in {}'.format(args.output))
+
+
+def cmd_compare(args):
+    """Execute the compare command. Returns the exit code."""
+    with open(args.baseline) as fp:
+        baseline = json.load(fp)
+    with open(args.results) as fp:
+        current = json.load(fp)
+
+    rows = []
+    regressions = 0
+    for size in sorted(current['results']):
+        for name, result in sorted(current['results'][size].items()):
+            base = baseline['results'].get(size, {}).get(name)
+            if base is None:
+                rows.append([size, name, None, result['median'], None, 'new'])
+                continue
+            change = (result['median'] - base['median']) * 100.0 / \
+                base['median'] if base['median'] else 0.0
+            delta = result['median'] - base['median']
+            status = ''
+            if change > args.threshold and delta > args.min_delta:
+                status = 'REGRESSION'
+                regressions += 1
+            elif change < -args.threshold and -delta > args.min_delta:
+                status = 'improvement'
+            rows.append([size, name, base['median'], result['median'],
+                         '{:+.1f}%'.format(change), status])
+
+    print('Comparison of {} ({}) and {} ({})'.format(
+        args.baseline, (baseline.get('commit') or 'unknown')[:12],
+        args.results, (current.get('commit') or 'unknown')[:12]))
+    print(tabulate.tabulate(rows, ['Model', 'Scenario', 'Baseline (s)',
+                                   'Current (s)', 'Change', 'Status'],
+                            floatfmt='.3f'))
+    if regressions:
+        print('{} scenarios are more than {}% and {} sec. slower than the '
+              'baseline'.format(regressions, args.threshold, args.min_delta))
+        return 1
+    return 0
+
+
+def main():
+    """Parse the command line arguments and execute the command."""
+    parser = argparse.ArgumentParser(
+        description='Benchmarks of pywbemcli commands against mock WBEM '
+                    'servers with synthetic models.')
+    subparsers = parser.add_subparsers(dest='command')
+    subparsers.required = True
+
+    run_parser = subparsers.add_parser(
+        'run', help='Run the benchmarks and save the results.')
+    run_parser.add_argument(
+        '--sizes', default=DEFAULT_SIZES,
+        help='Comma-separated list of the model sizes [{}]. Default: {}.'.
+        format('|'.join(MODEL_SIZES), DEFAULT_SIZES))
+    run_parser.add_argument(
+        '--scenarios', metavar='REGEX',
+        help='Run only the scenarios whose names match the regular '
+             'expression REGEX. Default: All scenarios.')
+    run_parser.add_argument(
+        '--repeat', type=int, default=3,
+        help='Number of executions of each scenario. Default: 3.')
+    run_parser.add_argument(
+        '-o', '--output', default='benchmark_results.json',
+        help='Path name of the JSON results file. '
+             'Default: benchmark_results.json.')
+    run_parser.add_argument(
+        '--work-dir',
+        help='Directory for the generated model scripts and batch files. '
+             'Default: A new temporary directory.')
+    run_parser.add_argument(
+        '-v', '--verbose', action='store_true',
+        help='Display the executed pywbemcli commands.')
+
+    compare_parser = subparsers.add_parser(
+        'compare', help='Compare results with a baseline.')
+    compare_parser.add_argument(
+        'baseline', help='Path name of the JSON results file of the '
+                         'baseline.')
+    compare_parser.add_argument(
+        'results', help='Path name of the JSON results file to be compared.')
+    compare_parser.add_argument(
+        '--threshold', type=float, default=DEFAULT_THRESHOLD,
+        help='Increase of the median time of a scenario in percent that is '
+             'a regression. Default: {}.'.format(DEFAULT_THRESHOLD))
+    compare_parser.add_argument(
+        '--min-delta', type=float, default=DEFAULT_MIN_DELTA,
+        help='Minimum increase of the median time of a scenario in seconds '
+             'that is a regression. Default: {}.'.format(DEFAULT_MIN_DELTA))
+
+    args = parser.parse_args()
+    if args.command == 'run':
+        cmd_run(args)
+        return 0
+    return cmd_compare(args)
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,463 @@
+#!/usr/bin/env python
+
+# (C) Copyright 2020 IBM Corp.
+# (C) Copyright 2020 Inova Development Inc.
+# All Rights Reserved
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""
+Parametric synthetic CIM model for mock WBEM servers, for benchmarks and
+scale tests of pywbemcli.
+
+The model is defined by the parameters of build_model() and consists of the
+following CIM objects in each of its namespaces:
+
+* A class hierarchy with the root class BENCH_Element, where each class has
+  `width` subclasses down to the depth `depth` of the hierarchy. The root
+  class has the key property InstanceID and `properties` properties whose
+  CIM types cycle through `property_types`. Each subclass adds
+  `subclass_properties` properties named after its depth in the hierarchy,
+  so that the instances of the classes have different sets of properties.
+
+* `instances_per_class` instances of each class of the hierarchy. String
+  values have `string_size` characters. The values are generated
+  deterministically from `seed`.
+
+* The association class BENCH_Dependency and on average `fanout`
+  association instances for each instance of the hierarchy, that reference
+  the instance and a random instance.
+
+The instances are added to the mock repository in bulk rather than by
+compiling MOF or with add_cimobjects(), which copies and checks each
+instance, so that models with millions of instances can be built.
+
+The module can be used in the following ways:
+
+* As a Python module: build_model() adds the model to a
+  PYWBEMCLIFakedConnection or FakedWBEMConnection object.
+
+* As a mock script for the --mock-server general option of pywbemcli, which
+  builds the model with the default parameters:
+
+    pywbemcli --mock-server tests/benchmark/synthetic_model.py class tree
+
+* As a tool, which writes a mock script for the --mock-server general option
+  that builds the model with the specified parameters, or displays the size
+  of the model and the time to build it:
+
+    tests/benchmark/synthetic_model.py --depth 2 --width 20 \\
+        --instances-per-class 100 --script model.py
+    pywbemcli --mock-server model.py instance count BENCH_*
+
+  Since the mock cache of pywbemcli keeps the mock repository built by a
+  mock script, the model of a generated mock script is built only once.
+"""
+
+from __future__ import absolute_import, print_function
+
+import os
+import math
+import sys
+import pprint
+import random
+import string
+import argparse
+from datetime import datetime, timedelta
+from timeit import default_timer
+
+from pywbem import CIMClass, CIMProperty, CIMQualifier, CIMInstance, \
+    CIMInstanceName, CIMDateTime, MinutesFromUTC, Uint8, Uint16, Uint32, \
+    Uint64, Sint8, Sint16, Sint32, Sint64, Real32, Real64
+
+ROOT_CLASSNAME = 'BENCH_Element'
+ASSOC_CLASSNAME = 'BENCH_Dependency'
+
+# CIM types of the properties that can be generated
+PROPERTY_TYPES = ('string', 'boolean', 'char16', 'datetime', 'uint8',
+                  'uint16', 'uint32', 'uint64', 'sint8', 'sint16', 'sint32',
+                  'sint64', 'real32', 'real64')
+
+# Default parameters of build_model()
+DEFAULT_PARAMETERS = {
+    'depth': 2,
+    'width': 10,
+    'namespaces': 1,
+    'instances_per_class': 10,
+    'properties': 6,
+    'property_types': ('string', 'uint16', 'boolean', 'uint64', 'datetime',
+                       'real64'),
+    'subclass_properties': 1,
+    'fanout': 0.1,
+    'string_size': 20,
+    'seed': 1,
+}
+
+QUALIFIER_DECLARATIONS_MOF = """
+Qualifier Association : boolean = false,
+    Scope(association),
+    Flavor(DisableOverride, ToSubclass);
+
+Qualifier Description : string = null,
+    Scope(any),
+    Flavor(EnableOverride, ToSubclass, Translatable);
+
+Qualifier Key : boolean = false,
+    Scope(property, reference),
+    Flavor(DisableOverride, ToSubclass);
+"""
+
+DATETIME_BASE = datetime(2020, 1, 1, tzinfo=MinutesFromUTC(0))
+
+# Integer CIM types with their Python type and the range of the generated
+# values. The values of the small types have a small range, like the values
+# of properties with value maps.
+INTEGER_TYPES = {
+    'uint8': (Uint8, 0, 9),
+    'uint16': (Uint16, 0, 9),
+    'uint32': (Uint32, 0, 2 ** 32 - 1),
+    'uint64': (Uint64, 0, 2 ** 64 - 1),
+    'sint8': (Sint8, -9, 9),
+    'sint16': (Sint16, -9, 9),
+    'sint32': (Sint32, -2 ** 31, 2 ** 31 - 1),
+    'sint64': (Sint64, -2 ** 63, 2 ** 63 - 1),
+}
+
+
+def model_size(depth, width, namespaces, instances_per_class, fanout,
+               **params):
+    # pylint: disable=unused-argument
+    """
+    Return a tuple with the number of classes of the class hierarchy, and
+    the number of instances of the hierarchy and association instances in
+    all namespaces of the model defined by the parameters.
+    """
+    classes = sum(width ** level for level in range(depth + 1))
+    instances = classes * instances_per_class
+    associations = int(math.ceil(instances * fanout))
+    return classes, instances * namespaces, associations * namespaces
+
+
+def class_name(index):
+    """Return the name of the class with the index in the hierarchy."""
+    return ROOT_CLASSNAME if index == 0 else \
+        '{}{:04d}'.format(ROOT_CLASSNAME, index)
+
+
+def property_name(cim_type, number, depth=0):
+    """Return the name of a property of the class with the depth."""
+    type_name = cim_type.capitalize()
+    if depth:
+        return 'Level{}{}Prop{}'.format(depth, type_name, number)
+    return '{}Prop{}'.format(type_name, number)
+
+
+def class_properties(property_types, count, depth=0):
+    """
+    Return a list of tuples of the name and CIM type of count properties of a
+    class with the depth in the hierarchy, whose types cycle through
+    property_types.
+    """
+    types = [property_types[i % len(property_types)] for i in range(count)]
+    return [(property_name(cim_type, i + 1, depth), cim_type)
+            for i, cim_type in enumerate(types)]
+
+
+def build_classes(depth, width, properties, property_types,
+                  subclass_properties):
+    """
+    Return a list with the CIMClass objects of the class hierarchy followed
+    by the association class, in an order in which they can be added to a
+    mock repository.
+    """
+    key = {'Key': CIMQualifier('Key', True)}
+    root = CIMClass(
+        ROOT_CLASSNAME,
+        qualifiers={'Description': CIMQualifier(
+            'Description', 'Root class of the synthetic model')},
+        properties=[CIMProperty('InstanceID', None, type='string',
+                                qualifiers=key)] +
+        [CIMProperty(name, None, type=cim_type) for name, cim_type in
+         class_properties(property_types, properties)])
+    class_list = [root]
+    level_classes = [root]
+    for level in range(1, depth + 1):
+        props = class_properties(property_types, subclass_properties, level)
+        next_level_classes = []
+        for superclass in level_classes:
+            for _ in range(width):
+                class_ = CIMClass(
+                    class_name(len(class_list)),
+                    superclass=superclass.classname,
+                    properties=[CIMProperty(name, None, type=cim_type)
+                                for name, cim_type in props])
+                class_list.append(class_)
+                next_level_classes.append(class_)
+        level_classes = next_level_classes
+
+    class_list.append(CIMClass(
+        ASSOC_CLASSNAME,
+        qualifiers={'Association': CIMQualifier('Association', True)},
+        properties=[
+            CIMProperty('Antecedent', None, type='reference',
+                        reference_class=ROOT_CLASSNAME, qualifiers=key),
+            CIMProperty('Dependent', None, type='reference',
+                        reference_class=ROOT_CLASSNAME, qualifiers=key)]))
+    return class_list
+
+
+def value_generator(cim_type, rand, string_size):
+    """
+    Return a function that returns a value of the CIM type for the number of
+    an instance, using the random number generator rand.
+    """
+    # pylint: disable=too-many-return-statements
+    if cim_type == 'string':
+        base = ''.join(rand.choice(string.ascii_letters)
+                       for _ in range(string_size))
+
+        def string_value(number):
+            """Unique string value of the string size"""
+            suffix = '-{}'.format(number)
+            return base[:max(string_size - len(suffix), 0)] + suffix
+        return string_value
+    if cim_type == 'boolean':
+        return lambda number: rand.random() < 0.5
+    if cim_type == 'char16':
+        return lambda number: rand.choice(string.ascii_letters)
+    if cim_type == 'datetime':
+        return lambda number: CIMDateTime(
+            DATETIME_BASE + timedelta(seconds=number))
+    if cim_type in ('real32', 'real64'):
+        real_type = Real32 if cim_type == 'real32' else Real64
+        return lambda number: real_type(round(rand.random() * 1000, 3))
+    int_type, min_value, max_value = INTEGER_TYPES[cim_type]
+    return lambda number: int_type(rand.randint(min_value, max_value))
+
+
+def build_instances(class_list, namespace, instances_per_class, fanout,
+                    string_size, seed):
+    # pylint: disable=too-many-arguments,too-many-locals
+    """
+    Return a list with the CIMInstance objects of the classes of the
+    hierarchy in class_list (in the order of build_classes()) in the
+    namespace, followed by the association instances.
+    """
+    rand = random.Random(seed)
+    classes = {class_.classname: class_ for class_ in class_list}
+    generators = {}
+    paths = []
+    inst_list = []
+    number = 0
+    for class_ in class_list:
+        if class_.classname == ASSOC_CLASSNAME:
+            continue
+        # The properties of the class and its superclasses
+        props = []
+        classname = class_.classname
+        while classname:
+            props[0:0] = [(name, prop.type) for name, prop in
+                          classes[classname].properties.items()
+                          if name != 'InstanceID']
+            classname = classes[classname].superclass
+        for name, cim_type in props:
+            if name not in generators:
+                generators[name] = value_generator(cim_type, rand,
+                                                   string_size)
+
+        for _ in range(instances_per_class):
+            instance_id = 'bench-{}'.format(number)
+            path = CIMInstanceName(class_.classname,
+                                   {'InstanceID': instance_id},
+                                   namespace=namespace)
+            properties = [CIMProperty('InstanceID', instance_id)] + \
+                [CIMProperty(name, generators[name](number), type=cim_type)
+                 for name, cim_type in props]
+            inst_list.append(CIMInstance(class_.classname,
+                                         properties=properties, path=path))
+            paths.append(path)
+            number += 1
+
+    assoc_paths = set()
+    for index, antecedent in enumerate(paths):
+        # Evenly distribute the association instances if fanout is
+        # fractional, starting with the first instance
+        count = int(math.ceil((index + 1) * fanout)) - \
+            int(math.ceil(index * fanout))
+        for _ in range(count):
+            dependent = paths[rand.randrange(len(paths))]
+            keys = {'Antecedent': antecedent, 'Dependent': dependent}
+            path = CIMInstanceName(ASSOC_CLASSNAME, keys, namespace=namespace)
+            if path in assoc_paths:
+                continue
+            assoc_paths.add(path)
+            inst_list.append(CIMInstance(
+                ASSOC_CLASSNAME, properties=keys, path=path))
+    return inst_list
+
+
+def add_instances(conn, instances, namespace):
+    """
+    Add the CIMInstance objects in instances to the namespace of the mock
+    repository of conn in bulk. Unlike add_cimobjects(), the instances are not
+    copied and only the existence of their classes is checked.
+    """
+    classnames = set(inst.classname for inst in instances)
+    for classname in classnames:
+        # Raises CIMError if the class does not exist
+        conn.GetClass(classname, namespace=namespace, LocalOnly=False)
+    if namespace not in conn.instances:
+        conn.instances[namespace] = {}
+    repo = conn.instances[namespace]
+    for inst in instances:
+        repo[inst.path] = inst
+
+
+def build_model(conn, depth=DEFAULT_PARAMETERS['depth'],
+                width=DEFAULT_PARAMETERS['width'],
+                namespaces=DEFAULT_PARAMETERS['namespaces'],
+                instances_per_class=DEFAULT_PARAMETERS['instances_per_class'],
+                properties=DEFAULT_PARAMETERS['properties'],
+                property_types=DEFAULT_PARAMETERS['property_types'],
+                subclass_properties=DEFAULT_PARAMETERS['subclass_properties'],
+                fanout=DEFAULT_PARAMETERS['fanout'],
+                string_size=DEFAULT_PARAMETERS['string_size'],
+                seed=DEFAULT_PARAMETERS['seed']):
+    # pylint: disable=too-many-arguments
+    """
+    Add the synthetic model to the mock repository of conn (a
+    FakedWBEMConnection object).
+
+    Parameters:
+
+      conn: FakedWBEMConnection object of the mock WBEM server.
+
+      depth (int): Depth of the class hierarchy (0 for only the root class).
+
+      width (int): Number of subclasses of each class.
+
+      namespaces (int): Number of namespaces with the model: The default
+        namespace of conn and the namespaces root/bench1, root/bench2, ...
+
+      instances_per_class (int): Number of instances of each class of the
+        class hierarchy.
+
+      properties (int): Number of properties of the root class in addition
+        to its key property.
+
+      property_types (iterable of string): CIM types of the properties. The
+        types of the properties of a class cycle through them.
+
+      subclass_properties (int): Number of properties added by each
+        subclass.
+
+      fanout (float): Average number of association instances for each
+        instance of the class hierarchy.
+
+      string_size (int): Number of characters of string values.
+
+      seed: Seed of the random values of the properties and associations.
+    """
+    for cim_type in property_types:
+        if cim_type not in PROPERTY_TYPES:
+            raise ValueError('Invalid property type {!r}; valid types are: '
+                             '{}'.format(cim_type, ', '.join(PROPERTY_TYPES)))
+    class_list = build_classes(depth, width, properties, property_types,
+                               subclass_properties)
+    namespace_names = [conn.default_namespace] + \
+        ['root/bench{}'.format(i) for i in range(1, namespaces)]
+    for namespace in namespace_names:
+        if namespace not in conn.namespaces:
+            conn.add_namespace(namespace)
+        conn.compile_mof_string(QUALIFIER_DECLARATIONS_MOF,
+                                namespace=namespace)
+        conn.add_cimobjects(class_list, namespace=namespace)
+        add_instances(conn, build_instances(class_list, namespace,
+                                            instances_per_class, fanout,
+                                            string_size, seed),
+                      namespace)
+
+
+def mock_script(params):
+    """
+    Return the source of a mock script for the --mock-server general option
+    that builds the model with the parameters (a dictionary with parameters
+    of build_model()). The script declares this module as its dependency, so
+    that the mock cache of pywbemcli builds the model again rather than using
+    the mock repository of a previous version of this module.
+    """
+    module_file = os.path.splitext(os.path.abspath(__file__))[0] + '.py'
+    return '"""\nMock script for the synthetic model, generated by {}.\n"""\n' \
+        'import sys\n' \
+        'sys.path.insert(0, {!r})\n' \
+        '# pylint: disable=wrong-import-position\n' \
+        'from synthetic_model import build_model  # noqa: E402\n\n' \
+        'MOCK_DEPENDENCIES = [{!r}]\n\n' \
+        'PARAMETERS = {}\n\n' \
+        'build_model(CONN, **PARAMETERS)  # noqa: F821\n'.format(
+            os.path.basename(module_file), os.path.dirname(module_file),
+            module_file, pprint.pformat(params))
+
+
+def main():
+    """Parse the command line arguments and execute the tool."""
+    parser = argparse.ArgumentParser(
+        description='Generate a mock script for the --mock-server general '
+                    'option of pywbemcli that builds a synthetic model with '
+                    'the specified parameters, or display the size of the '
+                    'model and the time to build it.')
+    for name, value in sorted(DEFAULT_PARAMETERS.items()):
+        option = '--' + name.replace('_', '-')
+        if name == 'property_types':
+            parser.add_argument(
+                option, default=','.join(value),
+                help='Comma-separated list of the CIM types of the '
+                     'properties [{}]. Default: {}.'.format(
+                         '|'.join(PROPERTY_TYPES), ','.join(value)))
+        else:
+            parser.add_argument(
+                option, type=type(value), default=value,
+                help='Parameter {} of build_model(). Default: {}.'.format(
+                    name, value))
+    parser.add_argument(
+        '--script', metavar='FILE',
+        help='Write the mock script to FILE instead of building the model.')
+    args = parser.parse_args()
+
+    params = {name: getattr(args, name) for name in DEFAULT_PARAMETERS}
+    params['property_types'] = tuple(
+        cim_type.strip() for cim_type in args.property_types.split(','))
+
+    if args.script:
+        with open(args.script, 'w') as fp:
+            fp.write(mock_script(params))
+        print('Mock script written to {}'.format(args.script))
+        return 0
+
+    # pylint: disable=import-outside-toplevel
+    from pywbem_mock import FakedWBEMConnection
+    classes, instances, associations = model_size(**params)
+    print('Model: {} classes, {} instances, {} association instances'.format(
+        classes, instances, associations))
+    conn = FakedWBEMConnection(default_namespace='root/cimv2')
+    start_time = default_timer()
+    build_model(conn, **params)
+    print('Built in {:.3f} sec.'.format(default_timer() - start_time))
+    return 0
+
+
+if 'CONN' in globals():
+    # Executed as mock script by pywbemcli
+    build_model(CONN)  # noqa: F821 pylint: disable=undefined-variable
+elif __name__ == '__main__':
+    sys.exit(main())
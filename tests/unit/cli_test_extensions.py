@@ -20,7 +20,13 @@ class CLITestsBase(object):
     """
         Defines methods to execute tests on pywbemcli.
 
+        Subclasses may set in_process to True to execute pywbemcli in the
+        test process instead of in a child process for each test, which is
+        much faster. Tests with stdin or with mock scripts that are executed
+        at startup are still executed in a child process.
     """
+    in_process = False
+
     def command_test(self, desc, command_grp, inputs, exp_response, mock_files,
                      condition, verbose=None):
         # pylint: disable=line-too-long, no-self-use
@@ -219,7 +225,8 @@ class CLITestsBase(object):
             print('ENV: {}'.format(env))
 
         rc, stdout, stderr = execute_pywbemcli(cmd_line, env=env, stdin=stdin,
-                                               verbose=verbose)
+                                               verbose=verbose,
+                                               in_process=self.in_process)
 
         exp_rc = exp_response['rc'] if 'rc' in exp_response else 0
         assert_rc(exp_rc, rc, stdout, stderr)
@@ -90,3 +90,6 @@ CMD_OPTION_INDICATION_FILTER_HELP_LINE = \
 
 CMD_OPTION_EXPERIMENTAL_FILTER_HELP_LINE = \
     '--experimental / --no-experimental'
+
+CMD_OPTION_WORKERS_HELP_LINE = \
+    '--workers INTEGER Number of connections to the WBEM server used to'
@@ -7,7 +7,11 @@ import os
 import pytest
 
 from pywbemtools.pywbemcli._connection_repository \
-    import DEFAULT_CONNECTIONS_FILE
+    import DEFAULT_CONNECTIONS_FILE, DEFAULT_CONNECTIONS_PATH, \
+    ConnectionRepository
+from pywbemtools.pywbemcli._pywbem_server import PywbemServer
+from pywbemtools.pywbemcli._pywbemcli_faked_operations import \
+    MOCK_CACHE_DIR_ENVVAR
 
 SCRIPT_DIR = os.path.dirname(__file__)
 TEST_DIR = os.getcwd()
@@ -15,6 +19,7 @@ REPO_FILE_PATH = os.path.join(TEST_DIR, DEFAULT_CONNECTIONS_FILE)
 # if there is a config file, save to this name during tests
 SAVE_FILE = DEFAULT_CONNECTIONS_FILE + '.testsave'
 SAVE_FILE_PATH = os.path.join(SCRIPT_DIR, SAVE_FILE)
+SIMPLE_MOCK_FILE_PATH = os.path.join(SCRIPT_DIR, 'simple_mock_model.mof')
 
 
 @pytest.fixture
@@ -41,9 +46,65 @@ def set_connections_file(request):
         Remove any created repository file and restore saved file. This
         should occur as session end.
         """
-        if os.path.isfile(REPO_FILE_PATH):
-            os.remove(REPO_FILE_PATH)
+        for file_path in (REPO_FILE_PATH, REPO_FILE_PATH + '.cache',
+                          REPO_FILE_PATH + '.lock'):
+            if os.path.isfile(file_path):
+                os.remove(file_path)
         if os.path.isfile(SAVE_FILE_PATH):
             os.rename(SAVE_FILE_PATH, REPO_FILE_PATH)
 
     request.addfinalizer(teardown)
+
+
+@pytest.fixture(scope='session', autouse=True)
+def mock_cache_dir_session(tmpdir_factory):
+    """
+    Fixture that points the mock cache of the pywbemcli commands executed by
+    the tests (in the test process or in pywbemcli processes) to a temporary
+    directory, so that the tests do not write to the mock cache in the home
+    directory of the user.
+    """
+    saved_dir = os.environ.get(MOCK_CACHE_DIR_ENVVAR)
+    os.environ[MOCK_CACHE_DIR_ENVVAR] = str(tmpdir_factory.mktemp('mockcache'))
+    yield
+    if saved_dir is None:
+        del os.environ[MOCK_CACHE_DIR_ENVVAR]
+    else:
+        os.environ[MOCK_CACHE_DIR_ENVVAR] = saved_dir
+
+
+def reset_repository():
+    """Discard the connection definitions read by this process."""
+    # pylint: disable=protected-access
+    ConnectionRepository._pywbemcli_servers = {}
+    ConnectionRepository._loaded = False
+    ConnectionRepository._connections_file = None
+    ConnectionRepository._connections_file_signature = None
+    ConnectionRepository.default_connection_name = None
+
+
+@pytest.fixture
+def connections():
+    """
+    Fixture for a connections file with the connection definitions
+    fanmock1, fanmock2 and fanmock3 for mock WBEM servers and fandead for a
+    WBEM server that does not exist. An existing connections file is restored
+    after the test.
+    """
+    save_file = DEFAULT_CONNECTIONS_PATH + '.fanoutsave'
+    if os.path.isfile(DEFAULT_CONNECTIONS_PATH):
+        os.rename(DEFAULT_CONNECTIONS_PATH, save_file)
+    reset_repository()
+    repo = ConnectionRepository()
+    for name in ('fanmock1', 'fanmock2', 'fanmock3'):
+        repo.add(name, PywbemServer(name=name,
+                                    mock_server=[SIMPLE_MOCK_FILE_PATH]))
+    repo.add('fandead', PywbemServer('http://localhost:1', name='fandead',
+                                     timeout=5, mock_server=[]))
+    yield repo
+    for file_path in (DEFAULT_CONNECTIONS_PATH, repo.cache_file):
+        if os.path.isfile(file_path):
+            os.remove(file_path)
+    if os.path.isfile(save_file):
+        os.rename(save_file, DEFAULT_CONNECTIONS_PATH)
+    reset_repository()
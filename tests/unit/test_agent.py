@@ -0,0 +1,130 @@
+# (C) Copyright 2020 IBM Corp.
+# (C) Copyright 2020 Inova Development Inc.
+# All Rights Reserved
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""
+Unit tests for the pywbemcli agent.
+"""
+
+from __future__ import absolute_import, print_function
+
+import os
+import threading
+import pytest
+from six import StringIO
+
+from pywbemtools.pywbemcli.pywbemcli import cli
+from pywbemtools.pywbemcli import _agent
+from pywbemtools.pywbemcli._agent import AgentServer, agent_supported, \
+    agent_request, execute_command, forward_command
+
+TEST_DIR = os.path.dirname(__file__)
+SIMPLE_MOCK_FILE_PATH = os.path.join(TEST_DIR, 'simple_mock_model.mof')
+
+pytestmark = pytest.mark.skipif(
+    not agent_supported(),
+    reason="The pywbemcli agent requires Python 3, Unix domain sockets and "
+    "fork()")
+
+
+@pytest.fixture
+def agent(tmpdir):
+    """Agent serving requests in a thread; yields the socket path."""
+    # Unix domain socket path names are limited to about 100 characters
+    socket_path = os.path.join(str(tmpdir), 'a.sock')
+    server = AgentServer(socket_path, cli)
+    thread = threading.Thread(target=server.serve)
+    thread.start()
+    yield socket_path
+    if thread.is_alive():
+        server.shutdown()
+    thread.join()
+
+
+def execute(socket_path, args, env=None):
+    """Execute a command in the agent with the pywbemcli environment
+    variables of the test process and env, and return exit code, stdout and
+    stderr."""
+    client_env = {name: value for name, value in os.environ.items()
+                  if name.startswith('PYWBEMCLI_')}
+    client_env.update(env or {})
+    stdout = StringIO()
+    stderr = StringIO()
+    exit_code = execute_command(socket_path, args, client_env, 80, stdout,
+                                stderr)
+    return exit_code, stdout.getvalue(), stderr.getvalue()
+
+
+def test_agent_execute(agent):
+    # pylint: disable=redefined-outer-name
+    """Test that the output and exit code of commands are returned."""
+    exit_code, stdout, stderr = execute(
+        agent, ['-m', SIMPLE_MOCK_FILE_PATH, 'class', 'enumerate', '--no'])
+    assert (exit_code, stdout, stderr) == (0, 'CIM_Foo\n', '')
+
+    exit_code, stdout, stderr = execute(
+        agent, ['-m', SIMPLE_MOCK_FILE_PATH, 'class', 'get', 'CIM_Blah'])
+    assert exit_code == 1
+    assert stdout == ''
+    assert "Class 'CIM_Blah' not found" in stderr
+
+
+def test_agent_execute_env(agent):
+    # pylint: disable=redefined-outer-name
+    """Test that the pywbemcli environment variables of the client are
+    used for the command."""
+    exit_code, stdout, _ = execute(
+        agent, ['class', 'enumerate', '--no'],
+        env={'PYWBEMCLI_MOCK_SERVER': SIMPLE_MOCK_FILE_PATH})
+    assert (exit_code, stdout) == (0, 'CIM_Foo\n')
+    assert 'PYWBEMCLI_MOCK_SERVER' not in os.environ
+
+
+def test_agent_status_stop(agent):
+    # pylint: disable=redefined-outer-name
+    """Test the status and stop requests."""
+    execute(agent, ['-m', SIMPLE_MOCK_FILE_PATH, 'class', 'enumerate'])
+
+    status = agent_request(agent, {'request': 'status'})
+    assert status['pid'] == os.getpid()
+    assert status['socket'] == agent
+    assert status['requests'] == 1
+
+    assert agent_request(agent, {'request': 'stop'}) == {'stopped': True}
+    for _ in range(100):
+        if not os.path.exists(agent):
+            break
+        threading.Event().wait(0.05)
+    assert not os.path.exists(agent)
+    assert agent_request(agent, {'request': 'status'}) is None
+
+
+def test_forward_command_disabled(agent, monkeypatch):
+    # pylint: disable=redefined-outer-name
+    """Test the commands that are not forwarded to the agent."""
+    monkeypatch.setattr(_agent, 'agent_socket_path', lambda: agent)
+    commands = cli.list_commands(None)
+    args = ['-m', SIMPLE_MOCK_FILE_PATH, 'class', 'enumerate']
+
+    monkeypatch.delenv(_agent.AGENT_ENVVAR, raising=False)
+    assert forward_command(args, commands, 80) is None
+
+    monkeypatch.setenv(_agent.AGENT_ENVVAR, '1')
+    assert forward_command(['--help'], commands, 80) is None
+    assert forward_command(['agent', 'status'], commands, 80) is None
+    assert forward_command(['repl'], commands, 80) is None
+
+    monkeypatch.setattr(_agent, 'agent_socket_path',
+                        lambda: agent + '.none')
+    assert forward_command(args, commands, 80) is None
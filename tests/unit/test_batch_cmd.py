@@ -0,0 +1,138 @@
+# Copyright 2020 IBM Corp. All Rights Reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""
+Tests the batch command
+"""
+
+from __future__ import absolute_import, print_function
+
+import os
+import pytest
+
+from .cli_test_extensions import CLITestsBase
+from .common_options_help_lines import CMD_OPTION_HELP_HELP_LINE
+
+TEST_DIR = os.path.dirname(__file__)
+
+# A mof file that defines basic qualifier decls, classes, and instances
+# but not tied to the DMTF classes.
+SIMPLE_MOCK_FILE = 'simple_mock_model.mof'
+
+# Files with the commands executed by the batch command
+BATCH_FILE_PATH = os.path.join(TEST_DIR, 'batch_commands.txt')
+BATCH_ERROR_FILE_PATH = os.path.join(TEST_DIR, 'batch_commands_error.txt')
+BATCH_POOL_FILE_PATH = os.path.join(TEST_DIR, 'batch_commands_pool.txt')
+
+BATCH_HELP_LINES = [
+    'Usage: pywbemcli batch [COMMAND-OPTIONS] FILE',
+    'Execute the pywbemcli commands in a file.',
+    '--stop-on-error Stop executing commands after the first command that',
+    CMD_OPTION_HELP_HELP_LINE,
+]
+
+OK = True  # mark tests OK when they execute correctly
+RUN = True  # Mark OK = False and current test case being created RUN
+FAIL = False  # Any test currently FAILING or not tested yet
+
+TEST_CASES = [
+    # desc - Description of test
+    # inputs - String, or list of args or dict of 'env', 'args', 'general',
+    #          and 'stdin'. See See CLITestsBase.command_test()  for
+    #          detailed documentation
+    # exp_response - Dictionary of expected responses,
+    # mock - None or name of files (mof or .py),
+    # condition - If True, the test is executed,  Otherwise it is skipped.
+
+    ['Verify batch command --help response',
+     '--help',
+     {'stdout': BATCH_HELP_LINES,
+      'test': 'innows'},
+     None, OK],
+
+    ['Verify batch command output of the commands',
+     [BATCH_FILE_PATH],
+     {'stdout': ['CIM_Foo',
+                 'root',
+                 ' +-- CIM_Foo',
+                 '     +-- CIM_Foo_sub',
+                 '     |   +-- CIM_Foo_sub_sub',
+                 '     +-- CIM_Foo_sub2',
+                 'CIM_Foo',
+                 'Session cache: 8 objects (maximum 20000), 2 hits, 3 misses'],
+      'test': 'in'},
+     SIMPLE_MOCK_FILE, OK],
+
+    ['Verify batch command summary',
+     [BATCH_FILE_PATH],
+     {'stderr': ['Batch summary: 4 commands, 0 failed',
+                 r'^ +2 +class enumerate --names-only +0 +[0-9.]+$',
+                 r'^ +4 +-o table class tree +0 +[0-9.]+$',
+                 r'^ +5 +class enumerate --names-only +0 +[0-9.]+$',
+                 r'^ +6 +cache show +0 +[0-9.]+$'],
+      'test': 'regex'},
+     SIMPLE_MOCK_FILE, OK],
+
+    ['Verify batch command with failing commands',
+     [BATCH_ERROR_FILE_PATH],
+     {'stderr': ["Class 'CIM_Blah' not found in namespace 'root/cimv2'",
+                 "Error: Command 'repl' is not allowed in batch mode",
+                 'Batch summary: 3 commands, 2 failed',
+                 r'^ +2 +class get CIM_Blah +1 +[0-9.]+$',
+                 r'^ +3 +repl +1 +[0-9.]+$',
+                 r'^ +4 +class enumerate --names-only +0 +[0-9.]+$'],
+      'rc': 1,
+      'test': 'regex'},
+     SIMPLE_MOCK_FILE, OK],
+
+    ['Verify batch command --stop-on-error',
+     ['--stop-on-error', BATCH_ERROR_FILE_PATH],
+     {'stderr': ['Batch summary: 1 commands, 1 failed'],
+      'rc': 1,
+      'test': 'innows'},
+     SIMPLE_MOCK_FILE, OK],
+
+    ['Verify batch command reuses connections with the same parameters',
+     [BATCH_POOL_FILE_PATH],
+     {'stdout': ['Session cache: 1 objects (maximum 20000), 0 hits, 1 misses',
+                 'Session cache: 1 objects (maximum 20000), 1 hits, 1 misses',
+                 'root/cimv2   class names                  1'],
+      'test': 'in'},
+     SIMPLE_MOCK_FILE, OK],
+
+    ['Verify batch command with non-existent file',
+     ['blah.txt'],
+     {'stderr': ["Could not open file: blah.txt"],
+      'rc': 2,
+      'test': 'innows'},
+     SIMPLE_MOCK_FILE, OK],
+]
+
+
+class TestBatchCmd(CLITestsBase):
+    """
+    Execute the testcases for the batch command.
+    """
+    command_group = 'batch'
+    in_process = True
+
+    @pytest.mark.parametrize(
+        "desc, inputs, exp_response, mock, condition",
+        TEST_CASES)
+    def test_batch(self, desc, inputs, exp_response, mock, condition):
+        """
+        Common test method for the batch command.
+        """
+        self.command_test(desc, self.command_group, inputs, exp_response,
+                          mock, condition)
@@ -0,0 +1,148 @@
+# (C) Copyright 2020 IBM Corp.
+# (C) Copyright 2020 Inova Development Inc.
+# All Rights Reserved
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""
+Tests the benchmarks in tests/benchmark with the smoke model.
+"""
+
+from __future__ import absolute_import, print_function
+
+import os
+import sys
+import json
+import pytest
+from subprocess import Popen, PIPE
+
+from pywbemtools.pywbemcli._pywbemcli_faked_operations import \
+    PYWBEMCLIFakedConnection
+
+from ..benchmark.synthetic_model import build_model, model_size, \
+    ROOT_CLASSNAME, ASSOC_CLASSNAME
+
+from .utils import execute_pywbemcli
+
+TEST_DIR = os.path.dirname(__file__)
+BENCHMARK_DIR = os.path.join(os.path.dirname(TEST_DIR), 'benchmark')
+RUN_BENCHMARKS = os.path.join(BENCHMARK_DIR, 'run_benchmarks.py')
+SYNTHETIC_MODEL = os.path.join(BENCHMARK_DIR, 'synthetic_model.py')
+
+
+def run_benchmarks(*args):
+    """Execute run_benchmarks.py and return its exit code and output."""
+    proc = Popen([sys.executable, RUN_BENCHMARKS] + list(args), stdout=PIPE,
+                 stderr=PIPE, universal_newlines=True)
+    stdout, stderr = proc.communicate()
+    return proc.returncode, stdout, stderr
+
+
+def test_synthetic_model():
+    """Test the classes and instances of a small synthetic model."""
+    conn = PYWBEMCLIFakedConnection(default_namespace='root/cimv2')
+    build_model(conn, depth=2, width=3, instances_per_class=2, properties=4,
+                property_types=('uint8', 'string'), fanout=0.5,
+                string_size=10)
+
+    assert len(conn.EnumerateClassNames(DeepInheritance=True)) == 14
+    insts = conn.EnumerateInstances(ROOT_CLASSNAME)
+    assert len(insts) == 26
+    # The instances of subclasses have additional properties
+    assert sorted(set(len(inst.properties) for inst in insts)) == [5, 6, 7]
+    inst = insts[0]
+    assert inst['InstanceID'] == 'bench-0'
+    assert inst.properties['Uint8Prop1'].type == 'uint8'
+    assert len(inst['StringProp2']) == 10
+    assert len(conn.EnumerateInstances(ASSOC_CLASSNAME)) == 13
+    assert model_size(depth=2, width=3, namespaces=1, instances_per_class=2,
+                      fanout=0.5) == (13, 26, 13)
+
+
+def test_synthetic_model_deterministic():
+    """Test that the synthetic model is determined by the seed."""
+
+    def model(seed):
+        """Return the sorted instances of the model with the seed"""
+        conn = PYWBEMCLIFakedConnection(default_namespace='root/cimv2')
+        build_model(conn, depth=1, width=2, instances_per_class=3, seed=seed)
+        return sorted(conn.EnumerateInstances(ROOT_CLASSNAME),
+                      key=lambda inst: inst['InstanceID'])
+
+    assert model(1) == model(1)
+    assert model(1) != model(2)
+
+
+def test_synthetic_model_namespaces():
+    """Test a synthetic model in multiple namespaces."""
+    conn = PYWBEMCLIFakedConnection(default_namespace='root/cimv2')
+    build_model(conn, depth=0, instances_per_class=5, namespaces=3)
+
+    for namespace in ('root/cimv2', 'root/bench1', 'root/bench2'):
+        assert len(conn.EnumerateInstanceNames(
+            ROOT_CLASSNAME, namespace=namespace)) == 5
+
+
+def test_synthetic_model_invalid_type():
+    """Test a synthetic model with an invalid property type."""
+    conn = PYWBEMCLIFakedConnection(default_namespace='root/cimv2')
+    with pytest.raises(ValueError):
+        build_model(conn, property_types=('string', 'blah'))
+
+
+def test_synthetic_model_script(tmpdir):
+    """Test a mock script generated by the synthetic model tool."""
+    script_file = str(tmpdir.join('model.py'))
+    proc = Popen([sys.executable, SYNTHETIC_MODEL, '--depth', '1',
+                  '--width', '2', '--instances-per-class', '4',
+                  '--script', script_file],
+                 stdout=PIPE, stderr=PIPE, universal_newlines=True)
+    _, stderr = proc.communicate()
+    assert proc.returncode == 0, stderr
+
+    rc, stdout, stderr = execute_pywbemcli(
+        ['--mock-server', script_file, 'instance', 'count', 'BENCH_*'],
+        in_process=True)
+    assert rc == 0, stderr
+    assert 'BENCH_Element0002' in stdout
+    assert stdout.count('|       4 |') == 3
+
+
+def test_run_and_compare(tmpdir):
+    """Test running a benchmark and comparing the results."""
+    results_file = str(tmpdir.join('results.json'))
+    rc, stdout, stderr = run_benchmarks(
+        'run', '--sizes', 'smoke', '--scenarios', '^class tree$',
+        '--repeat', '1', '--output', results_file,
+        '--work-dir', str(tmpdir))
+    assert rc == 0, stderr
+    assert 'smoke    class tree' in stdout
+
+    with open(results_file) as fp:
+        results = json.load(fp)
+    assert list(results['results']['smoke']) == ['class tree']
+    assert results['models'] == {'smoke': {'depth': 2, 'width': 10,
+                                           'instances_per_class': 9}}
+
+    # A baseline that is twice as fast is a regression
+    results['results']['smoke']['class tree']['median'] /= 2
+    baseline_file = str(tmpdir.join('baseline.json'))
+    with open(baseline_file, 'w') as fp:
+        json.dump(results, fp)
+    rc, stdout, _ = run_benchmarks('compare', baseline_file, results_file,
+                                   '--min-delta', '0')
+    assert rc == 1
+    assert 'REGRESSION' in stdout
+
+    rc, stdout, _ = run_benchmarks('compare', results_file, results_file)
+    assert rc == 0
+    assert 'REGRESSION' not in stdout
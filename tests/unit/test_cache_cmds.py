@@ -0,0 +1,211 @@
+# Copyright 2020 IBM Corp. All Rights Reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""
+Tests the cache command group
+"""
+
+from __future__ import absolute_import, print_function
+
+import os
+import pytest
+
+from .cli_test_extensions import CLITestsBase
+from .common_options_help_lines import CMD_OPTION_HELP_HELP_LINE
+
+TEST_DIR = os.path.dirname(__file__)
+
+# A mof file that defines basic qualifier decls, classes, and instances
+# but not tied to the DMTF classes.
+SIMPLE_MOCK_FILE = 'simple_mock_model.mof'
+SIMPLE_MOCK_FILE_PATH = os.path.join(TEST_DIR, SIMPLE_MOCK_FILE)
+QUALIFIER_FILTER_MODEL_PATH = os.path.join(TEST_DIR,
+                                           'qualifier_filter_model.mof')
+
+#
+# The following list define the help for each command in terms of particular
+# parts of lines that are to be tested.
+# For each test, try to include:
+# 1. The usage line and in particular the argument component
+# 2. The first line of the command comment (i.e. the summary sentence)
+# 3. The last line CMD_OPTION_HELP_HELP_LINE
+# 4. Each option including at least the long and short names
+CACHE_HELP_LINES = [
+    'Usage: pywbemcli cache [COMMAND-OPTIONS] COMMAND [ARGS]...',
+    'Command group for caches of the current connection.',
+    CMD_OPTION_HELP_HELP_LINE,
+    'show   Show the content of the session cache.',
+    'clear  Clear the caches of the current connection.',
+]
+
+CACHE_SHOW_HELP_LINES = [
+    'Usage: pywbemcli cache show [COMMAND-OPTIONS]',
+    'Show the content of the session cache.',
+    CMD_OPTION_HELP_HELP_LINE,
+]
+
+CACHE_CLEAR_HELP_LINES = [
+    'Usage: pywbemcli cache clear [COMMAND-OPTIONS]',
+    'Clear the caches of the current connection.',
+    CMD_OPTION_HELP_HELP_LINE,
+]
+
+OK = True  # mark tests OK when they execute correctly
+RUN = True  # Mark OK = False and current test case being created RUN
+FAIL = False  # Any test currently FAILING or not tested yet
+
+TEST_CASES = [
+    # desc - Description of test
+    # inputs - String, or list of args or dict of 'env', 'args', 'general',
+    #          and 'stdin'. See See CLITestsBase.command_test()  for
+    #          detailed documentation
+    # exp_response - Dictionary of expected responses,
+    # mock - None or name of files (mof or .py),
+    # condition - If True, the test is executed,  Otherwise it is skipped.
+
+    ['Verify cache command --help response',
+     '--help',
+     {'stdout': CACHE_HELP_LINES,
+      'test': 'innows'},
+     None, OK],
+
+    ['Verify cache command -h response',
+     '-h',
+     {'stdout': CACHE_HELP_LINES,
+      'test': 'innows'},
+     None, OK],
+
+    ['Verify cache command show --help response',
+     ['show', '--help'],
+     {'stdout': CACHE_SHOW_HELP_LINES,
+      'test': 'innows'},
+     None, OK],
+
+    ['Verify cache command clear --help response',
+     ['clear', '--help'],
+     {'stdout': CACHE_CLEAR_HELP_LINES,
+      'test': 'innows'},
+     None, OK],
+
+    ['Verify cache command show, empty cache',
+     {'args': ['show'],
+      'general': ['--output-format', 'plain']},
+     {'stdout': ['Session cache: 0 objects (maximum 20000), 0 hits, 0 misses',
+                 'Namespace    Type    Name    Objects'],
+      'test': 'innows'},
+     SIMPLE_MOCK_FILE, OK],
+
+    ['Verify cache command clear --verbose',
+     {'args': ['clear'],
+      'general': ['--verbose']},
+     {'stdout': ['Cleared the caches of connection not-saved'],
+      'test': 'innows'},
+     SIMPLE_MOCK_FILE, OK],
+
+    ['Verify cache command show fails without server',
+     ['show'],
+     {'stderr': ['No current connection'],
+      'rc': 1,
+      'test': 'innows'},
+     None, OK],
+
+    ['Verify cache command show in interactive mode after cached commands',
+     {'general': ['--mock-server', SIMPLE_MOCK_FILE_PATH,
+                  '--output-format', 'plain'],
+      'stdin': ['class enumerate --no',
+                'class enumerate --no',
+                'qualifier enumerate',
+                'instance create CIM_Foo -p InstanceID=blah',
+                'instance create CIM_Foo -p InstanceID=blah2',
+                'cache show']},
+     {'stdout': ['Session cache: 11 objects (maximum 20000), 2 hits, '
+                 '3 misses',
+                 'root/cimv2   class names                    1',
+                 'root/cimv2   qualifier decls                9',
+                 'root/cimv2   class            cim_foo       1'],
+      'test': 'innows'},
+     None, OK],
+
+    ['Verify cache command clear in interactive mode empties the cache',
+     {'general': ['--mock-server', SIMPLE_MOCK_FILE_PATH,
+                  '--output-format', 'plain'],
+      'stdin': ['class enumerate --no',
+                'cache clear',
+                'cache show',
+                'class enumerate --no']},
+     {'stdout': ['Session cache: 0 objects (maximum 20000), 0 hits, 0 misses',
+                 'CIM_Foo'],
+      'test': 'innows'},
+     None, OK],
+
+    ['Verify class delete invalidates the cached classes',
+     {'general': ['--mock-server', SIMPLE_MOCK_FILE_PATH],
+      'stdin': ['class enumerate --no --di',
+                'class delete CIM_Foo_sub_sub --force',
+                'cache show']},
+     {'stdout': ['Session cache: 0 objects (maximum 20000), 0 hits, '
+                 '1 misses'],
+      'test': 'innows'},
+     None, OK],
+
+    ['Verify class tree in both directions shares one superclass index',
+     {'general': ['--mock-server', SIMPLE_MOCK_FILE_PATH,
+                  '--output-format', 'plain'],
+      'stdin': ['class tree -s CIM_Foo_sub_sub',
+                'class tree CIM_Foo_sub',
+                'class tree',
+                'cache show']},
+     {'stdout': ['Session cache: 7 objects (maximum 20000), 4 hits, '
+                 '2 misses',
+                 'root/cimv2   superclasses            4',
+                 'root/cimv2   subclasses              3'],
+      'test': 'innows'},
+     None, OK],
+
+    ['Verify qualifier filters share the qualifier flags index',
+     {'general': ['--mock-server', QUALIFIER_FILTER_MODEL_PATH,
+                  '--output-format', 'plain'],
+      'stdin': ['class find *TST_* --association',
+                'class enumerate --association --no --di',
+                'class enumerate --indication --nq --di',
+                'cache show']},
+     {'stdout': ['root/cimv2   TST_MemberOfFamilyCollectionSub',
+                 'class TST_IndicationExperimental {',
+                 'Session cache: 24 objects (maximum 20000), 3 hits, '
+                 '3 misses',
+                 'root/cimv2   class names                      8',
+                 'root/cimv2   classes                          8',
+                 'root/cimv2   qualifier flags                  8'],
+      'test': 'innows'},
+     None, OK],
+]
+
+
+class TestSubcmdCache(CLITestsBase):
+    """
+    Execute the testcases for cache command variations.
+    """
+    command_group = 'cache'
+    in_process = True
+
+    @pytest.mark.parametrize(
+        "desc, inputs, exp_response, mock, condition",
+        TEST_CASES)
+    def test_cache(self, desc, inputs, exp_response, mock, condition):
+        """
+        Common test method for those commands and options in the
+        cache subcmd that can be tested.
+        """
+        self.command_test(desc, self.command_group, inputs, exp_response,
+                          mock, condition)
@@ -0,0 +1,310 @@
+# (C) Copyright 2020 IBM Corp.
+# (C) Copyright 2020 Inova Development Inc.
+# All Rights Reserved
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""
+Unit tests for the ClassCache class.
+"""
+
+from __future__ import absolute_import, print_function
+
+import os
+import pickle
+import pytest
+
+from pywbem import CIMError, CIM_ERR_NOT_FOUND, CIMClass, CIMProperty, \
+    CIMQualifier
+from pywbem_mock import FakedWBEMConnection
+
+from pywbemtools.pywbemcli._class_cache import ClassCache, \
+    retrieve_qualifier_flags
+from pywbemtools.pywbemcli._context_obj import ContextObj
+from pywbemtools.pywbemcli._pywbem_server import PywbemServer
+
+NAMESPACE = 'root/cimv2'
+URL = 'http://blah'
+
+MOF = """
+Qualifier Key : boolean = false,
+    Scope(property, reference),
+    Flavor(DisableOverride, ToSubclass);
+
+Qualifier Experimental : boolean = false,
+    Scope(any),
+    Flavor(EnableOverride, Restricted);
+
+class CIM_Foo {
+    [Key] string InstanceID;
+};
+
+[Experimental]
+class CIM_Foo_sub : CIM_Foo {
+    string cimfoo_sub;
+};
+"""
+
+
+class CountingConnection(FakedWBEMConnection):
+    """FakedWBEMConnection that counts the GetClass, EnumerateClassNames and
+    EnumerateClasses operations."""
+
+    def __init__(self, *args, **kwargs):
+        super(CountingConnection, self).__init__(*args, **kwargs)
+        self.counts = {'GetClass': 0, 'EnumerateClassNames': 0}
+        self.enum_classes_count = 0
+
+    def GetClass(self, *args, **kwargs):
+        # pylint: disable=arguments-differ,invalid-name
+        self.counts['GetClass'] += 1
+        return super(CountingConnection, self).GetClass(*args, **kwargs)
+
+    def EnumerateClassNames(self, *args, **kwargs):
+        # pylint: disable=arguments-differ,invalid-name
+        self.counts['EnumerateClassNames'] += 1
+        return super(CountingConnection, self).EnumerateClassNames(*args,
+                                                                   **kwargs)
+
+    def EnumerateClasses(self, *args, **kwargs):
+        # pylint: disable=arguments-differ,invalid-name
+        self.enum_classes_count += 1
+        return super(CountingConnection, self).EnumerateClasses(*args,
+                                                                **kwargs)
+
+
+@pytest.fixture
+def conn():
+    """Faked connection with the classes of MOF."""
+    conn_ = CountingConnection(default_namespace=NAMESPACE)
+    conn_.compile_mof_string(MOF, namespace=NAMESPACE)
+    return conn_
+
+
+def test_get_class_cached(conn, tmpdir):
+    # pylint: disable=redefined-outer-name
+    """Test that a class is retrieved from the server only once."""
+    cache = ClassCache('myconn', URL, cache_dir=str(tmpdir))
+
+    cls1 = cache.get_class(conn, 'CIM_Foo_sub')
+    cls2 = cache.get_class(conn, 'cim_foo_sub', namespace=NAMESPACE)
+
+    assert cls1 == cls2
+    # Properties of superclasses are included (LocalOnly=False)
+    assert 'InstanceID' in cls1.properties
+    assert conn.counts == {'GetClass': 1, 'EnumerateClassNames': 1}
+    assert os.listdir(cache.connection_dir) == ['root%2Fcimv2.pickle']
+
+
+def test_get_class_persistent(conn, tmpdir):
+    # pylint: disable=redefined-outer-name
+    """Test that a new cache object uses the classes cached on disk and
+    does not check the server within the check interval."""
+    ClassCache('myconn', URL, cache_dir=str(tmpdir)).get_class(conn,
+                                                               'CIM_Foo')
+    conn.counts = {'GetClass': 0, 'EnumerateClassNames': 0}
+
+    cache = ClassCache('myconn', URL, cache_dir=str(tmpdir))
+    cls = cache.get_class(conn, 'CIM_Foo')
+
+    assert cls.classname == 'CIM_Foo'
+    assert conn.counts == {'GetClass': 0, 'EnumerateClassNames': 0}
+
+
+def test_get_class_check_unchanged(conn, tmpdir):
+    # pylint: disable=redefined-outer-name
+    """Test that the cache remains valid if the fingerprint is unchanged."""
+    ClassCache('myconn', URL, cache_dir=str(tmpdir)).get_class(conn,
+                                                               'CIM_Foo')
+    conn.counts = {'GetClass': 0, 'EnumerateClassNames': 0}
+
+    cache = ClassCache('myconn', URL, cache_dir=str(tmpdir), check_interval=0)
+    cache.get_class(conn, 'CIM_Foo')
+    cache.get_class(conn, 'CIM_Foo')
+
+    assert conn.counts == {'GetClass': 0, 'EnumerateClassNames': 1}
+
+
+def test_get_class_invalidated_by_fingerprint(conn, tmpdir):
+    # pylint: disable=redefined-outer-name
+    """Test that a change of the class names in the namespace invalidates
+    the cache of the namespace."""
+    ClassCache('myconn', URL, cache_dir=str(tmpdir)).get_class(conn,
+                                                               'CIM_Foo')
+    conn.add_cimobjects(
+        CIMClass('CIM_Bar', properties=[CIMProperty('P', None, type='string')]),
+        namespace=NAMESPACE)
+    conn.counts = {'GetClass': 0, 'EnumerateClassNames': 0}
+
+    cache = ClassCache('myconn', URL, cache_dir=str(tmpdir), check_interval=0)
+    cache.get_class(conn, 'CIM_Foo')
+
+    assert conn.counts == {'GetClass': 1, 'EnumerateClassNames': 1}
+
+
+def test_get_class_invalidated_by_url(conn, tmpdir):
+    # pylint: disable=redefined-outer-name
+    """Test that a different server URL for the connection name invalidates
+    the cache."""
+    ClassCache('myconn', URL, cache_dir=str(tmpdir)).get_class(conn,
+                                                               'CIM_Foo')
+    conn.counts = {'GetClass': 0, 'EnumerateClassNames': 0}
+
+    cache = ClassCache('myconn', 'http://other', cache_dir=str(tmpdir))
+    cache.get_class(conn, 'CIM_Foo')
+
+    assert conn.counts == {'GetClass': 1, 'EnumerateClassNames': 1}
+
+
+def test_get_class_not_found(conn, tmpdir):
+    # pylint: disable=redefined-outer-name
+    """Test that an error from the server is raised."""
+    cache = ClassCache('myconn', URL, cache_dir=str(tmpdir))
+
+    with pytest.raises(CIMError) as exc_info:
+        cache.get_class(conn, 'CIM_Blah')
+    assert exc_info.value.status_code == CIM_ERR_NOT_FOUND
+
+
+def test_corrupted_file(conn, tmpdir):
+    # pylint: disable=redefined-outer-name
+    """Test that a cache file that cannot be read is rebuilt."""
+    cache = ClassCache('myconn', URL, cache_dir=str(tmpdir))
+    cache.get_class(conn, 'CIM_Foo')
+    file_path = os.path.join(cache.connection_dir, 'root%2Fcimv2.pickle')
+    with open(file_path, 'wb') as fp:
+        fp.write(b'garbage')
+    conn.counts = {'GetClass': 0, 'EnumerateClassNames': 0}
+
+    cache = ClassCache('myconn', URL, cache_dir=str(tmpdir))
+    cls = cache.get_class(conn, 'CIM_Foo')
+
+    assert cls.classname == 'CIM_Foo'
+    assert conn.counts == {'GetClass': 1, 'EnumerateClassNames': 1}
+
+
+def test_clear(conn, tmpdir):
+    # pylint: disable=redefined-outer-name
+    """Test that clear() removes the cache files of the connection."""
+    cache = ClassCache('myconn', URL, cache_dir=str(tmpdir))
+    cache.get_class(conn, 'CIM_Foo')
+
+    cache.clear()
+
+    assert not os.path.exists(cache.connection_dir)
+
+
+def test_get_index_superclasses_persistent(conn, tmpdir):
+    # pylint: disable=redefined-outer-name
+    """Test that the superclass index is retrieved with a single request and
+    is kept on disk with the classes of the namespace."""
+    index = ClassCache('myconn', URL, cache_dir=str(tmpdir)) \
+        .get_index(conn, 'superclasses')
+
+    assert sorted(index) == [('CIM_Foo', None), ('CIM_Foo_sub', 'CIM_Foo')]
+    assert conn.enum_classes_count == 1
+
+    cache = ClassCache('myconn', URL, cache_dir=str(tmpdir))
+    assert cache.get_index(conn, 'superclasses', NAMESPACE) == index
+    cache.get_class(conn, 'CIM_Foo')
+    assert ClassCache('myconn', URL, cache_dir=str(tmpdir)) \
+        .get_index(conn, 'superclasses') == index
+    assert conn.enum_classes_count == 1
+
+
+def test_invalidate(conn, tmpdir):
+    # pylint: disable=redefined-outer-name
+    """Test that invalidate() discards the cache of the namespace."""
+    cache = ClassCache('myconn', URL, cache_dir=str(tmpdir))
+    cache.get_index(conn, 'superclasses')
+
+    cache.invalidate(NAMESPACE)
+
+    assert os.listdir(cache.connection_dir) == []
+    cache.get_index(conn, 'superclasses')
+    assert conn.enum_classes_count == 2
+
+
+def test_get_index_qualifier_flags(conn, tmpdir):
+    # pylint: disable=redefined-outer-name
+    """Test the qualifier flags index."""
+    cache = ClassCache('myconn', URL, cache_dir=str(tmpdir))
+
+    index = cache.get_index(conn, 'qualifier_flags')
+
+    assert sorted(index) == [('CIM_Foo', 0), ('CIM_Foo_sub', 4)]
+    assert conn.enum_classes_count == 1
+
+
+class LocalOnlyConnection(object):
+    # pylint: disable=too-few-public-methods
+    """Connection whose EnumerateClasses returns classes without inherited
+    qualifiers, as WBEM servers do for LocalOnly=True, with the subclasses
+    before their superclasses."""
+
+    def EnumerateClasses(self, **kwargs):
+        # pylint: disable=invalid-name,no-self-use
+        """Return the classes of the namespace."""
+        assert kwargs['LocalOnly'] is True
+        assoc = CIMClass('CIM_Assoc', qualifiers=[
+            CIMQualifier('Association', True)])
+        indic = CIMClass('CIM_Indic', qualifiers=[
+            CIMQualifier('Indication', True),
+            CIMQualifier('Experimental', True)])
+        return [CIMClass('CIM_Assoc_sub_sub', superclass='CIM_Assoc_sub'),
+                CIMClass('CIM_Assoc_sub', superclass='cim_assoc'),
+                assoc,
+                CIMClass('CIM_Indic_sub', superclass='CIM_Indic'),
+                indic,
+                CIMClass('CIM_Other', superclass='CIM_Unknown')]
+
+
+def test_retrieve_qualifier_flags_inherited():
+    """Test that the Association and Indication flags are propagated to the
+    subclasses, and the Experimental flag is not."""
+    index = retrieve_qualifier_flags(LocalOnlyConnection(), NAMESPACE)
+
+    assert index == [('CIM_Assoc_sub_sub', 1), ('CIM_Assoc_sub', 1),
+                     ('CIM_Assoc', 1), ('CIM_Indic_sub', 2),
+                     ('CIM_Indic', 6), ('CIM_Other', 0)]
+
+
+def test_file_of_other_version(conn, tmpdir):
+    # pylint: disable=redefined-outer-name
+    """Test that a cache file of another format version is rebuilt."""
+    cache = ClassCache('myconn', URL, cache_dir=str(tmpdir))
+    cache.get_index(conn, 'qualifier_flags')
+    file_path = os.path.join(cache.connection_dir, 'root%2Fcimv2.pickle')
+    with open(file_path, 'rb') as fp:
+        ns_cache = pickle.load(fp)
+    del ns_cache['version']
+    with open(file_path, 'wb') as fp:
+        pickle.dump(ns_cache, fp)
+
+    ClassCache('myconn', URL, cache_dir=str(tmpdir)) \
+        .get_index(conn, 'qualifier_flags')
+
+    assert conn.enum_classes_count == 2
+
+
+@pytest.mark.parametrize('no_class_cache, exp_cached', [
+    (False, True),
+    (True, False),
+])
+def test_context_no_class_cache(no_class_cache, exp_cached):
+    """Test that the --no-class-cache general option disables the class cache
+    of the context."""
+    server = PywbemServer(URL, NAMESPACE, name='myconn')
+    context = ContextObj(server, None, None, None, None, None, None,
+                         no_class_cache=no_class_cache)
+
+    assert (context.class_cache is not None) == exp_cached
@@ -20,6 +20,11 @@ from __future__ import absolute_import, print_function
 
 import os
 import pytest
+import click
+
+from pywbem import CIMError, CIM_ERR_FAILED, CIM_ERR_NOT_FOUND
+
+from pywbemtools.pywbemcli._cmd_class import delete_instances
 
 from .cli_test_extensions import CLITestsBase
 from .common_options_help_lines import CMD_OPTION_NAMES_ONLY_HELP_LINE, \
@@ -30,7 +35,7 @@ from .common_options_help_lines import CMD_OPTION_NAMES_ONLY_HELP_LINE, \
     CMD_OPTION_MULTIPLE_NAMESPACE_HELP_LINE, \
     CMD_OPTION_ASSOCIATION_FILTER_HELP_LINE, \
     CMD_OPTION_INDICATION_FILTER_HELP_LINE, \
-    CMD_OPTION_EXPERIMENTAL_FILTER_HELP_LINE
+    CMD_OPTION_EXPERIMENTAL_FILTER_HELP_LINE, CMD_OPTION_WORKERS_HELP_LINE
 
 from .utils import execute_pywbemcli, assert_rc
 
@@ -87,6 +92,7 @@ CLASS_DELETE_HELP_LINES = [
     'Delete a class.',
     '-f, --force Delete any instances of the class as well.',
     CMD_OPTION_NAMESPACE_HELP_LINE,
+    CMD_OPTION_WORKERS_HELP_LINE,
     CMD_OPTION_HELP_HELP_LINE,
 ]
 
@@ -114,6 +120,7 @@ CLASS_FIND_HELP_LINES = [
     CMD_OPTION_ASSOCIATION_FILTER_HELP_LINE,
     CMD_OPTION_INDICATION_FILTER_HELP_LINE,
     CMD_OPTION_EXPERIMENTAL_FILTER_HELP_LINE,
+    CMD_OPTION_WORKERS_HELP_LINE,
     CMD_OPTION_HELP_HELP_LINE,
 ]
 
@@ -941,6 +948,22 @@ TEST_CASES = [
      SIMPLE_MOCK_FILE, OK],
 
 
+    ['Verify class command find simple name with --workers, same order',
+     ['find', 'CIM_*', '-n', 'root/cimv2', '--workers', '3'],
+     {'stdout': ["  root/cimv2:CIM_Foo",
+                 "  root/cimv2:CIM_Foo_sub",
+                 "  root/cimv2:CIM_Foo_sub2",
+                 "  root/cimv2:CIM_Foo_sub_sub"],
+      'test': 'lines'},
+     SIMPLE_MOCK_FILE, OK],
+
+    ['Verify class command find with --workers 0 fails',
+     ['find', 'CIM_*', '--workers', '0'],
+     {'stderr': ['Invalid value for', '--workers'],
+      'rc': 2,
+      'test': 'innows'},
+     SIMPLE_MOCK_FILE, OK],
+
     ['Verify class command find name in known namespace -o grid',
      {'general': ['-o', 'grid'],
       'args': ['find', 'CIM_*', '-n', 'root/cimv2']},
@@ -1034,6 +1057,14 @@ TEST_CASES = [
       'test': 'innows'},
      [SIMPLE_MOCK_FILE], OK],
 
+    ['Verify class command delete successful with --force --workers',
+     {'args': ['delete', 'CIM_Foo_sub_sub', '--force', '--workers', '4'],
+      'general': ['--verbose']},
+     {'stdout': ['Deleted class', 'CIM_Foo_sub_sub'],
+      'stderr': ['Deleted 3 of 3 instances'],
+      'test': 'innows'},
+     [SIMPLE_MOCK_FILE], OK],
+
     ['Verify class command delete fail instances exist',
      ['delete', 'CIM_Foo_sub_sub'],
      {'stderr': 'Delete rejected; instances exist',
@@ -1142,6 +1173,13 @@ TEST_CASES = [
       'test': 'regex'},
      SIMPLE_MOCK_FILE, OK],
 
+    ['Verify class command tree with invalid class, no superclass option',
+     ['tree', 'CIM_Foo_subx'],
+     {'stderr': ['CIMError: 5', 'CIM_Foo_subx'],
+      'rc': 1,
+      'test': 'innows'},
+     SIMPLE_MOCK_FILE, OK],
+
     ['Verify class command tree with superclass option, no class',
      ['tree', '-s'],
      {'stderr': ['Error: CLASSNAME argument required for --superclasses '
@@ -1449,9 +1487,10 @@ TEST_CASES = [
       'general': ['--timestats']},
      {'stdout': ['class CIM_Foo {',
                  'string InstanceID;',
-                 'Count    Exc    Time    ReqLen    ReplyLen  Operation',
+                 r'Count +Exc +Time +Time p50/p90/p99 +ReqLen +ReplyLen +Obj/s '
+                 r'+Bytes/s +Operation',
                  '      1      0',
-                 '0           0  GetClass'],
+                 r'0 +0 +[0-9]+ +0 +GetClass'],
       'rc': 0,
       'test': 'regex'},
      SIMPLE_MOCK_FILE, OK],
@@ -1487,6 +1526,7 @@ class TestSubcmdClass(CLITestsBase):
     Test all of the class command variations.
     """
     command_group = 'class'
+    in_process = True
 
     @pytest.mark.parametrize(
         "desc, inputs, exp_response, mock, condition",
@@ -1572,3 +1612,75 @@ class TestClassEnumerate(object):
         assert_rc(0, rc, stdout, stderr)
         assert stderr == ""
         assert stdout.startswith(exp_result_start)
+
+
+class DeleteConnection(object):
+    # pylint: disable=too-few-public-methods, useless-object-inheritance
+    """Connection whose DeleteInstance fails a defined number of times for
+    an instance path."""
+
+    def __init__(self, failures):
+        self.failures = failures
+        self.deleted = []
+
+    def DeleteInstance(self, instname):  # pylint: disable=invalid-name
+        """Fail or record the deletion"""
+        if self.failures.get(instname, 0):
+            self.failures[instname] -= 1
+            raise CIMError(CIM_ERR_FAILED, 'failed {}'.format(instname))
+        if instname == 'gone':
+            raise CIMError(CIM_ERR_NOT_FOUND)
+        self.deleted.append(instname)
+
+
+class DeleteContext(object):
+    # pylint: disable=too-few-public-methods, useless-object-inheritance
+    """Minimal context object for delete_instances()"""
+
+    def __init__(self, conns, verbose=False):
+        self.conns = conns
+        self.verbose = verbose
+        self.closed = False
+
+    def spinner_stop(self):
+        """Nothing to stop"""
+
+    def worker_connections(self, workers):
+        """Return the connections"""
+        return self.conns[:workers]
+
+    def close_worker_connections(self, conns):
+        # pylint: disable=unused-argument
+        """Record that the connections have been closed"""
+        self.closed = True
+
+
+class TestClassDeleteInstances(object):
+    # pylint: disable=useless-object-inheritance
+    """
+    Test the delete_instances() function used by 'class delete --force'
+    """
+
+    def test_retry(self, capsys):  # pylint: disable=no-self-use
+        """Test that failed deletions are retried and progress is shown"""
+        conns = [DeleteConnection({'p2': 2}), DeleteConnection({'p3': 1})]
+        context = DeleteContext(conns, verbose=True)
+
+        delete_instances(context, ['p1', 'p2', 'p3', 'p4', 'gone'], 2)
+
+        deleted = conns[0].deleted + conns[1].deleted
+        assert sorted(deleted) == ['p1', 'p2', 'p3', 'p4']
+        assert context.closed
+        assert 'Deleted 5 of 5 instances' in capsys.readouterr().err
+
+    def test_errors(self):  # pylint: disable=no-self-use
+        """Test that remaining failures are reported"""
+        context = DeleteContext([DeleteConnection({'p2': 5, 'p3': 5})])
+
+        with pytest.raises(click.ClickException) as exc_info:
+            delete_instances(context, ['p1', 'p2', 'p3'], 1)
+
+        assert exc_info.value.message == \
+            'Delete rejected; 2 of 3 instance deletes failed. First error: ' \
+            'p2: 1 (CIM_ERR_FAILED): failed p2'
+        assert context.closed
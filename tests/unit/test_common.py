@@ -42,7 +42,8 @@ from pywbemtools.pywbemcli._common import parse_wbemuri_str, \
     create_ciminstance, compare_instances, resolve_propertylist, \
     _format_instances_as_rows, _print_instances_as_table, is_classname, \
     pick_one_from_list, pick_multiple_from_list, hide_empty_columns, \
-    verify_operation, split_str_w_esc, format_keys, create_ciminstancename
+    verify_operation, split_str_w_esc, format_keys, create_ciminstancename, \
+    display_cim_objects_iter, execute_concurrently
 # pylint: disable=unused-import
 from pywbemtools.pywbemcli._context_obj import ContextObj
 
@@ -1874,6 +1875,60 @@ TESTCASES_FMT_INSTANCE_AS_ROWS = [
                 [u'"/:REF_CLN.k1=\\"v1\\""']],
         ),
         None, None, True, ),
+
+    (
+        "Verify instances with different properties use union of properties",
+        dict(
+            args=([CIMInstance('P', [CIMProperty('P', Uint32(1)),
+                                     CIMProperty('Q', u'a')]),
+                   CIMInstance('P', [CIMProperty('R', True),
+                                     CIMProperty('p', Uint32(2))]),
+                   CIMInstance('P', [CIMProperty('Q', u'b'),
+                                     CIMProperty('S', Uint32(1))])], 30),
+            kwargs=dict(include_classes=True),
+            exp_rtn=[[u'P', u'1', u'"a"', u'', u''],
+                     [u'P', u'2', u'', u'true', u''],
+                     [u'P', u'', u'"b"', u'', u'1']],
+        ),
+        None, None, True, ),
+
+    (
+        "Verify repeated values and property with different types",
+        dict(
+            args=([CIMInstance('P', [CIMProperty('P', Uint8(3)),
+                                     CIMProperty('Q', False)]),
+                   CIMInstance('P', [CIMProperty('P', Uint8(3)),
+                                     CIMProperty('Q', False)]),
+                   CIMInstance('P', [CIMProperty('P', u'3'),
+                                     CIMProperty('Q', [False, True])])], 30),
+            kwargs=dict(),
+            exp_rtn=[[u'3', u'false'],
+                     [u'3', u'false'],
+                     [u'"3"', u'false, true']],
+        ),
+        None, None, True, ),
+
+    (
+        "Verify string values that are escaped or folded",
+        dict(
+            args=([CIMInstance('P', [CIMProperty('P', u'a"b')]),
+                   CIMInstance('P', [CIMProperty('P', u'abcdefghijkl')])],
+                  10),
+            kwargs=dict(),
+            exp_rtn=[[u'"a\\"b"'],
+                     [u'\n"abcdefgh"\n"ijkl"']],
+        ),
+        None, None, True, ),
+
+    (
+        "Verify objects that are not instances",
+        dict(
+            args=([CIMInstance('P', [CIMProperty('P', u'a')]),
+                   CIMClass('P')], 10),
+            kwargs=dict(),
+            exp_rtn=None,
+        ),
+        ValueError, None, True, ),
 ]
 
 # TODO: See line 973. We have some test duplication.
@@ -1998,6 +2053,98 @@ def test_print_insts_as_table(testcase, args, kwargs, exp_tbl):
     # assertexp_tbl, stdout, testcase.desc)
 
 
+# Testcases for display_cim_objects_iter()
+
+    # Each list item is a testcase tuple with these items:
+    # * desc: Short testcase description.
+    # * output_format: Output format set in the context.
+    # * obj_cnt: Number of instances yielded by the generator.
+    # * chunk_size: chunk_size argument of the function.
+    # * exp_titles: Expected number of table titles in the output.
+    # * exp_rows: Expected number of instance rows in the output.
+
+TESTCASES_DISPLAY_CIM_OBJECTS_ITER = [
+    ("Verify table output in one chunk", 'simple', 3, 10, 1, 3),
+    ("Verify table output split into chunks", 'simple', 5, 2, 3, 5),
+    ("Verify table output with exact multiple of chunk size", 'simple', 4, 2,
+     2, 4),
+    ("Verify table output of empty generator", 'simple', 0, 2, 0, 0),
+    ("Verify mof output is not chunked", 'mof', 5, 2, 0, 5),
+]
+
+
+@pytest.mark.parametrize(
+    "desc, output_format, obj_cnt, chunk_size, exp_titles, exp_rows",
+    TESTCASES_DISPLAY_CIM_OBJECTS_ITER)
+def test_display_cim_objects_iter(capsys, desc, output_format, obj_cnt,
+                                  chunk_size, exp_titles, exp_rows):
+    # pylint: disable=unused-argument
+    """
+    Test that display_cim_objects_iter() displays all objects of a generator
+    and splits table output into tables of at most chunk_size rows.
+    """
+    context = ContextObj(None, output_format, None, None, None, None, None)
+
+    def gen_insts():
+        """Generator of simple instances with a unique key"""
+        for i in range(obj_cnt):
+            yield CIMInstance('CIM_Foo',
+                              properties=[CIMProperty('InstanceID',
+                                                      'ID{}'.format(i))])
+
+    display_cim_objects_iter(context, gen_insts(), chunk_size=chunk_size)
+
+    stdout, _ = capsys.readouterr()
+    assert stdout.count('Instances: CIM_Foo') == exp_titles
+    assert stdout.count('"ID') == exp_rows
+
+
+@pytest.mark.parametrize(
+    "conn_cnt, item_cnt",
+    [(1, 5), (3, 10), (4, 2), (2, 0)])
+def test_execute_concurrently(conn_cnt, item_cnt):
+    """
+    Test that execute_concurrently() returns the results in the order of the
+    items and never uses a connection in two threads at the same time.
+    """
+    import threading
+    import time
+
+    conns = ['conn{}'.format(i) for i in range(conn_cnt)]
+    busy = set()
+    lock = threading.Lock()
+
+    def func(conn, item):
+        """Record use of conn and return a result derived from item"""
+        with lock:
+            assert conn not in busy
+            busy.add(conn)
+        time.sleep(0.001)
+        with lock:
+            busy.remove(conn)
+        return item * 2
+
+    items = list(range(item_cnt))
+    assert execute_concurrently(conns, func, items) == \
+        [item * 2 for item in items]
+
+
+def test_execute_concurrently_exception():
+    """
+    Test that an exception raised for an item is raised by
+    execute_concurrently().
+    """
+    def func(conn, item):
+        # pylint: disable=unused-argument
+        """Fail for one item"""
+        if item == 3:
+            raise ValueError('item 3')
+        return item
+
+    with pytest.raises(ValueError):
+        execute_concurrently(['c1', 'c2'], func, list(range(6)))
+
+
 # TODO Test compare and failure in compare_obj
 
 # TODO Test compare with errors
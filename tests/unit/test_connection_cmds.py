@@ -23,10 +23,18 @@ renamed for the test and restored at the end of the test.
 from __future__ import absolute_import, print_function
 
 import os
+import re
+import socket
+import threading
+import time
 import pytest
 
+from pywbemtools.pywbemcli._cmd_connection import probe_connection
+from pywbemtools.pywbemcli._pywbem_server import PywbemServer
+
 from .cli_test_extensions import CLITestsBase
 from .common_options_help_lines import CMD_OPTION_HELP_HELP_LINE
+from .utils import execute_pywbemcli
 
 SCRIPT_DIR = os.path.dirname(__file__)
 
@@ -100,6 +108,11 @@ CONNECTION_SHOW_HELP_LINES = [
 CONNECTION_TEST_HELP_LINES = [
     'Usage: pywbemcli connection test [COMMAND-OPTIONS]',
     'Test the current connection with a predefined WBEM request.',
+    '-c, --connections PATTERN Test the connection definitions in the',
+    '--all Test all connection definitions in the connections file',
+    '--workers INTEGER Maximum number of connection definitions that are',
+    '--probe-timeout INTEGER Timeout in seconds for connecting and for each',
+    '--sort-by [name|latency] Sort the tested connection definitions by name',
     CMD_OPTION_HELP_HELP_LINE,
 ]
 
@@ -881,6 +894,7 @@ class TestSubcmdClass(CLITestsBase):
     Test all of the class command variations.
     """
     command_group = 'connection'
+    in_process = True
 
     @pytest.mark.parametrize(
         "desc, inputs, exp_response, mock, condition",
@@ -935,3 +949,159 @@ class TestSubcmdClass(CLITestsBase):
         if 'file' in exp_response:
             if 'after' in exp_response['file']:
                 test_file_existence(exp_response['file']['after'])
+
+
+def test_connection_test_multiple(connections):
+    # pylint: disable=unused-argument
+    """Test the connection test command for connection definitions of the
+    connections file, sorted by latency with the failed test last."""
+    rc, stdout, _ = execute_pywbemcli(
+        ['-o', 'simple', 'connection', 'test', '--all', '--probe-timeout', '2',
+         '--sort-by', 'latency'], in_process=True)
+
+    assert rc == 1
+    lines = stdout.splitlines()
+    assert lines[0] == 'Connection test for 4 connections, 1 failed'
+    assert lines[1].split() == ['Name', 'Server', 'Status', 'Connect', '(ms)',
+                                'Response', '(ms)', 'Brand']
+    assert sorted(line.split()[0] for line in lines[3:6]) == \
+        ['fanmock1', 'fanmock2', 'fanmock3']
+    for line in lines[3:6]:
+        assert re.match(r'^fanmock[1-3] +mock +OK +[0-9.]+$', line)
+    assert re.match(r'^fandead +http://localhost:1 +Failed: ', lines[6])
+
+
+def test_connection_test_select(connections):
+    # pylint: disable=unused-argument
+    """Test the connection test command for the connection definitions
+    selected with the --connections option."""
+    rc, stdout, stderr = execute_pywbemcli(
+        ['-o', 'simple', 'connection', 'test', '-c', 'fanmock[12]'],
+        in_process=True)
+
+    assert rc == 0, stderr
+    lines = stdout.splitlines()
+    assert lines[0] == 'Connection test for 2 connections, 0 failed'
+    assert [line.split()[0] for line in lines[3:]] == ['fanmock1', 'fanmock2']
+
+
+def test_connection_test_invalid_port(connections):
+    """Test that a connection definition with an invalid port in its URL is
+    reported as failed in its row, without aborting the test of the other
+    connection definitions."""
+    connections.add('fanbadport', PywbemServer('http://localhost:99999',
+                                               name='fanbadport',
+                                               mock_server=[]))
+
+    rc, stdout, _ = execute_pywbemcli(
+        ['-o', 'simple', 'connection', 'test', '-c', 'fan[bm]*',
+         '--probe-timeout', '2'], in_process=True)
+
+    assert rc == 1
+    lines = stdout.splitlines()
+    assert lines[0] == 'Connection test for 4 connections, 1 failed'
+    assert re.match(r'^fanbadport +http://localhost:99999 +Failed: Port out '
+                    r'of range', lines[3])
+
+
+@pytest.fixture
+def listening_server():
+    """
+    Fixture for the URL of a local server that accepts connections and
+    closes them after receiving the request, without a response.
+    """
+    sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+    sock.bind(('localhost', 0))
+    sock.listen(5)
+
+    def serve():
+        while True:
+            try:
+                client, _ = sock.accept()
+            except (IOError, OSError):
+                return  # The listening socket has been closed
+            client.recv(65536)
+            client.close()
+
+    thread = threading.Thread(target=serve)
+    thread.daemon = True
+    thread.start()
+    yield 'http://localhost:{}'.format(sock.getsockname()[1])
+    sock.close()
+
+
+def test_probe_connection_connect_time(listening_server):
+    # pylint: disable=redefined-outer-name
+    """Test that the connect time to a listening server is measured even if
+    the server does not respond to the operation."""
+    server = PywbemServer(listening_server, 'root/cimv2', name='listening')
+
+    status, connect_time, latency, brand = probe_connection(server, 2)
+
+    assert status.startswith('Failed: ')
+    assert connect_time is not None and 0 <= connect_time < 2
+    assert latency is None
+    assert brand is None
+
+
+# CIM-XML response of a WBEM server with an error to any operation
+CIM_ERROR_RESPONSE = b"""<?xml version="1.0" encoding="utf-8" ?>
+<CIM CIMVERSION="2.0" DTDVERSION="2.0">
+<MESSAGE ID="1001" PROTOCOLVERSION="1.0"><SIMPLERSP>
+<IMETHODRESPONSE NAME="EnumerateClassNames">
+<ERROR CODE="3" DESCRIPTION="Invalid namespace"/>
+</IMETHODRESPONSE></SIMPLERSP></MESSAGE></CIM>"""
+
+# Time in seconds that the responding server waits before its response
+RESPONSE_DELAY = 0.2
+
+
+@pytest.fixture
+def responding_server():
+    """
+    Fixture for the URL of a local server that responds to each request with
+    a CIM error after RESPONSE_DELAY seconds. The connections are handled one
+    at a time.
+    """
+    sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+    sock.bind(('localhost', 0))
+    sock.listen(5)
+
+    def serve():
+        while True:
+            try:
+                client, _ = sock.accept()
+            except (IOError, OSError):
+                return  # The listening socket has been closed
+            if not client.recv(65536):
+                # A connection without request, e.g. for the connect time
+                client.close()
+                continue
+            time.sleep(RESPONSE_DELAY)
+            client.sendall(
+                b'HTTP/1.1 200 OK\r\n'
+                b'Content-Type: application/xml; charset="utf-8"\r\n'
+                b'CIMOperation: MethodResponse\r\n'
+                b'Content-Length: ' + str(len(CIM_ERROR_RESPONSE)).encode() +
+                b'\r\nConnection: close\r\n\r\n' + CIM_ERROR_RESPONSE)
+            client.close()
+
+    thread = threading.Thread(target=serve)
+    thread.daemon = True
+    thread.start()
+    yield 'http://localhost:{}'.format(sock.getsockname()[1])
+    sock.close()
+
+
+def test_probe_connection_latency(responding_server):
+    # pylint: disable=redefined-outer-name
+    """Test that the latency of the response of a server that responds with
+    a CIM error is measured from the HTTP request to the HTTP response."""
+    server = PywbemServer(responding_server, 'root/cimv2', name='responding')
+
+    status, connect_time, latency, _ = probe_connection(server, 5)
+
+    assert status == 'OK'
+    assert connect_time is not None and 0 <= connect_time < RESPONSE_DELAY
+    assert latency is not None and \
+        RESPONSE_DELAY <= latency < 2 * RESPONSE_DELAY
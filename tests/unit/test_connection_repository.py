@@ -0,0 +1,204 @@
+# (C) Copyright 2020 IBM Corp.
+# (C) Copyright 2020 Inova Development Inc.
+# All Rights Reserved
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""
+Unit tests for the storage of the ConnectionRepository class.
+"""
+
+from __future__ import absolute_import, print_function
+
+import os
+import sys
+import json
+from subprocess import Popen, PIPE
+import pytest
+from six.moves import cPickle as pickle
+
+from pywbemtools.pywbemcli import _connection_repository
+from pywbemtools.pywbemcli._connection_repository import ConnectionRepository
+from pywbemtools.pywbemcli._pywbem_server import PywbemServer
+
+# Adds a connection definition to the connections file sys.argv[1] in a
+# separate process
+ADD_SCRIPT = """
+import sys
+from pywbemtools.pywbemcli._connection_repository import ConnectionRepository
+from pywbemtools.pywbemcli._pywbem_server import PywbemServer
+name = sys.argv[2]
+ConnectionRepository(sys.argv[1]).add(
+    name, PywbemServer('http://' + name, name=name, mock_server=[]))
+"""
+
+
+class PickleBomb(object):
+    # pylint: disable=useless-object-inheritance,too-few-public-methods
+    """Object that creates a marker file when it is unpickled."""
+
+    def __init__(self, marker_file):
+        self.marker_file = marker_file
+
+    def __reduce__(self):
+        return (open, (self.marker_file, 'w'))
+
+
+def reset_repository():
+    """Discard the connection definitions read by this process."""
+    # pylint: disable=protected-access
+    ConnectionRepository._pywbemcli_servers = {}
+    ConnectionRepository._loaded = False
+    ConnectionRepository._connections_file = None
+    ConnectionRepository._connections_file_signature = None
+    ConnectionRepository.default_connection_name = None
+
+
+@pytest.fixture
+def connections_file(tmpdir):
+    """Path name of a connections file; the repository is reset before and
+    after the test."""
+    reset_repository()
+    yield str(tmpdir.join('connections.yaml'))
+    reset_repository()
+
+
+def server(name):
+    """Return a PywbemServer object for a connection definition."""
+    return PywbemServer('http://' + name, name=name, mock_server=[])
+
+
+def add_in_process(connections_file, name):
+    """Start a process that adds a connection definition."""
+    return Popen([sys.executable, '-c', ADD_SCRIPT, connections_file, name],
+                 stdout=PIPE, stderr=PIPE)
+
+
+def test_cache_file_used(connections_file, monkeypatch):
+    # pylint: disable=redefined-outer-name
+    """Test that the connections file is not parsed if the cache file is
+    valid."""
+    repo = ConnectionRepository(connections_file)
+    repo.add('srv1', server('srv1'))
+    repo.set_default_connection('srv1')
+    assert os.path.isfile(repo.cache_file)
+
+    reset_repository()
+
+    def fail_load(*args, **kwargs):
+        raise AssertionError('Connections file parsed')
+
+    monkeypatch.setattr(_connection_repository.yaml, 'load', fail_load)
+    repo = ConnectionRepository(connections_file)
+    assert list(repo) == ['srv1']
+    assert repo['srv1'].server == 'http://srv1'
+    assert repo.get_default_connection_name() == 'srv1'
+
+
+def test_cache_file_outdated(connections_file):
+    # pylint: disable=redefined-outer-name
+    """Test that a modified connections file is parsed instead of using the
+    cache file."""
+    repo = ConnectionRepository(connections_file)
+    repo.add('srv1', server('srv1'))
+    with open(connections_file) as fp:
+        data = fp.read()
+    with open(connections_file, 'w') as fp:
+        fp.write(data.replace('srv1', 'srv22'))
+
+    reset_repository()
+    repo = ConnectionRepository(connections_file)
+
+    assert list(repo) == ['srv22']
+
+
+def test_cache_file_same_size_edit(connections_file):
+    # pylint: disable=redefined-outer-name
+    """Test that a modification of the connections file that keeps its size
+    and modification time is detected."""
+    repo = ConnectionRepository(connections_file)
+    repo.add('srv1', server('srv1'))
+    stat = os.stat(connections_file)
+    with open(connections_file) as fp:
+        data = fp.read()
+    with open(connections_file, 'w') as fp:
+        fp.write(data.replace('srv1', 'srv2'))
+    os.utime(connections_file, (stat.st_atime, stat.st_mtime))
+
+    reset_repository()
+    repo = ConnectionRepository(connections_file)
+
+    assert list(repo) == ['srv2']
+
+
+def test_cache_file_not_unpickled(connections_file, tmpdir):
+    # pylint: disable=redefined-outer-name
+    """Test that a pickle file planted as cache file is not loaded, and that
+    the cache file is JSON."""
+    repo = ConnectionRepository(connections_file)
+    repo.add('srv1', server('srv1'))
+    with open(repo.cache_file) as fp:
+        assert json.load(fp)['data']['default_connection_name'] is None
+
+    marker_file = str(tmpdir.join('marker'))
+    with open(repo.cache_file, 'wb') as fp:
+        pickle.dump(PickleBomb(marker_file), fp, 2)
+
+    reset_repository()
+    repo = ConnectionRepository(connections_file)
+
+    assert list(repo) == ['srv1']
+    assert not os.path.exists(marker_file)
+
+
+def test_update_keeps_other_updates(connections_file):
+    # pylint: disable=redefined-outer-name
+    """Test that an update is made to the current connections file, keeping
+    the updates made by other processes after it was read."""
+    repo = ConnectionRepository(connections_file)
+    repo.add('srv1', server('srv1'))
+
+    proc = add_in_process(connections_file, 'srv2')
+    assert proc.wait() == 0, proc.stderr.read()
+    repo.add('srv3', server('srv3'))
+    repo.delete('srv1')
+    repo.delete('srv1')  # already deleted
+
+    assert sorted(repo) == ['srv2', 'srv3']
+    reset_repository()
+    assert sorted(ConnectionRepository(connections_file)) == ['srv2', 'srv3']
+
+
+def test_concurrent_updates(connections_file):
+    # pylint: disable=redefined-outer-name
+    """Test that concurrent updates by several processes are all kept."""
+    names = ['srv{}'.format(i) for i in range(8)]
+
+    procs = [add_in_process(connections_file, name) for name in names]
+    for proc in procs:
+        assert proc.wait() == 0, proc.stderr.read()
+
+    assert sorted(ConnectionRepository(connections_file)) == names
+
+
+def test_delete_last(connections_file):
+    # pylint: disable=redefined-outer-name
+    """Test that deleting the last connection definition removes the
+    connections file and its cache file."""
+    repo = ConnectionRepository(connections_file)
+    repo.add('srv1', server('srv1'))
+
+    del repo['srv1']
+
+    assert not os.path.exists(connections_file)
+    assert not os.path.exists(repo.cache_file)
+    assert os.path.isfile(connections_file + '.bak')
@@ -0,0 +1,80 @@
+# (C) Copyright 2020 IBM Corp.
+# (C) Copyright 2020 Inova Development Inc.
+# All Rights Reserved
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""
+Tests the fanout command
+"""
+
+from __future__ import absolute_import, print_function
+
+import re
+
+from .utils import execute_pywbemcli
+
+# Names of the connection definitions for the mock WBEM servers in the
+# connections fixture
+MOCK_NAMES = ['fanmock1', 'fanmock2', 'fanmock3']
+
+
+def test_fanout(connections):
+    # pylint: disable=unused-argument
+    """Test the output of a command for the selected connections."""
+    rc, stdout, stderr = execute_pywbemcli(
+        ['fanout', '-c', 'fanmock*', '--workers', '2',
+         'class', 'enumerate', '--names-only'], in_process=True)
+
+    assert rc == 0, stderr
+    lines = stdout.splitlines()
+    assert lines[0] == \
+        'Command "class enumerate --names-only" for 3 connections, 0 failed'
+    for line, name in zip(lines[3:], MOCK_NAMES):
+        assert re.match(r'^{} +0 +[0-9.]+ +CIM_Foo$'.format(name), line)
+    assert len(lines) == 6
+
+
+def test_fanout_errors(connections):
+    # pylint: disable=unused-argument
+    """Test that errors are reported for each connection."""
+    rc, stdout, _ = execute_pywbemcli(
+        ['-o', 'simple', 'fanout', '-c', 'fandead', '-c', 'fanmock1',
+         'class', 'get', 'CIM_Blah'], in_process=True)
+
+    assert rc == 1
+    assert 'for 2 connections, 2 failed' in stdout
+    assert re.search(r'^fandead +1 .*Error: ConnectionError', stdout, re.M)
+    assert re.search(r"^fanmock1 +1 .*Class 'CIM_Blah' not found", stdout,
+                     re.M)
+
+
+def test_fanout_disallowed(connections):
+    # pylint: disable=unused-argument
+    """Test that commands that cannot be executed by the fanout command are
+    rejected."""
+    rc, stdout, _ = execute_pywbemcli(
+        ['fanout', '-c', 'fanmock1', 'connection', 'list'], in_process=True)
+
+    assert rc == 1
+    assert "Command 'connection' is not allowed in fanout mode" in stdout
+
+
+def test_fanout_no_match(connections):
+    # pylint: disable=unused-argument
+    """Test the error for patterns that do not match any connection."""
+    rc, _, stderr = execute_pywbemcli(
+        ['fanout', '-c', 'blah*', 'server', 'brand'], in_process=True)
+
+    assert rc == 1
+    assert "No connection definitions in connections file" in stderr
+    assert "match 'blah*'" in stderr
@@ -151,6 +151,32 @@ Options:
                                   1000
   -T, --timestats                 Show time statistics of WBEM server
                                   operations.
+  --stats-file FILE               Append a record with the statistics of each
+                                  WBEM server operation to the statistics file
+                                  FILE, in the JSON Lines format. The
+                                  statistics files can be summarized and
+                                  compared with the stats command group.
+                                  Default: EnvVar PYWBEMCLI_STATS_FILE, or no
+                                  statistics file.
+  --profile                       Show the time of the phases of the
+                                  processing of each command: the WBEM server
+                                  operations (CIM-XML request, server and
+                                  network, CIM-XML parse) and the sorting and
+                                  formatting of the result.
+  --profile-file FILE             Save the cProfile profile data of each
+                                  command to the file FILE in the format of
+                                  the Python pstats module. The file is
+                                  overwritten by each command. Default: No
+                                  profile data is saved.
+  --no-class-cache                Retrieve the classes from the WBEM server
+                                  instead of using the persistent class cache
+                                  of the connection. Without this option,
+                                  changes of classes made by other clients are
+                                  detected only when the class names of the
+                                  namespace change, and at most every 600
+                                  seconds. Default: EnvVar
+                                  PYWBEMCLI_NO_CLASS_CACHE, or the class cache
+                                  is used.
   -d, --default-namespace NAMESPACE
                                   Default namespace, to be used when commands
                                   do not specify the --namespace command
@@ -181,7 +207,12 @@ Commands:
   instance    Command group for CIM instances.
   qualifier   Command group for CIM qualifier declarations.
   server      Command group for WBEM servers.
+  stats       Command group for WBEM operation statistics files.
+  agent       Command group for the pywbemcli agent.
+  batch       Execute the pywbemcli commands in a file.
+  cache       Command group for caches of the current connection.
   connection  Command group for WBEM connection definitions.
+  fanout      Execute a command for multiple WBEM connection definitions.
   help        Show help message for interactive mode.
   repl        Enter interactive mode (default).
 """
@@ -470,8 +501,8 @@ TEST_CASES = [
       'cmdgrp': 'class',
       'args': ['enumerate']},
      {'stderr': [r'Traceback \(most recent call last\)',
-                 r'pywbemtools', r'_pywbemcli_operations\.py',
-                 r'line ', 'in build_repository',
+                 r'pywbemtools', r'_pywbemcli_faked_operations\.py',
+                 r'line ', 'in _build_repository',
                  r"NameError: name 'globalsx' is not defined",
                  'Aborted'],
       'rc': 1,
@@ -556,7 +587,8 @@ TEST_CASES = [
       'cmdgrp': 'class',
       'args': ['enumerate']},
      {'stdout': ['class CIM_Foo {',
-                 '  Count    Exc    Time    ReqLen    ReplyLen  Operation',
+                 'Count Exc Time Time p50/p90/p99 ReqLen ReplyLen Obj/s '
+                 'Bytes/s Operation',
                  'EnumerateClasses'],
       'rc': 0,
       'test': 'innows'},
@@ -567,7 +599,8 @@ TEST_CASES = [
       'cmdgrp': 'class',
       'args': ['enumerate']},
      {'stdout': ['class CIM_Foo {',
-                 '  Count    Exc    Time    ReqLen    ReplyLen  Operation',
+                 'Count Exc Time Time p50/p90/p99 ReqLen ReplyLen Obj/s '
+                 'Bytes/s Operation',
                  'EnumerateClasses'],
       'rc': 0,
       'test': 'innows'},
@@ -580,7 +613,8 @@ TEST_CASES = [
       'cmdgrp': 'instance',
       'args': ['enumerate', 'CIM_Foo']},
      {'stdout': ['instance of CIM_Foo {',
-                 '  Count    Exc    Time    ReqLen    ReplyLen  Operation',
+                 r'Count +Exc +Time +Time p50/p90/p99 +ReqLen +ReplyLen +Obj/s '
+                 r'+Bytes/s +Operation',
                  ' OpenEnumerateInstances'],
       'rc': 0,
       'test': 'regex'},
@@ -593,7 +627,8 @@ TEST_CASES = [
       'cmdgrp': 'instance',
       'args': ['enumerate', 'CIM_Foo']},
      {'stdout': ['instance of CIM_Foo {',
-                 '  Count    Exc    Time    ReqLen    ReplyLen  Operation',
+                 r'Count +Exc +Time +Time p50/p90/p99 +ReqLen +ReplyLen +Obj/s '
+                 r'+Bytes/s +Operation',
                  ' OpenEnumerateInstances'],
       'rc': 0,
       'test': 'regex'},
@@ -606,7 +641,8 @@ TEST_CASES = [
       'cmdgrp': 'instance',
       'args': ['enumerate', 'CIM_Foo']},
      {'stdout': ['instance of CIM_Foo {',
-                 '  Count    Exc    Time    ReqLen    ReplyLen  Operation',
+                 r'Count +Exc +Time +Time p50/p90/p99 +ReqLen +ReplyLen +Obj/s '
+                 r'+Bytes/s +Operation',
                  ' EnumerateInstances'],
       'rc': 0,
       'test': 'regex'},
@@ -1195,6 +1231,8 @@ class TestGeneralOptions(CLITestsBase):
     Test the general options including statistics,  --server,
     --timeout, --use-pull, --pull-max-cnt, --output-format
     """
+    in_process = True
+
     @pytest.mark.parametrize(
         "desc, inputs, exp_response, mock, condition", TEST_CASES)
     def test_execute_pywbemcli(self, desc, inputs, exp_response, mock,
@@ -36,7 +36,8 @@ from .common_options_help_lines import CMD_OPTION_NAMES_ONLY_HELP_LINE, \
     CMD_OPTION_KEYS_HELP_LINE, \
     CMD_OPTION_ASSOCIATION_FILTER_HELP_LINE, \
     CMD_OPTION_INDICATION_FILTER_HELP_LINE, \
-    CMD_OPTION_EXPERIMENTAL_FILTER_HELP_LINE
+    CMD_OPTION_EXPERIMENTAL_FILTER_HELP_LINE, \
+    CMD_OPTION_WORKERS_HELP_LINE
 
 TEST_DIR = os.path.dirname(__file__)
 
@@ -97,6 +98,7 @@ INSTANCE_ASSOCIATORS_HELP_LINES = [
     CMD_OPTION_FILTER_QUERY_LANGUAGE_LINE,
     CMD_OPTION_HELP_HELP_LINE,
     CMD_OPTION_KEYS_HELP_LINE,
+    '--stream Display each object as soon as it is received',
 ]
 
 INSTANCE_COUNT_HELP_LINES = [
@@ -107,7 +109,8 @@ INSTANCE_COUNT_HELP_LINES = [
     CMD_OPTION_HELP_HELP_LINE,
     CMD_OPTION_ASSOCIATION_FILTER_HELP_LINE,
     CMD_OPTION_INDICATION_FILTER_HELP_LINE,
-    CMD_OPTION_EXPERIMENTAL_FILTER_HELP_LINE
+    CMD_OPTION_EXPERIMENTAL_FILTER_HELP_LINE,
+    CMD_OPTION_WORKERS_HELP_LINE,
 ]
 
 INSTANCE_CREATE_HELP_LINES = [
@@ -141,6 +144,7 @@ INSTANCE_ENUMERATE_HELP_LINES = [
     CMD_OPTION_FILTER_QUERY_LINE,
     CMD_OPTION_FILTER_QUERY_LANGUAGE_LINE,
     CMD_OPTION_HELP_HELP_LINE,
+    '--stream Display each object as soon as it is received',
 ]
 
 INSTANCE_GET_HELP_LINES = [
@@ -184,6 +188,7 @@ INSTANCE_QUERY_HELP_LINES = [
     CMD_OPTION_SUMMARY_HELP_LINE,
     CMD_OPTION_HELP_HELP_LINE,
     CMD_OPTION_KEYS_HELP_LINE,
+    '--stream Display each object as soon as it is received',
 ]
 
 INSTANCE_REFERENCES_HELP_LINES = [
@@ -201,6 +206,7 @@ INSTANCE_REFERENCES_HELP_LINES = [
     CMD_OPTION_FILTER_QUERY_LANGUAGE_LINE,
     CMD_OPTION_HELP_HELP_LINE,
     CMD_OPTION_KEYS_HELP_LINE,
+    '--stream Display each object as soon as it is received',
 ]
 
 ENUM_INSTANCE_RESP = """instance of CIM_Foo {
@@ -657,6 +663,62 @@ TEST_CASES = [
       'test': 'linesnows'},
      SIMPLE_MOCK_FILE, OK],
 
+    ['Verify instance command enumerate CIM_Foo --stream',
+     ['enumerate', 'CIM_Foo', '--stream'],
+     {'stdout': ['InstanceID = "CIM_Foo1";',
+                 'InstanceID = "CIM_Foo31";',
+                 'InstanceID = "CIM_Foo_sub4";',
+                 'InstanceID = "CIM_Foo_sub_sub3";'],
+      'test': 'innows'},
+     SIMPLE_MOCK_FILE, OK],
+
+    ['Verify instance command enumerate names CIM_Foo --no --stream',
+     {'args': ['enumerate', 'CIM_Foo', '--no', '--stream'],
+      'general': ['--use-pull', 'yes', '--pull-max-cnt', '2']},
+     {'stdout': ['root/cimv2:CIM_Foo.InstanceID="CIM_Foo1"',
+                 'root/cimv2:CIM_Foo.InstanceID="CIM_Foo30"',
+                 'root/cimv2:CIM_Foo_sub.InstanceID="CIM_Foo_sub4"',
+                 'root/cimv2:CIM_Foo_sub_sub.InstanceID="CIM_Foo_sub_sub3"'],
+      'test': 'innows'},
+     SIMPLE_MOCK_FILE, OK],
+
+    ['Verify instance command -o simple enumerate CIM_Foo_sub_sub --stream',
+     {'args': ['enumerate', 'CIM_Foo_sub_sub', '--stream', '--pl',
+               'InstanceID'],
+      'general': ['--output-format', 'simple']},
+     {'stdout': ['Instances: CIM_Foo_sub_sub',
+                 'InstanceID',
+                 '"CIM_Foo_sub_sub1"',
+                 '"CIM_Foo_sub_sub2"',
+                 '"CIM_Foo_sub_sub3"'],
+      'test': 'innows'},
+     SIMPLE_MOCK_FILE, OK],
+
+    ['Verify instance command enumerate CIM_Foo --stream --summary',
+     ['enumerate', 'CIM_Foo', '--stream', '--summary'],
+     {'stdout': ['12 CIMInstance(s) returned'],
+      'test': 'lines'},
+     SIMPLE_MOCK_FILE, OK],
+
+    ['Verify instance command enumerate CIM_Foo_sub2 --stream, w --verbose '
+     'rtns msg.',
+     {'args': ['enumerate', 'CIM_Foo_sub2', '--stream'],
+      'general': ['--verbose']},
+     {'stdout': 'No objects returned',
+      'test': 'linesnows'},
+     SIMPLE_MOCK_FILE, OK],
+
+    ['Verify instance command enumerate --stream with query, traditional ops '
+     'fails',
+     {'args': ['enumerate', 'CIM_Foo', '--stream', '--filter-query',
+               'InstanceID = 3'],
+      'general': ['--use-pull', 'no']},
+     {'stderr': ['Error: instance enumerate failed because FilterQuery not '
+                 'allowed with traditional EnumerateInstance.'],
+      'rc': 1,
+      'test': 'innows'},
+     SIMPLE_MOCK_FILE, OK],
+
     ['Verify instance command enumerate with query, traditional ops fails',
      {'args': ['enumerate', 'CIM_Foo', '--filter-query', 'InstanceID = 3'],
       'general': ['--use-pull', 'no']},
@@ -1565,6 +1627,15 @@ Instances: PyWBEM_AllTypes
       'test': 'in'},
      ASSOC_MOCK_FILE, OK],
 
+    ['Verify instance command references --no --stream, returns paths',
+     ['references', 'TST_Person.name="Mike"', '--no', '--stream'],
+     {'stdout': ['//FakedUrl/root/cimv2:TST_Lineage.InstanceID="MikeSofi"',
+                 '//FakedUrl/root/cimv2:TST_Lineage.InstanceID="MikeGabi"',
+                 '//FakedUrl/root/cimv2:TST_MemberOfFamilyCollection.family'],
+      'rc': 0,
+      'test': 'in'},
+     ASSOC_MOCK_FILE, OK],
+
     ['Verify instance command references --no, returns paths with result '
      'class valid returns paths',
      ['references', 'TST_Person.name="Mike"', '--no',
@@ -1757,6 +1828,13 @@ Instances: PyWBEM_AllTypes
       'test': 'lines'},
      ASSOC_MOCK_FILE, OK],
 
+    ['Verify instance command associators --stream -s, returns count',
+     ['associators', 'TST_Person.name="Mike"', '--stream', '-s'],
+     {'stdout': ['3 CIMInstance(s) returned'],
+      'rc': 0,
+      'test': 'lines'},
+     ASSOC_MOCK_FILE, OK],
+
     ['Verify instance command associators, --include-qualifiers',
      ['associators', 'TST_Person.name="Mike"', '--include-qualifiers'],
      {'stdout': ASSOC_INSTS,
@@ -1913,6 +1991,30 @@ Instances: PyWBEM_AllTypes
       'test': 'innows'},
      SIMPLE_MOCK_FILE, OK],
 
+    ['Verify instance command count CIM_* --workers 4, Rtn table in order',
+     {'args': ['count', 'CIM_*', '--workers', '4'],
+      'general': ['--default-namespace', 'interop', '--use-pull', 'yes',
+                  '--pull-max-cnt', '1']},
+     {'stdout': ['Count of instances per class',
+                 '+-------------+-----------------+---------+',
+                 '| Namespace   | Class           |   count |',
+                 '|-------------+-----------------+---------|',
+                 '| interop     | CIM_Foo         |       5 |',
+                 '| interop     | CIM_Foo_sub     |       4 |',
+                 '| interop     | CIM_Foo_sub_sub |       3 |',
+                 '+-------------+-----------------+---------+'],
+      'rc': 0,
+      'test': 'innows'},
+     SIMPLE_MOCK_FILE, OK],
+
+    ['Verify instance command count CIM_* --workers 0 fails',
+     {'args': ['count', 'CIM_*', '--workers', '0'],
+      'general': ['--default-namespace', 'interop']},
+     {'stderr': ['0 is smaller than the minimum valid value 1'],
+      'rc': 2,
+      'test': 'innows'},
+     SIMPLE_MOCK_FILE, OK],
+
     ['Verify instance command count mock assoc. Return table of instances',
      {'args': ['count', '*'],
       'general': ['--default-namespace', 'interop', '--output-format',
@@ -2109,6 +2211,7 @@ class TestSubcmd(CLITestsBase):
     Test all of the class command variations.
     """
     command_group = 'instance'
+    in_process = True
     # mock_mof_file = 'simple_mock_model.mof'
 
     @pytest.mark.parametrize(
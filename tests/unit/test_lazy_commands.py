@@ -0,0 +1,136 @@
+# (C) Copyright 2020 IBM Corp.
+# (C) Copyright 2020 Inova Development Inc.
+# All Rights Reserved
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""
+Unit tests for the lazy loading of the command groups and of the packages
+that are only needed by some commands.
+"""
+
+from __future__ import absolute_import, print_function
+
+import sys
+from subprocess import Popen, PIPE
+import pytest
+
+from pywbemtools.pywbemcli.pywbemcli import cli, LAZY_COMMANDS
+
+# Budget for the time of importing the pywbemcli command, excluding the time
+# of importing the packages it requires in any case (pywbem, click, pbr), as a
+# ratio to the time of importing pywbem measured in the same test run, so that
+# the budget does not depend on the speed of the test system. Importing the
+# pywbemcli command takes about 0.65 times as long as importing pywbem. The
+# budget detects regressions such as importing the packages for the mock
+# support and for the interactive mode, which take about as long as importing
+# pywbem.
+IMPORT_BUDGET_RATIO = 1.0
+
+# Number of measurements of each import time; the fastest one is used
+IMPORT_REPEAT = 5
+
+# Code that prints the time of importing the pywbemcli command in a new
+# Python process
+IMPORT_TIME_CODE = """
+from timeit import default_timer
+import pywbem, click, six, pbr.version
+start_time = default_timer()
+import pywbemtools.pywbemcli.pywbemcli
+print(default_timer() - start_time)
+"""
+
+# Code that prints the time of importing pywbem in a new Python process, as a
+# reference for the time of importing the pywbemcli command
+REFERENCE_TIME_CODE = """
+from timeit import default_timer
+start_time = default_timer()
+import pywbem
+print(default_timer() - start_time)
+"""
+
+# Modules that must not be imported when loading the pywbemcli command. Some
+# modules that are only needed by some commands (e.g. socketserver and yaml)
+# are imported by pywbem itself and can therefore not be listed.
+LAZY_MODULES = [
+    'click_repl',
+    'prompt_toolkit',
+    'pywbem_mock',
+    'pywbemtools.pywbemcli._pywbemcli_faked_operations',
+    'tabulate',
+    'multiprocessing.pool',
+    'pywbemtools.pywbemcli._agent',
+    'cProfile',
+] + [mod for mod, _ in LAZY_COMMANDS.values()]
+
+
+def test_lazy_commands_help():
+    """Test that the short help of each lazily loaded command group is the
+    short help of the command group."""
+    for name, (_, short_help) in LAZY_COMMANDS.items():
+        cmd = cli.get_command(None, name)
+        assert cmd.name == name
+        assert cmd.get_short_help_str(limit=80) == short_help
+
+
+def test_lazy_commands_listed():
+    """Test that the lazily loaded command groups are listed."""
+    cmd_names = cli.list_commands(None)
+    for name in LAZY_COMMANDS:
+        assert name in cmd_names
+    assert 'repl' in cmd_names
+    assert 'help' in cmd_names
+
+
+@pytest.mark.skipif(sys.version_info < (3, 7),
+                    reason="Package attributes are loaded lazily only on "
+                    "Python 3.7 and higher")
+def test_lazy_modules_not_imported():
+    """Test that loading the pywbemcli command does not import the command
+    group modules and the packages for the mock support and for the
+    interactive mode."""
+    code = "import sys; import pywbemtools.pywbemcli.pywbemcli; " \
+        "print(','.join(m for m in {!r} if m in sys.modules))". \
+        format(LAZY_MODULES)
+    proc = Popen([sys.executable, '-c', code], stdout=PIPE, stderr=PIPE)
+    stdout, stderr = proc.communicate()
+    assert proc.returncode == 0, stderr
+    assert stdout.decode('utf-8').strip() == ''
+
+
+def import_time(code):
+    """Return the time printed by the Python code executed in a new
+    process."""
+    proc = Popen([sys.executable, '-c', code], stdout=PIPE, stderr=PIPE)
+    stdout, stderr = proc.communicate()
+    assert proc.returncode == 0, stderr
+    return float(stdout.decode('utf-8'))
+
+
+def test_import_time():
+    """Test that the time of importing the pywbemcli command in a new process,
+    i.e. the cold start time of pywbemcli, is within the budget relative to
+    the time of importing pywbem."""
+    times = []
+    reference_times = []
+    # The measurements are interleaved so that a temporary slowdown of the
+    # test system affects both times
+    for _ in range(IMPORT_REPEAT):
+        times.append(import_time(IMPORT_TIME_CODE))
+        reference_times.append(import_time(REFERENCE_TIME_CODE))
+
+    ratio = min(times) / min(reference_times)
+    assert ratio < IMPORT_BUDGET_RATIO, \
+        "Importing the pywbemcli command took {:.3f} sec, which is {:.2f} " \
+        "times the {:.3f} sec of importing pywbem and exceeds the budget " \
+        "of {} times".format(min(times), ratio, min(reference_times),
+                             IMPORT_BUDGET_RATIO)
@@ -0,0 +1,203 @@
+# (C) Copyright 2020 IBM Corp.
+# (C) Copyright 2020 Inova Development Inc.
+# All Rights Reserved
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""
+Unit tests for the persistent mock cache of mock repositories built with
+PYWBEMCLIFakedConnection.
+"""
+
+from __future__ import absolute_import, print_function
+
+import os
+import pytest
+
+from pywbemtools.pywbemcli import _pywbemcli_faked_operations
+from pywbemtools.pywbemcli._pywbemcli_faked_operations import \
+    PYWBEMCLIFakedConnection, mock_cache_file
+
+NAMESPACE = 'root/cimv2'
+
+MOF = """
+Qualifier Key : boolean = false,
+    Scope(property, reference),
+    Flavor(DisableOverride, ToSubclass);
+
+class CIM_Foo {
+    [Key] string InstanceID;
+};
+"""
+
+SCRIPT = """
+from pywbem import CIMClass
+MOCK_DEPENDENCIES = []
+CONN.add_cimobjects(CIMClass('CIM_Bar'))
+"""
+
+UNDECLARED_SCRIPT = """
+from pywbem import CIMClass
+CONN.add_cimobjects(CIMClass('CIM_Bar'))
+"""
+
+DEPENDENT_SCRIPT = """
+import os
+MOCK_DEPENDENCIES = ['dep.mof']
+CONN.compile_mof_file(os.path.join({!r}, 'dep.mof'))
+"""
+
+CALLBACK_SCRIPT = """
+def blah_callback(conn, methodname, objectname, **params):
+    return 0
+CONN.add_method_callback('CIM_Foo', 'Blah', blah_callback)
+"""
+
+
+@pytest.fixture
+def mock_cache_dir(tmpdir, monkeypatch):
+    """Directory of the mock cache."""
+    cache_dir = str(tmpdir.join('mockcache'))
+    monkeypatch.setenv('PYWBEMCLI_MOCK_CACHE_DIR', cache_dir)
+    return cache_dir
+
+
+def write_file(tmpdir, name, content):
+    """Write a file into tmpdir and return its path name."""
+    file_path = str(tmpdir.join(name))
+    with open(file_path, 'w') as fp:
+        fp.write(content)
+    return file_path
+
+
+def build(file_path_list, verbose=False):
+    """Build a mock repository from the files and return its connection,
+    counting the calls of compile_mof_file."""
+    conn = PYWBEMCLIFakedConnection(default_namespace=NAMESPACE)
+    conn.compile_count = 0
+    compile_mof_file = conn.compile_mof_file
+
+    def counting_compile_mof_file(*args, **kwargs):
+        conn.compile_count += 1
+        return compile_mof_file(*args, **kwargs)
+
+    conn.compile_mof_file = counting_compile_mof_file
+    conn.build_repository(conn, None, file_path_list, verbose)
+    return conn
+
+
+def classnames(conn):
+    """Return the sorted class names of the mock repository."""
+    return sorted(conn.EnumerateClassNames(DeepInheritance=True))
+
+
+def test_mock_cache_hit(tmpdir, mock_cache_dir):
+    # pylint: disable=redefined-outer-name
+    """Test that a mock repository is loaded from the cache when it is built
+    again from the same files."""
+    files = [write_file(tmpdir, 'a.mof', MOF),
+             write_file(tmpdir, 'b.py', SCRIPT)]
+
+    conn1 = build(files)
+    assert conn1.compile_count == 1
+    assert os.listdir(mock_cache_dir) == \
+        [os.path.basename(mock_cache_file(conn1, files))]
+
+    conn2 = build(files)
+    assert conn2.compile_count == 0
+    assert classnames(conn2) == ['CIM_Bar', 'CIM_Foo']
+    assert classnames(conn2) == classnames(conn1)
+
+
+def test_mock_cache_changed_file(tmpdir, mock_cache_dir):
+    # pylint: disable=redefined-outer-name
+    """Test that a changed file causes the mock repository to be rebuilt and
+    to replace the mock repository in the cache."""
+    mof_file = write_file(tmpdir, 'a.mof', MOF)
+    build([mof_file])
+
+    write_file(tmpdir, 'a.mof', MOF.replace('CIM_Foo', 'CIM_Foo2'))
+    conn = build([mof_file])
+
+    assert conn.compile_count == 1
+    assert classnames(conn) == ['CIM_Foo2']
+    assert len(os.listdir(mock_cache_dir)) == 1
+    assert build([mof_file]).compile_count == 0
+
+
+def test_mock_cache_verbose(tmpdir, mock_cache_dir):
+    # pylint: disable=redefined-outer-name,unused-argument
+    """Test that the mock repository is always built in verbose mode."""
+    mof_file = write_file(tmpdir, 'a.mof', MOF)
+    build([mof_file])
+
+    assert build([mof_file], verbose=True).compile_count == 1
+
+
+def test_mock_cache_callbacks_not_cached(tmpdir, mock_cache_dir):
+    # pylint: disable=redefined-outer-name
+    """Test that a mock repository with method callbacks is not cached."""
+    files = [write_file(tmpdir, 'a.mof', MOF),
+             write_file(tmpdir, 'b.py', CALLBACK_SCRIPT)]
+
+    build(files)
+    conn = build(files)
+
+    assert conn.compile_count == 1
+    assert not os.path.isdir(mock_cache_dir) or \
+        os.listdir(mock_cache_dir) == []
+
+
+def test_mock_cache_undeclared_dependencies(tmpdir, mock_cache_dir):
+    # pylint: disable=redefined-outer-name
+    """Test that a mock repository built by a Python script that does not
+    declare its dependencies is not cached."""
+    files = [write_file(tmpdir, 'a.mof', MOF),
+             write_file(tmpdir, 'b.py', UNDECLARED_SCRIPT)]
+
+    build(files)
+    conn = build(files)
+
+    assert conn.compile_count == 1
+    assert classnames(conn) == ['CIM_Bar', 'CIM_Foo']
+    assert not os.path.isdir(mock_cache_dir) or \
+        os.listdir(mock_cache_dir) == []
+
+
+def test_mock_cache_changed_dependency(tmpdir, mock_cache_dir):
+    # pylint: disable=redefined-outer-name,unused-argument
+    """Test that a change of a file declared as dependency by a Python script
+    causes the mock repository to be rebuilt."""
+    write_file(tmpdir, 'dep.mof', MOF)
+    files = [write_file(tmpdir, 'b.py',
+                        DEPENDENT_SCRIPT.format(str(tmpdir)))]
+    build(files)
+    assert build(files).compile_count == 0
+
+    write_file(tmpdir, 'dep.mof', MOF.replace('CIM_Foo', 'CIM_Foo2'))
+    conn = build(files)
+
+    assert conn.compile_count == 1
+    assert classnames(conn) == ['CIM_Foo2']
+    assert build(files).compile_count == 0
+
+
+def test_mock_cache_disabled(tmpdir, mock_cache_dir, monkeypatch):
+    # pylint: disable=redefined-outer-name
+    """Test that the mock cache is not used if USE_MOCK_CACHE is False."""
+    monkeypatch.setattr(_pywbemcli_faked_operations, 'USE_MOCK_CACHE', False)
+    mof_file = write_file(tmpdir, 'a.mof', MOF)
+
+    build([mof_file])
+
+    assert build([mof_file]).compile_count == 1
+    assert not os.path.exists(mock_cache_dir)
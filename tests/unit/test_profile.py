@@ -0,0 +1,134 @@
+# (C) Copyright 2020 IBM Corp.
+# (C) Copyright 2020 Inova Development Inc.
+# All Rights Reserved
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""
+Unit tests for the profile of the phases of the commands shown with the
+--profile general option.
+"""
+
+from __future__ import absolute_import, print_function
+
+import os
+import re
+import pstats
+
+from pywbemtools.pywbemcli._profile import CommandProfile, ProfileRecorder, \
+    profiled_phase, active_profile, PHASE_REQUEST, PHASE_SERVER, \
+    PHASE_PARSE, PHASE_OTHER
+
+from .utils import execute_pywbemcli
+
+TEST_DIR = os.path.dirname(__file__)
+SIMPLE_MOCK_FILE_PATH = os.path.join(TEST_DIR, 'simple_mock_model.mof')
+
+
+@profiled_phase('outer')
+def outer_func():
+    """Function with a nested phase"""
+    return [inner_func() for _ in range(3)]
+
+
+@profiled_phase('inner')
+def inner_func():
+    """Function in a nested phase"""
+    return sum(range(1000))
+
+
+def test_profiled_phase_inactive():
+    """Test that decorated functions work without an active profile."""
+    assert active_profile() is None
+    assert outer_func() == [499500] * 3
+
+
+def test_profile_nested_phases():
+    """Test that the times of nested phases are excluded from the enclosing
+    phases and that the phase times add up to the total time."""
+    profile = CommandProfile()
+    with profile:
+        assert active_profile() is profile
+        outer_func()
+        outer_func()
+    assert active_profile() is None
+
+    phases = {phase.name: phase for phase in profile.phase_times()}
+    assert list(phases) == ['outer', 'inner', PHASE_OTHER]
+    assert phases['outer'].count == 2
+    assert phases['inner'].count == 6
+    assert all(phase.time >= 0 for phase in phases.values())
+    total = sum(phase.time for phase in phases.values())
+    assert abs(total - profile.total_time) < 1e-6
+
+
+def test_profile_nested_profile():
+    """Test that a profile in a profiled command is accounted to the active
+    profile."""
+    outer = CommandProfile()
+    inner = CommandProfile()
+    with outer:
+        with inner:
+            assert active_profile() is outer
+            inner_func()
+    assert inner.total_time is None
+    assert [phase.name for phase in outer.phase_times()] == \
+        ['inner', PHASE_OTHER]
+
+
+def test_profile_recorder_http_phases():
+    """Test the phases of a WBEM operation with a HTTP exchange."""
+    recorder = ProfileRecorder()
+    profile = CommandProfile()
+    with profile:
+        recorder.reset()
+        recorder.stage_pywbem_args('GetClass', ClassName='CIM_Foo')
+        recorder.stage_http_request(None, 11, 'http://blah', '/cimom',
+                                    'POST', {}, '<CIM/>')
+        recorder.stage_http_response2('<CIM/>')
+        recorder.stage_pywbem_result(None, None)
+        recorder.record_staged()
+
+    phases = {phase.name: phase for phase in profile.phase_times()}
+    assert list(phases) == [PHASE_REQUEST, PHASE_SERVER, PHASE_PARSE,
+                            PHASE_OTHER]
+    assert phases[PHASE_SERVER].count == 1
+
+
+def test_profile_option():
+    """Test the profile of a command with table output."""
+    rc, stdout, stderr = execute_pywbemcli(
+        ['--mock-server', SIMPLE_MOCK_FILE_PATH, '--profile', '-o', 'table',
+         'instance', 'enumerate', 'CIM_Foo'], in_process=True)
+
+    assert rc == 0, stderr
+    assert 'Profile: Time of the phases of the command, total' in stdout
+    for phase in ('Connect', 'Server and network', 'sort_cimobjects',
+                  '_format_instances_as_rows', 'tabulate', 'Other'):
+        assert re.search(r'^{} +[0-9]+ +[0-9.]+ +[0-9.]+$'.format(phase),
+                         stdout, re.M), phase
+    # One for each of the table cells with a value
+    assert re.search(r'^_value_tomof +21 ', stdout, re.M)
+
+
+def test_profile_file(tmpdir):
+    """Test that the cProfile profile data of a command is saved."""
+    profile_file = str(tmpdir.join('cmd.prof'))
+    rc, stdout, stderr = execute_pywbemcli(
+        ['--mock-server', SIMPLE_MOCK_FILE_PATH, '--profile-file',
+         profile_file, 'class', 'enumerate', '--names-only'],
+        in_process=True)
+
+    assert rc == 0, stderr
+    assert 'Profile:' not in stdout
+    stats = pstats.Stats(profile_file)
+    assert any(func[2] == 'cmd_class_enumerate' for func in stats.stats)
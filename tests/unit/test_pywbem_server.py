@@ -101,6 +101,38 @@ class PywbemServerTests(unittest.TestCase):
 
         # TODO test for errors
 
+    def test_create_worker_connections(self):
+        """Test creating additional connections for concurrent workers"""
+        server = 'http://localhost'
+        ns = 'root/cimv2'
+
+        svr = PywbemServer(server, ns, user='Fred', password='blah',
+                           timeout=10)
+        svr.create_connection(False)
+
+        conns = svr.create_worker_connections(3, use_pull=True)
+        self.assertEqual(len(conns), 3)
+        self.assertIs(conns[0], svr.conn)
+        for conn in conns[1:]:
+            self.assertIsNot(conn, svr.conn)
+            self.assertEqual(conn.url, server)
+            self.assertEqual(conn.default_namespace, ns)
+            self.assertEqual(conn.creds, ('Fred', 'blah'))
+            self.assertEqual(conn.timeout, 10)
+
+    def test_close_worker_connections(self):
+        """Test closing the additional connections for concurrent workers"""
+        svr = PywbemServer('http://localhost', 'root/cimv2')
+        svr.create_connection(False)
+        conns = svr.create_worker_connections(3)
+        closed = []
+        for conn in conns:
+            conn.close = lambda conn=conn: closed.append(conn)
+
+        svr.close_worker_connections(conns)
+
+        self.assertEqual(closed, conns[1:])
+
 
 if __name__ == '__main__':
     unittest.main()
@@ -286,12 +286,13 @@ TEST_CASES = [
      {'args': ['get', 'IN'],
       'general': ['--timestats']},
      {'stdout': ['Qualifier In : boolean = true,',
-                 'Scope(parameter),',
-                 'Count    Exc    Time    ReqLen    ReplyLen  Operation',
+                 r'Scope\(parameter\),',
+                 r'Count +Exc +Time +Time p50/p90/p99 +ReqLen +ReplyLen +Obj/s '
+                 r'+Bytes/s +Operation',
                  '      1      0',
-                 '0           0  GetQualifier'],
+                 r'0 +0 +[0-9]+ +0 +GetQualifier'],
       'rc': 0,
-      'test': 'in'},
+      'test': 'regex'},
      SIMPLE_MOCK_FILE, OK],
 
     ['Verify qualifier command -o repr get Description produces repr out',
@@ -315,6 +316,7 @@ class TestcmdQualifiers(CLITestsBase):
     Test all of the qualifiers command variations.
     """
     command_group = 'qualifier'
+    in_process = True
 
     @pytest.mark.parametrize(
         "desc, inputs, exp_response, mock, condition", TEST_CASES)
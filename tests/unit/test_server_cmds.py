@@ -349,6 +349,7 @@ class TestSubcmdServer(CLITestsBase):
     Execute the testcases for server command variations.
     """
     command_group = 'server'
+    in_process = True
 
     @pytest.mark.parametrize(
         "desc, inputs, exp_response, mock, condition",
@@ -0,0 +1,136 @@
+# (C) Copyright 2020 IBM Corp.
+# (C) Copyright 2020 Inova Development Inc.
+# All Rights Reserved
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""
+Unit tests for the SessionCache class.
+"""
+
+from __future__ import absolute_import, print_function
+
+from copy import deepcopy
+import pytest
+
+from pywbem.cim_obj import NocaseDict
+
+from pywbemtools.pywbemcli._session_cache import SessionCache
+
+
+class Retriever(object):
+    # pylint: disable=useless-object-inheritance,too-few-public-methods
+    """Callable that returns a fixed result and counts its calls."""
+
+    def __init__(self, result):
+        self.result = result
+        self.calls = 0
+
+    def __call__(self):
+        self.calls += 1
+        return self.result
+
+
+def test_get_hit_miss():
+    """Test that a result is retrieved only once."""
+    cache = SessionCache()
+    retrieve = Retriever(['a', 'b'])
+
+    assert cache.get(('classnames', 'root/cimv2', None), retrieve) == \
+        ['a', 'b']
+    assert cache.get(('classnames', 'root/cimv2', None), retrieve) == \
+        ['a', 'b']
+
+    assert retrieve.calls == 1
+    assert (cache.hits, cache.misses, cache.size, len(cache)) == (1, 1, 2, 1)
+
+
+def test_get_returns_list_copy():
+    """Test that modifying a returned list does not modify the cache."""
+    cache = SessionCache()
+    key = ('classnames', 'root/cimv2', None)
+
+    result = cache.get(key, Retriever(['b', 'a']))
+    result.sort()
+    result.append('c')
+
+    assert cache.get(key, Retriever(None)) == ['b', 'a']
+
+
+def test_get_dict_size():
+    """Test that the size of a cached dictionary is its number of items and
+    that the dictionary is shared with the cache."""
+    cache = SessionCache()
+    index = NocaseDict([('CIM_Foo', None), ('CIM_Foo_sub', 'CIM_Foo')])
+
+    result = cache.get(('superclasses', 'root/cimv2'), Retriever(index))
+
+    assert result is index
+    assert cache.size == 2
+
+
+def test_get_exception_not_cached():
+    """Test that nothing is cached if the retrieval fails."""
+    cache = SessionCache()
+
+    def retrieve():
+        """Fail the retrieval"""
+        raise ValueError('blah')
+
+    with pytest.raises(ValueError):
+        cache.get(('class', 'root/cimv2', 'cim_foo'), retrieve)
+
+    assert len(cache) == 0  # pylint: disable=len-as-condition
+
+
+def test_lru_eviction():
+    """Test that least recently used entries are evicted when the maximum
+    number of objects is exceeded."""
+    cache = SessionCache(max_objects=4)
+    cache.get(('class', 'ns', 'a'), Retriever('A'))
+    cache.get(('classnames', 'ns', None), Retriever(['x', 'y']))
+    cache.get(('class', 'ns', 'a'), Retriever('A'))   # a is now most recent
+    cache.get(('class', 'ns', 'b'), Retriever('B'))
+    cache.get(('class', 'ns', 'c'), Retriever('C'))
+
+    assert [key for key, _ in cache.entries()] == \
+        [('class', 'ns', 'a'), ('class', 'ns', 'b'), ('class', 'ns', 'c')]
+    assert cache.size == 3
+
+
+def test_invalidate():
+    """Test that invalidate removes the entries of a namespace."""
+    cache = SessionCache()
+    cache.get(('class', 'ns1', 'a'), Retriever('A'))
+    cache.get(('qualifiers', 'ns1'), Retriever(['q1', 'q2']))
+    cache.get(('class', 'ns2', 'a'), Retriever('A'))
+
+    cache.invalidate('NS1', kinds=('class',))
+    assert [key for key, _ in cache.entries()] == \
+        [('qualifiers', 'ns1'), ('class', 'ns2', 'a')]
+
+    cache.invalidate('ns1')
+    assert [key for key, _ in cache.entries()] == [('class', 'ns2', 'a')]
+    assert cache.size == 1
+
+
+def test_clear_and_deepcopy():
+    """Test that clear() and deepcopy() result in empty caches."""
+    cache = SessionCache(max_objects=10)
+    cache.get(('class', 'ns', 'a'), Retriever('A'))
+
+    cache_copy = deepcopy(cache)
+    assert len(cache_copy) == 0  # pylint: disable=len-as-condition
+    assert cache_copy.max_objects == 10
+
+    cache.clear()
+    assert (len(cache), cache.size, cache.hits, cache.misses) == (0, 0, 0, 0)
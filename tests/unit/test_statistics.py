@@ -0,0 +1,145 @@
+# (C) Copyright 2020 IBM Corp.
+# (C) Copyright 2020 Inova Development Inc.
+# All Rights Reserved
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""
+Unit tests for the statistics of the WBEM operations shown with the
+--timestats general option.
+"""
+
+from __future__ import absolute_import, print_function
+
+import os
+import re
+import random
+import pytest
+
+from pywbemtools.pywbemcli._statistics import percentile, histogram, \
+    OperationStatistics, enable_statistics, connection_statistics, \
+    TimeStatistic, SAMPLE_SIZE
+from pywbemtools.pywbemcli._pywbemcli_faked_operations import \
+    PYWBEMCLIFakedConnection
+
+from .utils import execute_pywbemcli
+
+TEST_DIR = os.path.dirname(__file__)
+SIMPLE_MOCK_FILE_PATH = os.path.join(TEST_DIR, 'simple_mock_model.mof')
+
+
+@pytest.mark.parametrize(
+    "values, percent, exp_value", [
+        ([1], 50, 1),
+        ([1, 2, 3, 4], 50, 2),
+        ([1, 2, 3, 4], 99, 4),
+        (list(range(1, 101)), 90, 90),
+        (list(range(1, 1001)), 99, 990),
+    ])
+def test_percentile(values, percent, exp_value):
+    """Test the nearest-rank percentiles of sorted values."""
+    assert percentile(values, percent) == exp_value
+
+
+def test_histogram():
+    """Test the histogram of times with the default buckets."""
+    assert histogram([0.0005, 0.001, 0.002, 0.5, 3, 42, 0.05]) == \
+        [2, 1, 1, 1, 1, 1]
+
+
+def test_time_statistic_bounded():
+    """Test that the sample of the times for the percentiles is bounded, and
+    that the count, minimum, maximum and histogram include all times."""
+    values = [(i % 1000) / 1000.0 for i in range(20 * SAMPLE_SIZE)]
+    random.shuffle(values)
+    stat = TimeStatistic()
+    for value in values:
+        stat.record(value)
+
+    assert len(stat.sample) == SAMPLE_SIZE
+    assert stat.count == len(values)
+    assert (stat.min, stat.max) == (0.0, 0.999)
+    assert stat.buckets == histogram(values)
+    assert abs(stat.percentile(50) - 0.5) < 0.1
+    assert abs(stat.percentile(90) - 0.9) < 0.1
+
+
+def test_time_statistic_exact():
+    """Test that all times are kept for the percentiles without a sample
+    size."""
+    values = [(i % 1000) / 1000.0 for i in range(2 * SAMPLE_SIZE)]
+    random.shuffle(values)
+    stat = TimeStatistic(sample_size=None)
+    for value in values:
+        stat.record(value)
+
+    assert len(stat.sample) == len(values)
+    assert stat.percentile(50) == percentile(sorted(values), 50)
+    assert stat.percentile(99) == percentile(sorted(values), 99)
+
+
+def test_statistics_recorder():
+    """Test that the operations executed on a connection are recorded, with
+    the number of returned objects."""
+    conn = PYWBEMCLIFakedConnection(default_namespace='root/cimv2')
+    conn.compile_mof_file(SIMPLE_MOCK_FILE_PATH)
+    statistics = enable_statistics(conn)
+    assert enable_statistics(conn) is statistics
+    assert connection_statistics(conn) is statistics
+
+    conn.EnumerateClassNames(DeepInheritance=True)
+    conn.EnumerateClassNames()
+    conn.GetClass('CIM_Foo')
+
+    stats = {stat.name: stat for stat in statistics.snapshot()}
+    assert sorted(stats) == ['EnumerateClassNames', 'GetClass']
+    assert stats['EnumerateClassNames'].count == 2
+    assert stats['EnumerateClassNames'].object_count == 5
+    assert stats['GetClass'].count == 1
+    assert stats['GetClass'].object_count == 1
+    assert stats['GetClass'].exception_count == 0
+    assert stats['EnumerateClassNames'].time.count == 2
+
+
+def test_statistics_exception():
+    """Test that operations that raise an exception are counted."""
+    statistics = OperationStatistics()
+    statistics.record('GetClass', 0.5, exception=True)
+    statistics.record('GetClass', 0.25, server_time=0.125, request_len=100,
+                      reply_len=300, object_count=1)
+
+    stat = statistics.snapshot()[0]
+    assert stat.count == 2
+    assert stat.exception_count == 1
+    assert (stat.server_time.count, stat.server_time.sample) == (1, [0.125])
+    assert (stat.request_len.min, stat.request_len.max) == (0, 100)
+    assert (stat.reply_len.min, stat.reply_len.max) == (0, 300)
+    assert stat.objects_per_sec == 1 / 0.75
+    assert stat.bytes_per_sec == 400 / 0.75
+
+
+def test_timestats_accumulate(tmpdir):
+    """Test that the statistics accumulate across the commands of a batch
+    command that use the same connection."""
+    batch_file = tmpdir.join('commands.txt')
+    batch_file.write('-T instance enumerate CIM_Foo --names-only\n'
+                     '-T -v instance enumerate CIM_Foo --names-only\n')
+    rc, stdout, stderr = execute_pywbemcli(
+        ['--mock-server', SIMPLE_MOCK_FILE_PATH, '--use-pull', 'no', 'batch',
+         str(batch_file)], in_process=True)
+
+    assert rc == 0, stderr
+    counts = re.findall(r'^ +([0-9]+) +0 .* EnumerateInstanceNames$', stdout,
+                        re.M)
+    # The last count is the histogram bucket of the second command
+    assert counts[:2] == ['1', '2']
+    assert 'Latency histogram: Number of operations by time in sec.' in stdout
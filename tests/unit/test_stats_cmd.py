@@ -0,0 +1,179 @@
+# (C) Copyright 2020 IBM Corp.
+# (C) Copyright 2020 Inova Development Inc.
+# All Rights Reserved
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""
+Tests the --stats-file general option and the stats command group
+"""
+
+from __future__ import absolute_import, print_function
+
+import os
+import re
+import json
+import pytest
+
+from pywbemtools.pywbemcli._statistics import SAMPLE_SIZE
+
+from .utils import execute_pywbemcli
+
+TEST_DIR = os.path.dirname(__file__)
+SIMPLE_MOCK_FILE_PATH = os.path.join(TEST_DIR, 'simple_mock_model.mof')
+
+RECORD_KEYS = ['client_time', 'connection', 'exception', 'namespace',
+               'object_count', 'operation', 'reply_len', 'request_len',
+               'server', 'server_time', 'time']
+
+
+def write_stats_file(file_path, *commands):
+    """Execute the pywbemcli commands (lists of arguments) for the mock
+    server with the statistics file file_path."""
+    for args in commands:
+        execute_pywbemcli(['--mock-server', SIMPLE_MOCK_FILE_PATH,
+                           '--use-pull', 'no', '--stats-file', file_path] +
+                          args, in_process=True)
+
+
+@pytest.fixture
+def stats_files(tmpdir):
+    """Two statistics files with the records of mock operations."""
+    file1 = str(tmpdir.join('stats1.jsonl'))
+    file2 = str(tmpdir.join('stats2.jsonl'))
+    write_stats_file(file1,
+                     ['instance', 'enumerate', 'CIM_Foo', '--names-only'],
+                     ['class', 'get', 'CIM_Blah'])
+    write_stats_file(file2,
+                     ['instance', 'enumerate', 'CIM_Foo', '--names-only'],
+                     ['instance', 'enumerate', 'CIM_Foo', '--names-only'])
+    return file1, file2
+
+
+def test_stats_file_records(stats_files):
+    # pylint: disable=redefined-outer-name
+    """Test the records of the operations in the statistics file."""
+    with open(stats_files[0]) as fp:
+        records = [json.loads(line) for line in fp]
+
+    assert [record['operation'] for record in records] == \
+        ['EnumerateInstanceNames', 'GetClass']
+    for record in records:
+        assert sorted(record) == RECORD_KEYS
+        assert record['connection'] == 'not-saved'
+        assert record['namespace'] == 'root/cimv2'
+        assert record['server'] is None
+    assert records[0]['object_count'] == 12
+    assert records[0]['exception'] is False
+    assert records[1]['exception'] is True
+
+
+def test_stats_summary(stats_files):
+    # pylint: disable=redefined-outer-name
+    """Test the summary of statistics files."""
+    rc, stdout, stderr = execute_pywbemcli(
+        ['stats', 'summary'] + list(stats_files), in_process=True)
+
+    assert rc == 0, stderr
+    assert re.search(r'^ +Count +Exc +Time .* +Operation$', stdout, re.M)
+    assert re.search(r'^ +3 +0 .* EnumerateInstanceNames$', stdout, re.M)
+    assert re.search(r'^ +1 +1 .* GetClass$', stdout, re.M)
+
+
+def test_stats_summary_lengths(tmpdir):
+    """Test that the summary shows the average, minimum and maximum of the
+    request and reply lengths."""
+    file_path = tmpdir.join('stats.jsonl')
+    records = [dict(operation='GetClass', client_time=0.5, request_len=100,
+                    reply_len=1000),
+               dict(operation='GetClass', client_time=0.25, request_len=300,
+                    reply_len=1000)]
+    file_path.write(''.join(json.dumps(record) + '\n' for record in records))
+
+    rc, stdout, stderr = execute_pywbemcli(
+        ['stats', 'summary', str(file_path)], in_process=True)
+
+    assert rc == 0, stderr
+    assert re.search(r'^ +2 +0 +0.375/0.250/0.500 +\S+ +200/100/300 +1000 '
+                     r'.* GetClass$', stdout, re.M)
+
+
+def test_stats_summary_by(stats_files):
+    # pylint: disable=redefined-outer-name
+    """Test the summary of statistics files grouped by namespace."""
+    rc, stdout, stderr = execute_pywbemcli(
+        ['stats', 'summary', '--by', 'namespace'] + list(stats_files),
+        in_process=True)
+
+    assert rc == 0, stderr
+    assert re.search(r'^ +Count +Exc +Time .* +Namespace$', stdout, re.M)
+    assert re.search(r'^ +4 +1 .* root/cimv2$', stdout, re.M)
+
+
+def test_stats_summary_no_match(stats_files):
+    # pylint: disable=redefined-outer-name
+    """Test the summary of statistics files without selected operations."""
+    rc, _, stderr = execute_pywbemcli(
+        ['stats', 'summary', '-c', 'blah*'] + list(stats_files),
+        in_process=True)
+
+    assert rc == 1
+    assert 'No operations in the statistics files' in stderr
+
+
+def test_stats_compare(stats_files):
+    # pylint: disable=redefined-outer-name
+    """Test the comparison of two statistics files."""
+    rc, stdout, stderr = execute_pywbemcli(
+        ['-o', 'simple', 'stats', 'compare'] + list(stats_files),
+        in_process=True)
+
+    assert rc == 0, stderr
+    assert re.search(r'^EnumerateInstanceNames +1 +2 +[0-9.]+ +[0-9.]+ '
+                     r'+[-+][0-9.]+% ', stdout, re.M)
+    assert re.search(r'^GetClass +1 +0 +[0-9.]+ +[0-9.]+ *$', stdout, re.M)
+
+
+def test_stats_compare_exact(tmpdir):
+    """Test that the percentiles of a statistics file with more operations
+    than the sample size of the statistics are exact, so that a file compared
+    with itself shows no change."""
+    file_path = str(tmpdir.join('stats.jsonl'))
+    with open(file_path, 'w') as fp:
+        for i in range(3 * SAMPLE_SIZE):
+            fp.write(json.dumps(dict(operation='GetClass',
+                                     client_time=(i * 7919 % 1000) / 1e4)))
+            fp.write('\n')
+
+    rc, stdout, stderr = execute_pywbemcli(
+        ['-o', 'simple', 'stats', 'compare', file_path, file_path],
+        in_process=True)
+
+    assert rc == 0, stderr
+    assert re.search(r'^GetClass +{0} +{0} +[0-9.]+ +[0-9.]+ +\+0\.0% +'
+                     r'[0-9.]+ +[0-9.]+ +\+0\.0%'.format(3 * SAMPLE_SIZE),
+                     stdout, re.M), stdout
+
+
+def test_stats_invalid_file(tmpdir):
+    """Test the error for an invalid statistics file."""
+    file_path = str(tmpdir.join('invalid.jsonl'))
+    with open(file_path, 'w') as fp:
+        fp.write('{"operation": "GetClass", "client_time": 0.1}\n')
+        fp.write('blah\n')
+
+    rc, _, stderr = execute_pywbemcli(['stats', 'summary', file_path],
+                                      in_process=True)
+
+    assert rc == 1
+    assert 'Invalid record in statistics file' in stderr
+    assert 'line 2' in stderr
@@ -22,14 +22,25 @@ from __future__ import absolute_import, print_function
 import os
 import sys
 import re
+import traceback
 from copy import copy
 from subprocess import Popen, PIPE
 import six
+from click.testing import CliRunner
 
+from pywbemtools.pywbemcli.pywbemcli import cli
+from pywbemtools.pywbemcli._connection_repository import ConnectionRepository
 
-def execute_pywbemcli(args, env=None, stdin=None, verbose=None):
+# Marker in the first line of mock Python scripts that are executed at the
+# startup of pywbemcli
+STARTUP_SCRIPT_MARKER = '!PROCESS!AT!STARTUP!'
+
+
+def execute_pywbemcli(args, env=None, stdin=None, verbose=None,
+                      in_process=False):
     """
-    Invoke the 'pywbemcli' command as a child process.
+    Invoke the 'pywbemcli' command as a child process, or in the current
+    Python process if in_process is True.
 
     This requires that the 'pywbemcli' command is installed in the current
     Python environment.
@@ -54,6 +65,12 @@ def execute_pywbemcli(args, env=None, stdin=None, verbose=None):
       verbose: (bool)
         If True, display args, env, and stdin before executing the command
 
+      in_process: (bool)
+        If True, invoke the command in the current Python process (see
+        :func:`invoke_pywbemcli`) unless stdin is specified (interactive
+        mode) or a mock Python script to be executed at startup is
+        specified, since these need a separate process.
+
     Returns:
 
       tuple(rc, stdout, stderr): Output of the command, where:
@@ -124,11 +141,14 @@ def execute_pywbemcli(args, env=None, stdin=None, verbose=None):
     # stout_str, stderr_str = proc.communicate(input=stdin)
     # Temp alternative is the following line with universal_newlines=False
     # and the second change to fix the EOLs ourself.
-    proc = Popen(cmd_args, shell=False, stdin=PIPE, stdout=PIPE, stderr=PIPE,
-                 universal_newlines=False)
+    if in_process and not stdin and not has_startup_script(cmd_args):
+        rc, stdout_str, stderr_str = invoke_pywbemcli(cmd_args[1:])
+    else:
+        proc = Popen(cmd_args, shell=False, stdin=PIPE, stdout=PIPE,
+                     stderr=PIPE, universal_newlines=False)
 
-    stdout_str, stderr_str = proc.communicate(input=stdin)
-    rc = proc.returncode
+        stdout_str, stderr_str = proc.communicate(input=stdin)
+        rc = proc.returncode
 
     for name in env:
         del os.environ[name]
@@ -156,6 +176,55 @@ def execute_pywbemcli(args, env=None, stdin=None, verbose=None):
     return rc, stdout_str, stderr_str
 
 
+def has_startup_script(args):
+    """
+    Return True if a mock Python script that is executed at the startup of
+    pywbemcli is in the command line arguments.
+    """
+    for arg in args:
+        if arg.endswith('.py') and os.path.isfile(arg):
+            with open(arg) as fp:
+                if STARTUP_SCRIPT_MARKER in fp.readline():
+                    return True
+    return False
+
+
+def invoke_pywbemcli(args):
+    """
+    Invoke the 'pywbemcli' command in the current Python process, with
+    isolated stdin, stdout and stderr, and return its results like
+    :func:`execute_pywbemcli`.
+
+    This avoids the startup of a Python process for each command. The
+    connection definitions are read again from the connections file as they
+    would be by a new process, and exceptions that are not handled by the
+    command are reported with a traceback on stderr as they would be by the
+    Python interpreter. The environment variables must already be set.
+    """
+    # Discard the connection definitions of previous commands
+    # pylint: disable=protected-access
+    ConnectionRepository._pywbemcli_servers = {}
+    ConnectionRepository._loaded = False
+    ConnectionRepository._connections_file = None
+    ConnectionRepository._connections_file_signature = None
+    ConnectionRepository.default_connection_name = None
+
+    # A child process whose stdout is a pipe uses the default terminal size
+    env = {}
+    if 'COLUMNS' not in os.environ:
+        env['COLUMNS'] = '80'
+    if 'LINES' not in os.environ:
+        env['LINES'] = '24'
+
+    runner = CliRunner(mix_stderr=False)
+    result = runner.invoke(cli, args, env=env, prog_name='pywbemcli')
+
+    stderr_str = result.stderr
+    if result.exc_info and not isinstance(result.exception, SystemExit):
+        stderr_str += ''.join(traceback.format_exception(*result.exc_info))
+    return result.exit_code, result.stdout, stderr_str
+
+
 def assert_rc(exp_rc, rc, stdout, stderr):
     """
     Assert that the specified return code is as expected.